@@ -0,0 +1,302 @@
+# Arquivo alert_router.py
+# Este arquivo contém o roteamento dos alertas para vários chats/canais do Telegram:
+# - Registro de assinantes, cada um com filtros de par, timeframe, direção e força
+#   mínima do sinal (pontos do lado do sinal, `pontos_do_lado` em signal_state.py),
+#   e o modelo de mensagem desejado.
+# - Os filtros são compilados em um índice invertido por (par, timeframe, direção),
+#   com "*" para "qualquer"; cada entrada é ordenada pela força mínima, então rotear
+#   um sinal custa O(assinantes que casam), e não uma varredura de todos.
+# - A mensagem é montada uma única vez por modelo distinto e entregue por um
+#   enviador compartilhado, com limite global de envios por segundo e intervalo
+#   mínimo por chat (os limites da API do Telegram).
+#
+# Arquivo de assinantes (JSON, ALERT_SUBSCRIBERS_PATH):
+#   [{"id": "vip", "chat_id": "-100123", "simbolos": ["BTCUSDT"], "timeframes": ["1"],
+#     "direcoes": ["BUY/LONG"], "forca_minima": 8, "modelo": "compacto"}]
+# Campos de filtro omitidos (ou vazios) aceitam qualquer valor.
+
+import bisect
+import heapq
+import itertools
+import json
+import time
+from threading import Condition, Thread
+
+import requests
+from loguru import logger
+
+from constants import (
+    ALERT_CHAT_INTERVAL_S,
+    ALERT_QUEUE_SIZE,
+    ALERT_RATE_PER_S,
+    ALERT_SUBSCRIBERS_PATH,
+    LOG_RATE_LIMIT_PER_MIN,
+)
+from telegram_alerts import formatar_mensagem, formatar_mensagem_compacta, send_telegram_message
+
+QUALQUER = "*"
+
+# Modelos de mensagem disponíveis para os assinantes
+MODELOS = {
+    "completo": formatar_mensagem,
+    "compacto": formatar_mensagem_compacta,
+}
+
+
+class Assinante:
+    """Um chat/canal e seus filtros."""
+
+    __slots__ = ("id", "chat_id", "simbolos", "timeframes", "direcoes", "forca_minima", "modelo")
+
+    def __init__(
+        self,
+        id,
+        chat_id,
+        simbolos=None,
+        timeframes=None,
+        direcoes=None,
+        forca_minima=0,
+        modelo="completo",
+    ):
+        if modelo not in MODELOS:
+            raise ValueError(f"Modelo de mensagem desconhecido: {modelo}")
+        self.id = str(id)
+        self.chat_id = str(chat_id)
+        self.simbolos = list(simbolos or [])
+        self.timeframes = [str(tf) for tf in timeframes or []]
+        self.direcoes = list(direcoes or [])
+        self.forca_minima = forca_minima or 0
+        self.modelo = modelo
+
+    @classmethod
+    def de_dict(cls, dados):
+        return cls(
+            dados.get("id", dados["chat_id"]),
+            dados["chat_id"],
+            dados.get("simbolos"),
+            dados.get("timeframes"),
+            dados.get("direcoes"),
+            dados.get("forca_minima", 0),
+            dados.get("modelo", "completo"),
+        )
+
+    def chaves(self):
+        """Chaves do índice invertido cobertas pelos filtros do assinante."""
+        return itertools.product(
+            self.simbolos or [QUALQUER],
+            self.timeframes or [QUALQUER],
+            self.direcoes or [QUALQUER],
+        )
+
+
+class RegistroAssinantes:
+    """
+    Assinantes e o índice invertido compilado a partir dos seus filtros.
+
+    O índice é reconstruído a cada alteração (raras) e trocado por inteiro, então
+    o roteamento pode ser feito por outra thread sem locks.
+    """
+
+    def __init__(self, assinantes=()):
+        self.assinantes = {}
+        self.indice = {}  # (par, tf, direção) -> ([forças mínimas], [assinantes]), ordenadas
+        for assinante in assinantes:
+            self.assinantes[assinante.id] = assinante
+        self.compilar()
+
+    @classmethod
+    def de_arquivo(cls, caminho=ALERT_SUBSCRIBERS_PATH):
+        with open(caminho, encoding="utf-8") as arquivo:
+            return cls(Assinante.de_dict(dados) for dados in json.load(arquivo))
+
+    def adicionar(self, assinante):
+        self.assinantes[assinante.id] = assinante
+        self.compilar()
+
+    def remover(self, id):
+        if self.assinantes.pop(str(id), None) is not None:
+            self.compilar()
+
+    def compilar(self):
+        entradas = {}
+        for assinante in self.assinantes.values():
+            for chave in assinante.chaves():
+                entradas.setdefault(chave, []).append(assinante)
+        indice = {}
+        for chave, lista in entradas.items():
+            lista.sort(key=lambda a: a.forca_minima)
+            indice[chave] = ([a.forca_minima for a in lista], lista)
+        self.indice = indice
+
+    def destinos(self, symbol, timeframe, direcao, forca):
+        """
+        Assinantes cujos filtros aceitam o sinal (cada chat aparece uma vez).
+
+        Returns:
+            list: Assinantes que devem receber o alerta.
+        """
+        indice = self.indice
+        encontrados = []
+        chats = set()
+        for chave in itertools.product(
+            (symbol, QUALQUER), (str(timeframe), QUALQUER), (direcao, QUALQUER)
+        ):
+            entrada = indice.get(chave)
+            if entrada is None:
+                continue
+            forcas, lista = entrada
+            # Prefixo da lista com força mínima <= força do sinal
+            for assinante in lista[: bisect.bisect_right(forcas, forca)]:
+                if assinante.chat_id not in chats:
+                    chats.add(assinante.chat_id)
+                    encontrados.append(assinante)
+        return encontrados
+
+
+class EnviadorTelegram:
+    """
+    Fila de envio compartilhada, com limite global e intervalo mínimo por chat.
+
+    Cada mensagem recebe, ao entrar na fila, o horário mais cedo em que pode sair
+    (respeitando o intervalo do seu chat); uma thread envia em ordem desse horário,
+    espaçando os envios pelo limite global. Respostas 429 reagendam a mensagem
+    pelo `retry_after` informado.
+
+    Args:
+        envios_por_segundo (float, optional): Limite global. Defaults to ALERT_RATE_PER_S.
+        intervalo_chat_s (float, optional): Intervalo mínimo por chat. Defaults to ALERT_CHAT_INTERVAL_S.
+        capacidade (int, optional): Mensagens pendentes; acima disso são descartadas
+            (e contadas). Defaults to ALERT_QUEUE_SIZE.
+        enviar (callable, optional): Função (texto, chat_id, sessao) -> Response.
+            Defaults to send_telegram_message.
+    """
+
+    MAX_TENTATIVAS = 3
+
+    def __init__(
+        self,
+        envios_por_segundo=ALERT_RATE_PER_S,
+        intervalo_chat_s=ALERT_CHAT_INTERVAL_S,
+        capacidade=ALERT_QUEUE_SIZE,
+        enviar=send_telegram_message,
+        relogio=time.monotonic,
+    ):
+        self.intervalo_global = 1.0 / envios_por_segundo
+        self.intervalo_chat_s = intervalo_chat_s
+        self.capacidade = capacidade
+        self.enviar = enviar
+        self.relogio = relogio
+        self.pendentes = []  # heap de (pronto em, sequência, chat, texto, tentativa)
+        self.proximo_por_chat = {}  # chat -> horário reservado para a próxima mensagem
+        self.sequencia = itertools.count()
+        self.condicao = Condition()
+        self.enviados = 0
+        self.descartados = 0
+        self.is_running = False
+        self._thread = None
+        self._sessao = requests.Session()
+
+    def enfileirar(self, chat_id, texto, tentativa=0, atraso=0.0):
+        with self.condicao:
+            if len(self.pendentes) >= self.capacidade:
+                self.descartados += 1
+                return False
+            agora = self.relogio()
+            pronto = max(agora + atraso, self.proximo_por_chat.get(chat_id, 0.0))
+            self.proximo_por_chat[chat_id] = pronto + self.intervalo_chat_s
+            heapq.heappush(
+                self.pendentes, (pronto, next(self.sequencia), chat_id, texto, tentativa)
+            )
+            self.condicao.notify()
+            return True
+
+    def start(self):
+        self.is_running = True
+        self._thread = Thread(target=self._executar, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self.condicao:
+            self.is_running = False
+            self.condicao.notify()
+        if self._thread:
+            self._thread.join()
+        if self.descartados:
+            logger.warning(f"Alertas: {self.descartados} mensagens descartadas (fila cheia).")
+
+    def _proxima(self):
+        """Espera a próxima mensagem liberada (None ao parar)."""
+        with self.condicao:
+            while self.is_running:
+                if self.pendentes:
+                    espera = self.pendentes[0][0] - self.relogio()
+                    if espera <= 0:
+                        return heapq.heappop(self.pendentes)
+                    self.condicao.wait(espera)
+                else:
+                    self.condicao.wait()
+            return None
+
+    def _executar(self):
+        while True:
+            item = self._proxima()
+            if item is None:
+                return
+            _, _, chat_id, texto, tentativa = item
+            inicio = self.relogio()
+            try:
+                resposta = self.enviar(texto, chat_id, self._sessao)
+            except Exception as e:
+                resposta = None
+                logger.error("Erro ao enviar alerta para {}: {}", chat_id, e, limite=LOG_RATE_LIMIT_PER_MIN)
+            if resposta is not None and resposta.status_code == 429:
+                if tentativa + 1 < self.MAX_TENTATIVAS:
+                    try:
+                        atraso = float(resposta.json()["parameters"]["retry_after"])
+                    except (ValueError, KeyError, TypeError):
+                        atraso = 1.0
+                    self.enfileirar(chat_id, texto, tentativa + 1, atraso)
+                else:
+                    self.descartados += 1
+            elif resposta is not None:
+                self.enviados += 1
+            decorrido = self.relogio() - inicio
+            if decorrido < self.intervalo_global:
+                time.sleep(self.intervalo_global - decorrido)
+
+
+class RoteadorAlertas:
+    """
+    Substitui `enviar_mensagem_formatada` como destino dos alertas do WebSocketManager.
+
+    Args:
+        registro (RegistroAssinantes): Assinantes e índice.
+        enviador (EnviadorTelegram): Fila de envio compartilhada.
+    """
+
+    def __init__(self, registro, enviador):
+        self.registro = registro
+        self.enviador = enviador
+
+    def enviar(self, dados_mensagem):
+        """
+        Roteia um alerta: encontra os assinantes, monta cada modelo uma vez e enfileira.
+
+        Returns:
+            int: Número de mensagens enfileiradas.
+        """
+        destinos = self.registro.destinos(
+            dados_mensagem["simbolo"],
+            dados_mensagem.get("timeframe", QUALQUER),
+            dados_mensagem["tipo_entrada"],
+            dados_mensagem.get("forca") or 0,
+        )
+        textos = {}
+        enfileiradas = 0
+        for assinante in destinos:
+            if assinante.modelo not in textos:
+                textos[assinante.modelo] = MODELOS[assinante.modelo](dados_mensagem)
+            texto = textos[assinante.modelo]
+            if texto is not None and self.enviador.enfileirar(assinante.chat_id, texto):
+                enfileiradas += 1
+        return enfileiradas
@@ -0,0 +1,92 @@
+# Arquivo bar_scheduler.py
+# Este arquivo contém o agendador de avaliação por fechamento de vela:
+# - Registra as confirmações de vela ("confirm": true) de cada par.
+# - Libera o lote de uma vela quando todos os pares esperados confirmaram ou
+#   quando o prazo após o fechamento terminou, o que vier primeiro.
+# - Confirmações que chegam depois do lote são correções incrementais: apenas o
+#   par atrasado é avaliado, sem refazer o lote.
+# O horário usado é o `ts` das mensagens da Bybit, então o replay reproduz os lotes.
+
+from constants import BAR_DEADLINE_MS
+
+
+class AgendadorBarras:
+    """
+    Controla quais pares confirmaram cada vela e quando o lote da vela é avaliado.
+
+    Args:
+        duracao_vela_ms (int): Duração da vela (ms).
+        prazo_ms (int, optional): Espera após o fechamento pelas confirmações.
+            Defaults to BAR_DEADLINE_MS.
+        historico (int, optional): Velas já avaliadas lembradas (para reconhecer
+            confirmações atrasadas e repetidas). Defaults to 3.
+    """
+
+    def __init__(self, duracao_vela_ms, prazo_ms=BAR_DEADLINE_MS, historico=3):
+        self.duracao_vela_ms = duracao_vela_ms
+        self.prazo_ms = prazo_ms
+        self.historico = historico
+        self.pendentes = {}  # start -> pares confirmados (em ordem de chegada)
+        self.avaliadas = {}  # start -> pares já avaliados, para as velas recentes
+        self.lotes = 0
+        self.lotes_no_prazo = 0  # Lotes liberados pelo prazo, com pares faltando
+        self.atrasadas = 0  # Confirmações recebidas depois do lote
+
+    def confirmar(self, symbol, start):
+        """
+        Registra a confirmação da vela `start` do par.
+
+        Returns:
+            bool: True se o lote da vela já foi avaliado e o par deve ser avaliado
+            agora, sozinho (confirmação atrasada).
+        """
+        start = int(start)
+        avaliados = self.avaliadas.get(start)
+        if avaliados is not None:
+            if symbol in avaliados:
+                return False  # Confirmação repetida
+            avaliados.add(symbol)
+            self.atrasadas += 1
+            return True
+        if self.avaliadas and start < min(self.avaliadas):
+            return False  # Vela antiga demais, fora do histórico
+        self.pendentes.setdefault(start, {})[symbol] = None
+        return False
+
+    def prontos(self, agora_ms, total_pares):
+        """
+        Velas cujo lote deve ser avaliado, em ordem.
+
+        Args:
+            agora_ms (int): Horário atual (ms), ex: o `ts` da mensagem.
+            total_pares (int): Pares monitorados.
+        """
+        return sorted(
+            start
+            for start, pares in self.pendentes.items()
+            if len(pares) >= total_pares
+            or agora_ms >= start + self.duracao_vela_ms + self.prazo_ms
+        )
+
+    def liberar(self, start, total_pares=None):
+        """
+        Retira o lote da vela, que passa a contar como avaliada.
+
+        Returns:
+            list: Pares a avaliar para a vela.
+        """
+        pares = list(self.pendentes.pop(start, {}))
+        self.avaliadas[start] = set(pares)
+        while len(self.avaliadas) > self.historico:
+            del self.avaliadas[min(self.avaliadas)]
+        self.lotes += 1
+        if total_pares is not None and len(pares) < total_pares:
+            self.lotes_no_prazo += 1
+        return pares
+
+    def estatisticas(self):
+        return {
+            "lotes": self.lotes,
+            "lotes_no_prazo": self.lotes_no_prazo,
+            "atrasadas": self.atrasadas,
+        }
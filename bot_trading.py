@@ -1,9 +1,27 @@
 import asyncio
+import json
+import os
+import time
 from loguru import logger
 from dotenv import load_dotenv
 
 # Importar funções dos outros arquivos
-from websocket_manager import subscribe_to_trades
+from constants import (
+    ALERT_ROUTING_ENABLED,
+    BAR_SCHEDULER_ENABLED,
+    CANDLE_SOURCE,
+    CAPTURE_ENABLED,
+    ML_ENABLED,
+    PAPER_TRADING_ENABLED,
+    PREFILTER_ENABLED,
+    SR_ENABLED,
+    CHECKPOINT_ENABLED,
+    SYMBOL_CACHE_PATH,
+    TICK_AGGREGATION_ENABLED,
+    TICKER_FEATURES_ENABLED,
+    TIMEFRAME,
+)
+from startup import cronometro
 
 load_dotenv()
 
@@ -11,50 +29,270 @@ load_dotenv()
 # (As configurações foram movidas para o arquivo 'constants.py')
 # ----------------------
 
+# URL do WebSocket para Futuros Perpétuos
+WSS_URL = "wss://stream.bybit.com/v5/public/linear"
 
-async def executar_bot_trading(exchange):
+
+def filtrar_pares_futuros(markets):
+    """
+    Filtra os pares de futuros perpétuos com USDT como quote currency.
+
+    Args:
+        markets (dict): Mercados retornados por `exchange.load_markets()`.
+
+    Returns:
+        list: IDs dos pares (ex: "BTCUSDT").
+    """
+    # (reduzindo o número de pares)
+    return [
+        market["id"]
+        for market in markets.values()
+        if market["swap"]
+        and market["quote"] == "USDT"
+        and market["base"]
+        in [
+            "BTC",
+            "ETH",
+            "XRP",
+            "SOL",
+        ]  # Exemplo: incluir apenas BTC, ETH, XRP e SOL
+    ]
+
+    # return [
+    #     market["id"]
+    #     for market in markets.values()
+    #     if market["swap"] and market["quote"] == "USDT"
+    # ]
+
+
+def ler_cache_simbolos(caminho=SYMBOL_CACHE_PATH):
+    """Retorna a lista de pares salva na última execução (ou [] se não houver)."""
+    try:
+        with open(caminho) as arquivo:
+            return json.load(arquivo)["simbolos"]
+    except (OSError, ValueError, KeyError):
+        return []
+
+
+def salvar_cache_simbolos(simbolos, caminho=SYMBOL_CACHE_PATH):
+    """Salva a lista de pares de forma atômica (arquivo temporário + rename)."""
+    if os.path.dirname(caminho):
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    temporario = f"{caminho}.tmp"
+    with open(temporario, "w") as arquivo:
+        json.dump({"atualizado": time.time(), "simbolos": simbolos}, arquivo)
+    os.replace(temporario, caminho)
+
+
+def carregar_pares(conectar_exchange):
+    """Conecta à Bybit e carrega os mercados (bloqueante; roda em uma thread)."""
+    with cronometro.etapa("conexão com a Bybit (importa o ccxt)"):
+        exchange = conectar_exchange()
+        exchange.options["defaultType"] = "future"
+    with cronometro.etapa("load_markets"):
+        markets = exchange.load_markets()
+    return filtrar_pares_futuros(markets)
+
+
+async def anexar_executor(manager, tarefa_executor):
+    """Anexa o executor de ordens ao manager assim que ele terminar de iniciar."""
+    try:
+        manager.executor = await tarefa_executor
+    except Exception as e:
+        logger.error(f"Erro ao iniciar o executor de ordens: {e}")
+
+
+async def executar_bot_trading(
+    conectar_exchange,
+    tarefa_executor=None,
+    risk_manager=None,
+    journal=None,
+    metrics=None,
+):
     """
     Conecta à Bybit, obtém os pares de futuros, coleta dados via WebSocket
     e inicia as tarefas de processamento para cada par.
+
+    As inscrições começam imediatamente com a lista de pares em cache, enquanto
+    `load_markets` atualiza a lista em segundo plano; pares novos são inscritos
+    na conexão já aberta.
+
+    Args:
+        conectar_exchange (callable): Função que cria o objeto de exchange da Bybit.
+        tarefa_executor (asyncio.Task, optional): Tarefa que resulta no OrderExecutor. Defaults to None.
+        risk_manager (RiskManager, optional): Gerenciador de risco aplicado antes de cada sinal. Defaults to None.
+        journal (TradeJournal, optional): Diário onde sinais e alertas são registrados. Defaults to None.
+        metrics (MetricsRegistry, optional): Métricas publicadas para o dashboard. Defaults to None.
     """
     try:
-        exchange.options["defaultType"] = "future"
+        with cronometro.etapa("importação do scanner (numpy, talib)"):
+            from websocket_manager import WebSocketManager
 
-        # Obter os mercados da Bybit
-        markets = exchange.load_markets()
+        pares_futuros = ler_cache_simbolos()
+
+        # Agregação local de negócios (publicTrade): velas e perfil de volume
+        tick_aggregator = None
+        if TICK_AGGREGATION_ENABLED or CANDLE_SOURCE == "trades":
+            from tick_aggregator import TickAggregator
+
+            tick_aggregator = TickAggregator(TIMEFRAME)
+            tick_aggregator.start()
+
+        # Features de sentimento do tópico tickers (funding, open interest e basis)
+        ticker_features = None
+        if TICKER_FEATURES_ENABLED:
+            from ticker_features import TickerFeatures
+
+            ticker_features = TickerFeatures()
+
+        # Pontuação em lote por aprendizado de máquina a cada vela confirmada
+        ml = None
+        if ML_ENABLED:
+            from ml_scoring import EstagioML, carregar_modelo
+            from tick_aggregator import timeframe_em_segundos
+
+            ml = EstagioML(timeframe_em_segundos(TIMEFRAME) * 1000, carregar_modelo())
+
+        # Pré-filtro: apenas pares perto de um sinal passam pela avaliação completa
+        prefiltro = None
+        if PREFILTER_ENABLED:
+            from prefilter import PreFiltro
+
+            prefiltro = PreFiltro()
+
+        # Agendador: cada par é avaliado uma vez por vela, em lote, no fechamento
+        agendador = None
+        if BAR_SCHEDULER_ENABLED:
+            from bar_scheduler import AgendadorBarras
+            from tick_aggregator import timeframe_em_segundos
+
+            agendador = AgendadorBarras(timeframe_em_segundos(TIMEFRAME) * 1000)
+
+        # Paper trading: posições virtuais abertas pelos alertas, com saídas no diário
+        paper = None
+        if PAPER_TRADING_ENABLED:
+            from paper_trading import PaperTrading
+
+            paper = PaperTrading(journal)
+
+        # Suportes e resistências (pivôs e, opcionalmente, o livro de ofertas) para os TPs
+        suporte_resistencia = None
+        if SR_ENABLED:
+            from support_resistance import MotorSR
+
+            suporte_resistencia = MotorSR()
+
+        # Captura opcional dos frames brutos (replay, depuração e backtests)
+        captura = None
+        if CAPTURE_ENABLED:
+            from market_capture import MarketCapture
+
+            captura = MarketCapture()
+            captura.start()
+
+        # Uma única conexão multiplexada para todos os pares de futuros
+        manager = WebSocketManager(
+            WSS_URL,
+            pares_futuros,
+            TIMEFRAME,
+            risk_manager=risk_manager,
+            journal=journal,
+            metrics=metrics,
+            tick_aggregator=tick_aggregator,
+            captura=captura,
+            ticker_features=ticker_features,
+            ml=ml,
+            prefiltro=prefiltro,
+            agendador=agendador,
+            paper=paper,
+            suporte_resistencia=suporte_resistencia,
+        )
+        # Roteamento dos alertas para os assinantes (vários chats/canais)
+        enviador = None
+        if ALERT_ROUTING_ENABLED:
+            from alert_router import EnviadorTelegram, RegistroAssinantes, RoteadorAlertas
+
+            try:
+                registro = RegistroAssinantes.de_arquivo()
+                enviador = EnviadorTelegram()
+                enviador.start()
+                manager.enviar_alerta = RoteadorAlertas(registro, enviador).enviar
+                logger.info(f"Roteamento de alertas ativo para {len(registro.assinantes)} assinantes.")
+            except (OSError, ValueError, KeyError) as e:
+                logger.error(f"Erro ao carregar os assinantes dos alertas: {e}")
+
+        manager.ao_primeira_vela = lambda: (
+            cronometro.marcar("primeira vela recebida"),
+            cronometro.resumo(),
+        )
+        if metrics:
+            metrics.provedor_posicoes = lambda: (
+                dict(manager.executor.cache.posicoes) if manager.executor else {}
+            )
+        if tarefa_executor:
+            asyncio.create_task(anexar_executor(manager, tarefa_executor))
+
+        # Restaura o checkpoint e completa a lacuna via REST antes de conectar
+        checkpointer = None
+        if CHECKPOINT_ENABLED:
+            from checkpoint import Checkpointer
+
+            checkpointer = Checkpointer(manager)
+            with cronometro.etapa("restauração do checkpoint"):
+                checkpointer.restaurar()
+            if pares_futuros:
+                with cronometro.etapa("backfill REST"):
+                    await asyncio.to_thread(checkpointer.completar_via_rest, pares_futuros)
+            checkpointer.start()
+
+        conexao = None
+        manager.is_running = True  # `stop` (no finally abaixo) encerra o laço de `connect`
+        if pares_futuros:
+            logger.info(f"Iniciando com {len(pares_futuros)} pares do cache.")
+            conexao = asyncio.create_task(asyncio.to_thread(manager.connect))
+
+        # Atualiza a lista de pares em segundo plano
+        try:
+            pares_atuais = await asyncio.to_thread(carregar_pares, conectar_exchange)
+            salvar_cache_simbolos(pares_atuais)
+        except Exception as e:
+            logger.error(f"Erro ao carregar os mercados da Bybit: {e}")
+            pares_atuais = []
+            if conexao is None:
+                return
+
+        if conexao is None:
+            # Primeira execução (sem cache): histórico via REST antes de conectar
+            manager.symbols = pares_atuais
+            if checkpointer:
+                with cronometro.etapa("backfill REST"):
+                    await asyncio.to_thread(checkpointer.completar_via_rest, pares_atuais)
+            conexao = asyncio.create_task(asyncio.to_thread(manager.connect))
+        else:
+            novos = [par for par in pares_atuais if par not in manager.symbols]
+            if novos:
+                if checkpointer:
+                    # Busca fora da thread do WebSocket; as velas são aplicadas nela,
+                    # antes das primeiras mensagens dos pares novos
+                    velas = await asyncio.to_thread(checkpointer.buscar_via_rest, novos)
+                    manager.agendar_tarefa(lambda: checkpointer.aplicar_velas(velas))
+                manager.adicionar_simbolos(novos)
 
-        # Filtrar os pares de futuros com USDT como quote currency
-        # (reduzindo o número de pares)
-        pares_futuros = [
-            market["id"]
-            for market in markets.values()
-            if market["swap"]
-            and market["quote"] == "USDT"
-            and market["base"]
-            in [
-                "BTC",
-                "ETH",
-                "XRP",
-                "SOL",
-            ]  # Exemplo: incluir apenas BTC, ETH, XRP e SOL
-        ]
-
-        # pares_futuros = [
-        #     market["id"]
-        #     for market in markets.values()
-        #     if market["swap"] and market["quote"] == "USDT"
-        # ]
-
-        logger.info(f"Iniciando execução para {len(pares_futuros)} pares de futuros.")
-
-        # URL do WebSocket para Futuros Perpétuos
-        wss_url = "wss://stream.bybit.com/v5/public/linear"
-
-        # Criar e agendar tarefas para cada par de futuros
-        tasks = [
-            subscribe_to_trades(exchange, symbol, wss_url) for symbol in pares_futuros
-        ]
-        await asyncio.gather(*tasks)
+        logger.info(f"Execução em andamento para {len(manager.symbols)} pares de futuros.")
+        try:
+            await conexao
+        finally:
+            manager.stop()
+            if tick_aggregator:
+                tick_aggregator.stop()
+            if checkpointer:
+                checkpointer.stop()
+            if captura:
+                captura.stop()
+            if enviador:
+                enviador.stop()
+            if paper:
+                logger.info(f"Paper trading: {paper.resumo()}")
 
     except Exception as e:
         logger.error(f"Erro na execução do bot de trading: {e}")
@@ -0,0 +1,293 @@
+# Arquivo candle_store.py
+# Este arquivo contém o armazenamento compacto das velas por par (modo de orçamento
+# de memória), no lugar das listas de dicts do payload da Bybit:
+# - Cada par guarda colunas NumPy (start, OHLCV e confirmação) em um buffer de
+#   capacidade fixa, com cerca de 50 bytes por vela em vez de centenas.
+# - Os preços podem ser guardados em float32 (CANDLE_STORE_FLOAT32); as séries
+#   entregues aos indicadores continuam em float64.
+# - As séries OHLCV saem das colunas por cópia contígua, sem montar arrays vela a vela.
+# - Os pares são indexados pela tabela compartilhada de IDs (symbol_ids.py).
+# - `relatorio_memoria` mostra quanto cada par ocupa (velas e indicadores) e o RSS.
+
+import os
+import sys
+
+import numpy as np
+
+from symbol_ids import SIMBOLOS
+
+COLUNAS_PRECO = ("open", "high", "low", "close")
+SERIES = COLUNAS_PRECO + ("volume",)
+COLUNAS = ("start", "confirm") + SERIES
+
+
+class Vela:
+    """
+    Vela lida do armazenamento, com acesso por chave como os dicts da Bybit
+    (`vela["close"]`, `vela.get("confirm")`).
+    """
+
+    __slots__ = ("start", "open", "high", "low", "close", "volume", "confirm")
+
+    def __init__(self, start, open, high, low, close, volume, confirm):
+        self.start = start
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.confirm = confirm
+
+    def __getitem__(self, chave):
+        try:
+            return getattr(self, chave)
+        except AttributeError:
+            raise KeyError(chave) from None
+
+    def get(self, chave, padrao=None):
+        return getattr(self, chave, padrao)
+
+    def __repr__(self):
+        return f"Vela(start={self.start}, close={self.close}, confirm={self.confirm})"
+
+
+class SerieVelas:
+    """
+    Velas de um par em colunas, limitadas às últimas `maximo`.
+
+    O buffer tem o dobro da capacidade: as velas novas são escritas no fim e, ao
+    chegar ao limite, as `maximo` mais recentes são movidas para o início (custo
+    amortizado O(1) por vela, sem o `pop(0)` das listas).
+
+    A escrita é feita por uma única thread (a do WebSocket); leitores de outras
+    threads (ex: o checkpoint) usam `copiar`, que repete a cópia se uma escrita a
+    atravessou (`versao` é ímpar durante a escrita).
+
+    Args:
+        maximo (int): Velas mantidas.
+        float32 (bool, optional): Guarda os preços em float32. Defaults to False.
+    """
+
+    __slots__ = ("maximo", "inicio", "fim", "versao") + COLUNAS
+
+    def __init__(self, maximo, float32=False):
+        capacidade = 2 * maximo
+        tipo_preco = np.float32 if float32 else np.float64
+        self.maximo = maximo
+        self.inicio = self.fim = 0
+        self.versao = 0
+        self.start = np.zeros(capacidade, np.int64)
+        for coluna in COLUNAS_PRECO:
+            setattr(self, coluna, np.zeros(capacidade, tipo_preco))
+        self.volume = np.zeros(capacidade, np.float64)
+        self.confirm = np.zeros(capacidade, np.bool_)
+
+    def adicionar(self, candle):
+        """
+        Adiciona uma vela; uma atualização da vela em andamento (mesmo "start")
+        substitui a última em vez de criar uma nova.
+        """
+        start = int(candle["start"])
+        self.versao += 1
+        if self.fim > self.inicio and self.start[self.fim - 1] == start:
+            i = self.fim - 1
+        else:
+            if self.fim == len(self.start):
+                self._compactar()
+            i = self.fim
+            self.fim += 1
+            if self.fim - self.inicio > self.maximo:
+                self.inicio += 1
+        self.start[i] = start
+        for coluna in SERIES:
+            getattr(self, coluna)[i] = float(candle[coluna])
+        self.confirm[i] = bool(candle.get("confirm"))
+        self.versao += 1
+
+    def _compactar(self):
+        n = self.fim - self.inicio
+        for coluna in COLUNAS:
+            array = getattr(self, coluna)
+            array[:n] = array[self.inicio : self.fim]
+        self.inicio, self.fim = 0, n
+
+    def series(self):
+        """Séries OHLCV em float64 (cópias, seguras para memorizar)."""
+        return {
+            coluna: np.array(getattr(self, coluna)[self.inicio : self.fim], dtype=np.float64)
+            for coluna in SERIES
+        }
+
+    def copiar(self):
+        """
+        Cópia consistente das colunas, segura para ler fora da thread que escreve.
+
+        Os limites e todas as colunas são lidos entre as mesmas duas leituras de
+        `versao`; se uma escrita ocorreu no meio, a cópia é refeita.
+
+        Returns:
+            dict: Coluna -> array (start, confirm e OHLCV, no tipo armazenado).
+        """
+        while True:
+            versao = self.versao
+            if versao % 2:
+                continue
+            inicio, fim = self.inicio, self.fim
+            colunas = {coluna: getattr(self, coluna)[inicio:fim].copy() for coluna in COLUNAS}
+            if self.versao == versao:
+                return colunas
+
+    def _vela(self, i):
+        return Vela(
+            int(self.start[i]),
+            float(self.open[i]),
+            float(self.high[i]),
+            float(self.low[i]),
+            float(self.close[i]),
+            float(self.volume[i]),
+            bool(self.confirm[i]),
+        )
+
+    def _visao(self, inicio, fim):
+        """Série que compartilha as colunas (ex: `velas[:-1]`); válida até a próxima escrita."""
+        visao = SerieVelas.__new__(SerieVelas)
+        for atributo in self.__slots__:
+            setattr(visao, atributo, getattr(self, atributo))
+        visao.inicio, visao.fim = inicio, fim
+        return visao
+
+    def __len__(self):
+        return self.fim - self.inicio
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            inicio, fim, passo = indice.indices(len(self))
+            if passo == 1:
+                return self._visao(self.inicio + inicio, self.inicio + max(fim, inicio))
+            return [self._vela(self.inicio + i) for i in range(inicio, fim, passo)]
+        n = len(self)
+        if indice < 0:
+            indice += n
+        if not 0 <= indice < n:
+            raise IndexError("índice fora da série de velas")
+        return self._vela(self.inicio + indice)
+
+    def __iter__(self):
+        for i in range(self.inicio, self.fim):
+            yield self._vela(i)
+
+    def bytes(self):
+        """Memória ocupada pelas colunas e pelo objeto."""
+        return sys.getsizeof(self) + sum(
+            getattr(self, coluna).nbytes for coluna in COLUNAS
+        )
+
+
+class ArmazemVelas:
+    """
+    Velas de todos os pares, com a interface usada pelo WebSocketManager para
+    `data` (como um defaultdict: o par é criado no primeiro acesso).
+
+    Args:
+        maximo (int): Velas mantidas por par.
+        float32 (bool, optional): Preços em float32. Defaults to False.
+    """
+
+    def __init__(self, maximo, float32=False):
+        self.maximo = maximo
+        self.float32 = float32
+        self._series = []  # ID do par -> SerieVelas (ou None)
+
+    def __getitem__(self, symbol):
+        simbolo_id = SIMBOLOS.id(symbol)
+        if simbolo_id >= len(self._series):
+            self._series.extend([None] * (simbolo_id + 1 - len(self._series)))
+        serie = self._series[simbolo_id]
+        if serie is None:
+            serie = self._series[simbolo_id] = SerieVelas(self.maximo, self.float32)
+        return serie
+
+    def __setitem__(self, symbol, velas):
+        """Substitui as velas do par (ex: na restauração do checkpoint)."""
+        serie = SerieVelas(self.maximo, self.float32)
+        for vela in velas:
+            serie.adicionar(vela)
+        self[symbol]  # Garante a posição do par
+        self._series[SIMBOLOS.id(symbol)] = serie
+
+    def get(self, symbol, padrao=None):
+        simbolo_id = SIMBOLOS.id(symbol)
+        if simbolo_id < len(self._series) and self._series[simbolo_id] is not None:
+            return self._series[simbolo_id]
+        return padrao
+
+    def __contains__(self, symbol):
+        return self.get(symbol) is not None
+
+    def items(self):
+        return [
+            (SIMBOLOS.simbolo(i), serie) for i, serie in enumerate(self._series) if serie is not None
+        ]
+
+    def __len__(self):
+        return sum(serie is not None for serie in self._series)
+
+
+def tamanho_profundo(objeto, vistos=None):
+    """Tamanho aproximado (bytes) de um objeto e de tudo o que ele referencia."""
+    if vistos is None:
+        vistos = set()
+    if id(objeto) in vistos:
+        return 0
+    vistos.add(id(objeto))
+    if isinstance(objeto, np.ndarray):
+        return sys.getsizeof(objeto) + (objeto.nbytes if objeto.base is not None else 0)
+    if isinstance(objeto, SerieVelas):
+        return objeto.bytes()
+    tamanho = sys.getsizeof(objeto)
+    if isinstance(objeto, dict):
+        tamanho += sum(
+            tamanho_profundo(k, vistos) + tamanho_profundo(v, vistos) for k, v in objeto.items()
+        )
+    elif isinstance(objeto, (list, tuple, set, frozenset)):
+        tamanho += sum(tamanho_profundo(item, vistos) for item in objeto)
+    else:
+        if hasattr(objeto, "__dict__"):
+            tamanho += tamanho_profundo(vars(objeto), vistos)
+        for atributo in getattr(type(objeto), "__slots__", ()):
+            if hasattr(objeto, atributo):
+                tamanho += tamanho_profundo(getattr(objeto, atributo), vistos)
+    return tamanho
+
+
+def rss_bytes():
+    """RSS atual do processo (Linux), ou o pico, onde /proc não existe."""
+    try:
+        with open("/proc/self/statm") as arquivo:
+            return int(arquivo.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return pico if sys.platform == "darwin" else pico * 1024
+
+
+def relatorio_memoria(manager):
+    """
+    Memória por par de um WebSocketManager: velas e estado dos indicadores.
+
+    Returns:
+        dict: {"rss", "velas", "indicadores", "simbolos": {símbolo: {"velas", "indicadores"}}},
+        em bytes.
+    """
+    simbolos = {}
+    for symbol, velas in list(manager.data.items()):
+        simbolos[symbol] = {"velas": tamanho_profundo(velas), "indicadores": 0}
+    for symbol, estado in list(manager.estados.items()):
+        simbolos.setdefault(symbol, {"velas": 0})["indicadores"] = tamanho_profundo(estado)
+    return {
+        "rss": rss_bytes(),
+        "velas": sum(s["velas"] for s in simbolos.values()),
+        "indicadores": sum(s["indicadores"] for s in simbolos.values()),
+        "simbolos": simbolos,
+    }
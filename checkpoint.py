@@ -0,0 +1,284 @@
+# Arquivo checkpoint.py
+# Este arquivo contém os checkpoints do estado do scanner para reinícios rápidos:
+# - Salva periodicamente, de forma atômica e fora do caminho crítico, as velas de
+#   cada par e o estado dos indicadores incrementais em um arquivo binário compacto.
+# - Na inicialização, restaura o checkpoint e completa a lacuna com um pequeno
+#   backfill via REST, em paralelo para todos os pares.
+
+import json
+import os
+import struct
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from threading import Thread
+
+import numpy as np
+from loguru import logger
+
+from constants import CHECKPOINT_INTERVAL_S, CHECKPOINT_PATH
+from streaming_indicators import EstadoIndicadores
+from tick_aggregator import timeframe_em_segundos
+
+MAGICO = b"STBCKPT1"
+CABECALHO = struct.Struct("<8sI")  # mágico + tamanho do cabeçalho JSON
+COLUNAS = ("open", "high", "low", "close", "volume")
+
+
+def salvar_checkpoint(caminho, timeframe, velas_por_simbolo, estados):
+    """
+    Grava o checkpoint de forma atômica (arquivo temporário + fsync + rename).
+
+    Formato: mágico, cabeçalho JSON (pares, quantidade de velas e estado dos
+    indicadores) e, por par, as colunas start (int64) e OHLCV (float64).
+
+    Args:
+        caminho (str): Caminho do arquivo.
+        timeframe (str): Timeframe das velas.
+        velas_por_simbolo (dict): símbolo -> colunas ({"start", "open", ..., "volume"},
+            como `SerieVelas.copiar` ou `colunas_de_velas`).
+        estados (dict): símbolo -> estado de `EstadoIndicadores.estado()`.
+    """
+    simbolos = []
+    blocos = []
+    for symbol, colunas in velas_por_simbolo.items():
+        simbolos.append(
+            {"symbol": symbol, "n": len(colunas["start"]), "estado": estados.get(symbol)}
+        )
+        blocos.append(np.asarray(colunas["start"], dtype=np.int64).tobytes())
+        for coluna in COLUNAS:
+            blocos.append(np.asarray(colunas[coluna], dtype=np.float64).tobytes())
+
+    cabecalho = json.dumps(
+        {"versao": 1, "ts": time.time(), "timeframe": timeframe, "simbolos": simbolos}
+    ).encode()
+
+    if os.path.dirname(caminho):
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    temporario = f"{caminho}.tmp"
+    with open(temporario, "wb") as arquivo:
+        arquivo.write(CABECALHO.pack(MAGICO, len(cabecalho)))
+        arquivo.write(cabecalho)
+        for bloco in blocos:
+            arquivo.write(bloco)
+        arquivo.flush()
+        os.fsync(arquivo.fileno())
+    os.replace(temporario, caminho)
+
+
+def colunas_de_velas(velas):
+    """Colunas de uma lista de velas (dicts da Bybit), no formato de `salvar_checkpoint`."""
+    colunas = {"start": np.array([int(v["start"]) for v in velas], dtype=np.int64)}
+    for coluna in COLUNAS:
+        colunas[coluna] = np.array([float(v[coluna]) for v in velas], dtype=np.float64)
+    return colunas
+
+
+def carregar_checkpoint(caminho):
+    """
+    Lê um checkpoint gravado por `salvar_checkpoint`.
+
+    Returns:
+        tuple | None: (timeframe, velas_por_simbolo, estados, ts), ou None se o
+        arquivo não existir ou for inválido.
+    """
+    try:
+        with open(caminho, "rb") as arquivo:
+            dados = arquivo.read()
+    except OSError:
+        return None
+    if len(dados) < CABECALHO.size:
+        return None
+    magico, tamanho = CABECALHO.unpack_from(dados, 0)
+    if magico != MAGICO:
+        logger.warning(f"Checkpoint inválido ignorado: {caminho}")
+        return None
+
+    posicao = CABECALHO.size
+    cabecalho = json.loads(dados[posicao : posicao + tamanho])
+    posicao += tamanho
+
+    velas_por_simbolo, estados = {}, {}
+    for info in cabecalho["simbolos"]:
+        n = info["n"]
+        colunas = {}
+        for nome, tipo in (("start", "q"),) + tuple((c, "d") for c in COLUNAS):
+            coluna = array(tipo)
+            coluna.frombytes(dados[posicao : posicao + n * coluna.itemsize])
+            posicao += n * coluna.itemsize
+            colunas[nome] = coluna
+        velas_por_simbolo[info["symbol"]] = [
+            {**{nome: colunas[nome][i] for nome in colunas}, "confirm": True}
+            for i in range(n)
+        ]
+        if info.get("estado"):
+            estados[info["symbol"]] = info["estado"]
+    return cabecalho["timeframe"], velas_por_simbolo, estados, cabecalho["ts"]
+
+
+def buscar_velas_rest(exchange, symbol, timeframe, inicio_ms, limite):
+    """
+    Busca velas do par pela API REST da Bybit (v5 /market/kline), no mesmo
+    formato das mensagens de kline do WebSocket.
+    """
+    resposta = exchange.publicGetV5MarketKline(
+        {
+            "category": "linear",
+            "symbol": symbol,
+            "interval": timeframe,
+            "start": inicio_ms,
+            "limit": limite,
+        }
+    )
+    duracao_ms = timeframe_em_segundos(timeframe) * 1000
+    agora_ms = time.time() * 1000
+    velas = [
+        {
+            "start": int(linha[0]),
+            "open": float(linha[1]),
+            "high": float(linha[2]),
+            "low": float(linha[3]),
+            "close": float(linha[4]),
+            "volume": float(linha[5]),
+            "confirm": int(linha[0]) + duracao_ms <= agora_ms,
+        }
+        for linha in resposta["result"]["list"]
+    ]
+    return sorted(velas, key=lambda v: v["start"])
+
+
+class Checkpointer:
+    """Salva e restaura o estado de um WebSocketManager."""
+
+    def __init__(self, manager, caminho=CHECKPOINT_PATH, intervalo=CHECKPOINT_INTERVAL_S):
+        self.manager = manager
+        self.caminho = caminho
+        self.intervalo = intervalo
+        self.is_running = False
+
+    def salvar(self):
+        """
+        Copia as velas e os estados e grava o arquivo. As séries em colunas são
+        copiadas por `SerieVelas.copiar` (consistente com a escrita da thread do
+        WebSocket); as listas de dicts, por `list` (atômico no GIL).
+        """
+        inicio = time.perf_counter()
+        velas = {
+            symbol: v.copiar() if hasattr(v, "copiar") else colunas_de_velas(list(v))
+            for symbol, v in list(self.manager.data.items())
+            if v
+        }
+        estados = {symbol: e.estado() for symbol, e in list(self.manager.estados.items())}
+        salvar_checkpoint(self.caminho, self.manager.timeframe, velas, estados)
+        logger.debug(
+            f"Checkpoint de {len(velas)} pares salvo em {(time.perf_counter() - inicio) * 1000:.1f} ms"
+        )
+
+    def start(self):
+        self.is_running = True
+        Thread(target=self._executar, daemon=True).start()
+
+    def stop(self):
+        self.is_running = False
+        self.salvar()
+
+    def _executar(self):
+        while self.is_running:
+            time.sleep(self.intervalo)
+            try:
+                self.salvar()
+            except Exception as e:
+                logger.error(f"Erro ao salvar checkpoint: {e}")
+
+    def restaurar(self):
+        """
+        Restaura velas e estados do checkpoint, se for do mesmo timeframe e a
+        lacuna até agora couber no histórico mantido pelo manager.
+
+        Returns:
+            int: Quantidade de pares restaurados.
+        """
+        carregado = carregar_checkpoint(self.caminho)
+        if carregado is None:
+            return 0
+        timeframe, velas_por_simbolo, estados, ts = carregado
+        duracao = timeframe_em_segundos(self.manager.timeframe)
+        if timeframe != self.manager.timeframe:
+            logger.info("Checkpoint de outro timeframe ignorado.")
+            return 0
+        if (time.time() - ts) / duracao > self.manager.MAX_VELAS:
+            logger.info("Checkpoint antigo demais; o histórico será recarregado via REST.")
+            return 0
+
+        for symbol, velas in velas_por_simbolo.items():
+            estado = EstadoIndicadores()
+            if symbol in estados:
+                estado.restaurar(estados[symbol])
+                # Velas posteriores à última aplicada ao estado estavam em andamento
+                for vela in velas:
+                    vela["confirm"] = vela["start"] <= estado.ultimo_start
+            self.manager.data[symbol] = velas[-self.manager.MAX_VELAS :]
+            self.manager.estados[symbol] = estado
+            if self.manager.suporte_resistencia:
+                self.manager.suporte_resistencia.semear(symbol, velas)
+        logger.info(f"Checkpoint restaurado: {len(velas_por_simbolo)} pares.")
+        return len(velas_por_simbolo)
+
+    def completar_via_rest(self, symbols, exchange=None, max_threads=16):
+        """
+        Busca via REST as velas entre o checkpoint e agora (ou todo o histórico,
+        para pares sem checkpoint) e as aplica ao manager em ordem.
+
+        Aplica as velas na thread chamadora: use antes de conectar o WebSocket. Com a
+        conexão aberta, busque com `buscar_via_rest` e aplique com `aplicar_velas`
+        na thread do WebSocket (`WebSocketManager.agendar_tarefa`).
+
+        Args:
+            symbols (list): Pares a completar.
+            exchange (ccxt.bybit, optional): Cliente ccxt. Defaults to um cliente público.
+            max_threads (int, optional): Requisições simultâneas. Defaults to 16.
+        """
+        self.aplicar_velas(self.buscar_via_rest(symbols, exchange, max_threads))
+
+    def buscar_via_rest(self, symbols, exchange=None, max_threads=16):
+        """
+        Busca via REST as velas que faltam aos pares, sem alterar o manager.
+
+        Returns:
+            dict: símbolo -> velas, em ordem.
+        """
+        if exchange is None:
+            import ccxt
+
+            exchange = ccxt.bybit({"enableRateLimit": False})
+
+        duracao_ms = timeframe_em_segundos(self.manager.timeframe) * 1000
+        agora_ms = int(time.time() * 1000)
+
+        def buscar(symbol):
+            velas = self.manager.data.get(symbol)
+            inicio = velas[-1]["start"] if velas else agora_ms - duracao_ms * self.manager.MAX_VELAS
+            return buscar_velas_rest(
+                exchange, symbol, self.manager.timeframe, int(inicio), min(1000, self.manager.MAX_VELAS)
+            )
+
+        inicio = time.perf_counter()
+        velas_por_simbolo = {}
+        with ThreadPoolExecutor(max_workers=max_threads) as pool:
+            futuros = {pool.submit(buscar, symbol): symbol for symbol in symbols}
+            for futuro in as_completed(futuros):
+                symbol = futuros[futuro]
+                try:
+                    velas_por_simbolo[symbol] = futuro.result()
+                except Exception as e:
+                    logger.error(f"Erro no backfill REST de {symbol}: {e}")
+        logger.info(
+            f"Backfill REST de {len(symbols)} pares em {(time.perf_counter() - inicio) * 1000:.0f} ms"
+        )
+        return velas_por_simbolo
+
+    def aplicar_velas(self, velas_por_simbolo):
+        """Aplica ao manager as velas de `buscar_via_rest`."""
+        for symbol, velas in velas_por_simbolo.items():
+            for vela in velas:
+                self.manager.adicionar_vela(symbol, vela)
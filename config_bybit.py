@@ -2,6 +2,7 @@
 # Este arquivo contém a função `connect_bybit` que conecta à API da Bybit usando ccxt.
 
 import ccxt
+import ccxt.async_support as ccxt_async
 import os
 from dotenv import load_dotenv
 from loguru import logger
@@ -46,3 +47,41 @@ def connect_bybit(testnet=False, market_type="future"):
         f"Conectado à Bybit {'Testnet' if testnet else 'Produção'} - Mercado de {'Futuros' if market_type == 'future' else 'Spot'}"
     )
     return exchange, market_type
+
+
+def connect_bybit_async(testnet=False, market_type="future"):
+    """
+    Cria o cliente assíncrono (ccxt.async_support) da Bybit, usado pelo executor de ordens.
+
+    Args:
+        testnet (bool, optional): Define se a conexão será com a Testnet (True) ou Produção (False). Defaults to False.
+        market_type (str, optional): Define o tipo de mercado ("future" para Futuros, "spot" para Spot). Defaults to "future".
+
+    Returns:
+        ccxt.async_support.bybit: Objeto de exchange assíncrono da Bybit.
+        str: Tipo de mercado selecionado.
+    """
+    api_key = os.getenv("BYBIT_API_KEY")
+    api_secret = os.getenv("BYBIT_API_SECRET")
+
+    if not api_key or not api_secret:
+        raise ValueError(
+            "As chaves de API da Bybit (API_KEY e API_SECRET) devem ser fornecidas ou configuradas no arquivo .env."
+        )
+
+    exchange = ccxt_async.bybit(
+        {
+            "apiKey": api_key,
+            "secret": api_secret,
+            "enableRateLimit": True,
+            "options": {
+                "defaultType": market_type,
+            },
+        }
+    )
+    exchange.set_sandbox_mode(testnet)
+
+    logger.info(
+        f"Cliente assíncrono da Bybit criado ({'Testnet' if testnet else 'Produção'})"
+    )
+    return exchange, market_type
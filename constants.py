@@ -2,16 +2,17 @@
 import os
 
 
+# Limiares dos regimes de volatilidade (% no período de referência; volatility.py)
 VOLATILITY_THRESHOLDS = [
     float(x) for x in os.getenv("VOLATILITY_THRESHOLDS", "0.5,1.0,2.0").split(",")
 ]
 SMA_PERIODS = [int(x) for x in os.getenv("SMA_PERIODS", "50,30,20,10").split(",")]
 EMA_PERIODS = [int(x) for x in os.getenv("EMA_PERIODS", "20,15,12,5").split(",")]
 LEVERAGE_THRESHOLDS = [
-    int(x) for x in os.getenv("LEVERAGE_THRESHOLDS", "7,5,3").split(",")
+    int(x) for x in os.getenv("LEVERAGE_THRESHOLDS", "10,8,6").split(",")
 ]
 DEFAULT_LEVERAGE = os.getenv("DEFAULT_LEVERAGE", "3x")
-LEVERAGE_MULTIPLIERS = [os.getenv("LEVERAGE_MULTIPLIERS", "20x,10x,5x").split(",")]
+LEVERAGE_MULTIPLIERS = os.getenv("LEVERAGE_MULTIPLIERS", "20x,10x,5x").split(",")
 SL_DISTANCE_MULTIPLIERS = [
     float(x) for x in os.getenv("SL_DISTANCE_MULTIPLIERS", "0.02,0.01,0.005").split(",")
 ]
@@ -26,3 +27,177 @@ STOCHASTIC_OVERBOUGHT_THRESHOLD = int(
 )
 STOCHASTIC_OVERSOLD_THRESHOLD = int(os.getenv("STOCHASTIC_OVERSOLD_THRESHOLD", "20"))
 # -----------------------------------------------------------------------
+
+# --- EXECUÇÃO DE ORDENS ---
+TIMEFRAME = os.getenv("TIMEFRAME", "1")  # Intervalo do kline da Bybit (ex: "1", "15", "60")
+EXECUTION_DRY_RUN = os.getenv("EXECUTION_DRY_RUN", "true").lower() == "true"
+EXECUTION_NOTIONAL_USDT = float(os.getenv("EXECUTION_NOTIONAL_USDT", "50"))
+ORDER_LATENCY_BUDGET_MS = float(os.getenv("ORDER_LATENCY_BUDGET_MS", "100"))
+# -----------------------------------------------------------------------
+
+# --- GERENCIAMENTO DE RISCO ---
+RISK_MAX_EXPOSURE_SYMBOL_USDT = float(os.getenv("RISK_MAX_EXPOSURE_SYMBOL_USDT", "200"))
+RISK_MAX_EXPOSURE_TOTAL_USDT = float(os.getenv("RISK_MAX_EXPOSURE_TOTAL_USDT", "1000"))
+RISK_MAX_EXPOSURE_CLUSTER_USDT = float(os.getenv("RISK_MAX_EXPOSURE_CLUSTER_USDT", "400"))
+RISK_MAX_DAILY_LOSS_USDT = float(os.getenv("RISK_MAX_DAILY_LOSS_USDT", "100"))
+RISK_MAX_SIGNALS_PER_SYMBOL = int(os.getenv("RISK_MAX_SIGNALS_PER_SYMBOL", "3"))
+RISK_MAX_SIGNALS_TOTAL = int(os.getenv("RISK_MAX_SIGNALS_TOTAL", "20"))
+RISK_SIGNAL_WINDOW_S = int(os.getenv("RISK_SIGNAL_WINDOW_S", "3600"))
+# Validade da reserva de exposição de um sinal aprovado sem fill (ex: apenas alertas)
+RISK_RESERVATION_TTL_S = int(os.getenv("RISK_RESERVATION_TTL_S", "900"))
+# Grupos de pares correlacionados separados por ";" (ex: "BTCUSDT,ETHUSDT;SOLUSDT,XRPUSDT")
+CORRELATION_CLUSTERS = [
+    grupo.split(",")
+    for grupo in os.getenv("CORRELATION_CLUSTERS", "BTCUSDT,ETHUSDT;SOLUSDT,XRPUSDT").split(";")
+    if grupo
+]
+# -----------------------------------------------------------------------
+
+# --- DIÁRIO DE SINAIS E OPERAÇÕES ---
+JOURNAL_ENABLED = os.getenv("JOURNAL_ENABLED", "true").lower() == "true"
+JOURNAL_PATH = os.getenv("JOURNAL_PATH", "data/journal.db")
+JOURNAL_BATCH_SIZE = int(os.getenv("JOURNAL_BATCH_SIZE", "500"))
+JOURNAL_FLUSH_INTERVAL_S = float(os.getenv("JOURNAL_FLUSH_INTERVAL_S", "1.0"))
+# -----------------------------------------------------------------------
+
+# --- MONITORAMENTO (DASHBOARD) ---
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+METRICS_SHM_NAME = os.getenv("METRICS_SHM_NAME", "smarttradingbot_metrics")
+METRICS_SHM_SIZE = int(os.getenv("METRICS_SHM_SIZE", str(4 * 1024 * 1024)))
+METRICS_PUBLISH_INTERVAL_S = float(os.getenv("METRICS_PUBLISH_INTERVAL_S", "1.0"))
+# Sem publicação por mais que isso, o dashboard considera o bot parado e reabre o segmento
+METRICS_STALE_AFTER_S = float(os.getenv("METRICS_STALE_AFTER_S", "5.0"))
+# -----------------------------------------------------------------------
+
+# --- INICIALIZAÇÃO ---
+SYMBOL_CACHE_PATH = os.getenv("SYMBOL_CACHE_PATH", "cache/symbols.json")
+# -----------------------------------------------------------------------
+
+# --- AGREGAÇÃO DE NEGÓCIOS (publicTrade) ---
+# Origem das velas: "kline" (velas da Bybit) ou "trades" (velas montadas localmente)
+CANDLE_SOURCE = os.getenv("CANDLE_SOURCE", "kline")
+TICK_AGGREGATION_ENABLED = os.getenv("TICK_AGGREGATION_ENABLED", "false").lower() == "true"
+TICK_BUFFER_CAPACITY = int(os.getenv("TICK_BUFFER_CAPACITY", "20000"))
+VOLUME_PROFILE_WINDOW_S = int(os.getenv("VOLUME_PROFILE_WINDOW_S", "3600"))
+VOLUME_PROFILE_BUCKET_PCT = float(os.getenv("VOLUME_PROFILE_BUCKET_PCT", "0.05"))
+# -----------------------------------------------------------------------
+
+# --- CHECKPOINTS (reinício rápido) ---
+CHECKPOINT_ENABLED = os.getenv("CHECKPOINT_ENABLED", "true").lower() == "true"
+CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", "cache/checkpoint.bin")
+CHECKPOINT_INTERVAL_S = int(os.getenv("CHECKPOINT_INTERVAL_S", "60"))
+# -----------------------------------------------------------------------
+
+# --- KERNELS NUMÉRICOS ---
+# "auto" usa o Numba quando instalado; "numpy" força a versão em NumPy puro
+KERNELS_BACKEND = os.getenv("KERNELS_BACKEND", "auto")
+NUMBA_CACHE_DIR = os.getenv("NUMBA_CACHE_DIR", "cache/numba")
+# -----------------------------------------------------------------------
+
+# --- CAPTURA DE MERCADO (frames brutos do WebSocket) ---
+CAPTURE_ENABLED = os.getenv("CAPTURE_ENABLED", "false").lower() == "true"
+CAPTURE_DIR = os.getenv("CAPTURE_DIR", "data/capture")
+CAPTURE_CODEC = os.getenv("CAPTURE_CODEC", "zstd")  # "zstd", "lz4" ou "zlib"
+CAPTURE_BUFFER_SIZE = int(os.getenv("CAPTURE_BUFFER_SIZE", "200000"))
+CAPTURE_BLOCK_BYTES = int(os.getenv("CAPTURE_BLOCK_BYTES", str(1024 * 1024)))
+# -----------------------------------------------------------------------
+
+# --- SENTIMENTO (tópico tickers: funding, open interest e basis) ---
+TICKER_FEATURES_ENABLED = os.getenv("TICKER_FEATURES_ENABLED", "false").lower() == "true"
+TICKER_SAMPLE_S = int(os.getenv("TICKER_SAMPLE_S", "60"))  # Intervalo entre amostras
+OI_DELTA_WINDOW = int(os.getenv("OI_DELTA_WINDOW", "15"))  # Amostras (15 min)
+FUNDING_ZSCORE_WINDOW = int(os.getenv("FUNDING_ZSCORE_WINDOW", "1440"))  # Amostras (24 h)
+OI_DELTA_THRESHOLD_PCT = float(os.getenv("OI_DELTA_THRESHOLD_PCT", "1.0"))
+FUNDING_ZSCORE_THRESHOLD = float(os.getenv("FUNDING_ZSCORE_THRESHOLD", "2.0"))
+BASIS_THRESHOLD_PCT = float(os.getenv("BASIS_THRESHOLD_PCT", "0.1"))
+# -----------------------------------------------------------------------
+
+# --- PONTUAÇÃO POR APRENDIZADO DE MÁQUINA ---
+# Com ML_ENABLED, as features de cada vela confirmada são registradas no diário
+# (para o treino) e, havendo modelo em ML_MODEL_PATH, combinadas com as regras
+ML_ENABLED = os.getenv("ML_ENABLED", "false").lower() == "true"
+ML_MODEL_PATH = os.getenv("ML_MODEL_PATH", "models/ml_model.npz")
+ML_WEIGHT = float(os.getenv("ML_WEIGHT", "0.5"))  # Peso do modelo na pontuação
+ML_MIN_SCORE = float(os.getenv("ML_MIN_SCORE", "0.55"))
+ML_BUDGET_MS = float(os.getenv("ML_BUDGET_MS", "20"))  # Orçamento por lote (vela)
+ML_COLLECT_MS = int(os.getenv("ML_COLLECT_MS", "1500"))  # Espera pelas velas dos demais pares
+# -----------------------------------------------------------------------
+
+# --- LOGS ---
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")  # Console
+LOG_FILE = os.getenv("LOG_FILE", "logs/bot_trading.log")
+LOG_FILE_LEVEL = os.getenv("LOG_FILE_LEVEL", "INFO")
+LOG_JSON = os.getenv("LOG_JSON", "false").lower() == "true"  # Arquivo em JSON Lines compacto
+# Máximo de mensagens repetitivas (sinais, bloqueios, erros) por par e por minuto
+LOG_RATE_LIMIT_PER_MIN = int(os.getenv("LOG_RATE_LIMIT_PER_MIN", "6"))
+# -----------------------------------------------------------------------
+
+# --- ROTEAMENTO DE ALERTAS (vários chats/canais do Telegram) ---
+# Sem ALERT_ROUTING_ENABLED, os alertas vão apenas para TELEGRAM_CHAT_ID
+ALERT_ROUTING_ENABLED = os.getenv("ALERT_ROUTING_ENABLED", "false").lower() == "true"
+ALERT_SUBSCRIBERS_PATH = os.getenv("ALERT_SUBSCRIBERS_PATH", "config/assinantes.json")
+ALERT_RATE_PER_S = float(os.getenv("ALERT_RATE_PER_S", "25"))  # Limite global de envios
+ALERT_CHAT_INTERVAL_S = float(os.getenv("ALERT_CHAT_INTERVAL_S", "1.0"))  # Por chat
+ALERT_QUEUE_SIZE = int(os.getenv("ALERT_QUEUE_SIZE", "10000"))
+# -----------------------------------------------------------------------
+
+# --- PRÉ-FILTRO (avaliação em dois níveis) ---
+# Nível 1: features O(1) dos indicadores incrementais; apenas os pares aprovados
+# passam pela pilha completa de identify_entries/calculate_tp_sl
+PREFILTER_ENABLED = os.getenv("PREFILTER_ENABLED", "true").lower() == "true"
+# Folga (pontos de RSI) sobre os limiares de entrada (30/70), cobrindo a diferença
+# entre o RSI incremental e o recalculado na janela de velas
+PREFILTER_RSI_MARGIN = float(os.getenv("PREFILTER_RSI_MARGIN", "5"))
+# Volume da vela / volume médio mínimo (0 desativa; acima de 0 pode descartar sinais)
+PREFILTER_MIN_VOLUME_RATIO = float(os.getenv("PREFILTER_MIN_VOLUME_RATIO", "0"))
+# Auditoria: 1 a cada N pares reprovados passa pela avaliação completa (0 desativa)
+PREFILTER_AUDIT_EVERY = int(os.getenv("PREFILTER_AUDIT_EVERY", "0"))
+# -----------------------------------------------------------------------
+
+# --- ARMAZENAMENTO DE VELAS ---
+# "array": colunas NumPy por par (candle_store.py); "dict": listas de dicts da Bybit
+CANDLE_STORE_MODE = os.getenv("CANDLE_STORE_MODE", "array")
+# Preços em float32 no modo "array" (metade da memória; precisão de ~7 dígitos)
+CANDLE_STORE_FLOAT32 = os.getenv("CANDLE_STORE_FLOAT32", "false").lower() == "true"
+# -----------------------------------------------------------------------
+
+# --- AGENDADOR DE VELAS ---
+# Avalia cada par uma vez por vela, em lote, quando todas as confirmações chegam
+# ou o prazo após o fechamento termina (sem ele, avalia a cada atualização recebida)
+BAR_SCHEDULER_ENABLED = os.getenv("BAR_SCHEDULER_ENABLED", "true").lower() == "true"
+BAR_DEADLINE_MS = int(os.getenv("BAR_DEADLINE_MS", "3000"))  # Após o fechamento da vela
+# -----------------------------------------------------------------------
+
+# --- PAPER TRADING (posições virtuais a partir dos alertas) ---
+PAPER_TRADING_ENABLED = os.getenv("PAPER_TRADING_ENABLED", "false").lower() == "true"
+PAPER_NOTIONAL_USDT = float(os.getenv("PAPER_NOTIONAL_USDT", os.getenv("EXECUTION_NOTIONAL_USDT", "50")))
+PAPER_FEE_PCT = float(os.getenv("PAPER_FEE_PCT", "0.055"))  # Taxa por lado (taker da Bybit)
+# -----------------------------------------------------------------------
+
+# --- VOLATILIDADE (retornos logarítmicos, comparável entre pares) ---
+# Horizontes da volatilidade realizada (velas); o primeiro define o regime do TP/SL
+VOLATILITY_HORIZONS = [int(x) for x in os.getenv("VOLATILITY_HORIZONS", "20,60,240").split(",")]
+# Período de referência (s) em que a volatilidade é expressa (σ por vela × √velas)
+VOLATILITY_REFERENCE_S = int(os.getenv("VOLATILITY_REFERENCE_S", "3600"))
+VOLATILITY_ATR_PERIOD = int(os.getenv("VOLATILITY_ATR_PERIOD", "14"))
+# -----------------------------------------------------------------------
+
+# --- SUPORTES E RESISTÊNCIAS (pivôs e livro de ofertas) ---
+# Com SR_ENABLED, os TPs recuam até o último suporte/resistência antes deles
+# (sem ele, o ajuste usa apenas a SMA de 200)
+SR_ENABLED = os.getenv("SR_ENABLED", "false").lower() == "true"
+SR_PIVOT_BARS = int(os.getenv("SR_PIVOT_BARS", "3"))  # Velas de cada lado do pivô
+SR_CLUSTER_PCT = float(os.getenv("SR_CLUSTER_PCT", "0.15"))  # Agrupamento dos pivôs (% do preço)
+SR_MAX_LEVELS = int(os.getenv("SR_MAX_LEVELS", "50"))  # Níveis por par
+# Livro de ofertas local (tópico orderbook): paredes de liquidez viram níveis
+SR_ORDERBOOK_ENABLED = os.getenv("SR_ORDERBOOK_ENABLED", "false").lower() == "true"
+SR_ORDERBOOK_DEPTH = int(os.getenv("SR_ORDERBOOK_DEPTH", "50"))  # 1, 50, 200 ou 500
+SR_WALL_FACTOR = float(os.getenv("SR_WALL_FACTOR", "5"))  # × quantidade mediana do lado
+# -----------------------------------------------------------------------
+
+# --- AVALIAÇÃO INTRABAR (sinais provisórios antes do fechamento da vela) ---
+# Reavalia os pares nas atualizações da vela em andamento; o sinal sai marcado
+# como provisório e é confirmado (ou cancelado) no fechamento da vela
+INTRABAR_ENABLED = os.getenv("INTRABAR_ENABLED", "false").lower() == "true"
+INTRABAR_THROTTLE_S = float(os.getenv("INTRABAR_THROTTLE_S", "10"))  # Por par
+# -----------------------------------------------------------------------
@@ -0,0 +1,80 @@
+# Arquivo dashboard.py
+# Este arquivo contém o dashboard de monitoramento em tempo real (Dash).
+# Lê os snapshots publicados pelo bot em memória compartilhada (metrics.py),
+# sem acessar os logs, e atualiza as tabelas a cada segundo.
+# Uso: python dashboard.py (o bot, com METRICS_ENABLED=true, pode ser iniciado depois)
+
+import os
+
+from dash import Dash, Input, Output, dash_table, dcc, html
+
+from metrics import SnapshotReader
+
+COLUNAS_SIMBOLOS = ["symbol", "preco", "sinal", "forca", "rsi", "adx", "atualizado"]
+
+
+def _tabela(id_tabela, colunas):
+    return dash_table.DataTable(
+        id=id_tabela,
+        columns=[{"name": c, "id": c} for c in colunas],
+        sort_action="native",
+        filter_action="native",
+        page_size=50,
+    )
+
+
+def criar_app(reader=None):
+    """
+    Cria o app Dash.
+
+    Args:
+        reader (SnapshotReader, optional): Leitor do snapshot de métricas.
+
+    Returns:
+        dash.Dash: Aplicação pronta para `run`.
+    """
+    reader = reader or SnapshotReader()
+    app = Dash(__name__, title="SmartTradingBot")
+    app.layout = html.Div(
+        [
+            html.H2("SmartTradingBot - Monitoramento"),
+            html.Div(id="status"),
+            html.H3("Latências (ms)"),
+            _tabela("latencias", ["nome", "amostras", "p50", "p99", "max"]),
+            html.H3("Posições abertas"),
+            _tabela("posicoes", ["symbol", "side", "size", "entryPrice", "stopLoss"]),
+            html.H3("Pares"),
+            _tabela("simbolos", COLUNAS_SIMBOLOS),
+            dcc.Interval(id="intervalo", interval=1000),
+        ]
+    )
+
+    @app.callback(
+        Output("status", "children"),
+        Output("latencias", "data"),
+        Output("posicoes", "data"),
+        Output("simbolos", "data"),
+        Input("intervalo", "n_intervals"),
+    )
+    def atualizar(_):
+        snapshot = reader.ler()
+        if snapshot is None:
+            if not reader.conectado:
+                return "Aguardando o bot (nova tentativa a cada segundo)...", [], [], []
+            return "Aguardando métricas do bot...", [], [], []
+        latencias = [{"nome": nome, **dados} for nome, dados in snapshot["latencias"].items()]
+        posicoes = list(snapshot["posicoes"].values())
+        simbolos = [
+            {"symbol": symbol, **{c: dados.get(c) for c in COLUNAS_SIMBOLOS[1:]}}
+            for symbol, dados in sorted(snapshot["simbolos"].items())
+        ]
+        return f"{len(simbolos)} pares monitorados", latencias, posicoes, simbolos
+
+    return app
+
+
+if __name__ == "__main__":
+    criar_app().run(
+        host=os.getenv("DASHBOARD_HOST", "127.0.0.1"),
+        port=int(os.getenv("DASHBOARD_PORT", "8050")),
+    )
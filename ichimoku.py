@@ -22,18 +22,21 @@ def calculate_ichimoku(high_prices, low_prices):
         - chikou_span: Preço de fechamento atual, projetado 26 períodos para trás.
     """
 
+    # Preço médio de cada vela, calculado uma única vez para as três médias
+    hl2 = (np.asarray(high_prices, dtype=float) + np.asarray(low_prices, dtype=float)) / 2
+
     # Tenkan-sen (Conversion Line): Média móvel de 9 períodos
-    tenkan_sen = talib.SMA(np.array(high_prices + low_prices) / 2, timeperiod=9)
+    tenkan_sen = talib.SMA(hl2, timeperiod=9)
 
     # Kijun-sen (Base Line): Média móvel de 26 períodos
-    kijun_sen = talib.SMA(np.array(high_prices + low_prices) / 2, timeperiod=26)
+    kijun_sen = talib.SMA(hl2, timeperiod=26)
 
     # Senkou Span A (Leading Span A): Média da Tenkan-sen e Kijun-sen, projetada 26 períodos à frente
     senkou_span_a = (tenkan_sen + kijun_sen) / 2
     senkou_span_a = np.roll(senkou_span_a, 26)
 
     # Senkou Span B (Leading Span B): Média móvel de 52 períodos, projetada 26 períodos à frente
-    senkou_span_b = talib.SMA(np.array(high_prices + low_prices) / 2, timeperiod=52)
+    senkou_span_b = talib.SMA(hl2, timeperiod=52)
     senkou_span_b = np.roll(senkou_span_b, 26)
 
     # Chikou Span (Lagging Span): Preço de fechamento atual, projetado 26 períodos para trás
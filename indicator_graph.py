@@ -0,0 +1,360 @@
+# Arquivo indicator_graph.py
+# Este arquivo contém o registro de indicadores e o planejador do grafo de cálculo.
+# Cada indicador declara as suas entradas (séries OHLCV ou outros indicadores), os
+# parâmetros e o lookback. O planejador monta um grafo acíclico a partir dos
+# indicadores pedidos, unifica os nós idênticos (ex: a SMA(20) usada pelo sinal e
+# pelas Bandas de Bollinger) e avalia cada nó uma única vez por vela.
+
+import numpy as np
+import talib
+
+from indicators import calculate_ema, calculate_rsi, calculate_vwap
+
+# Séries de entrada fornecidas por vela
+SERIES = ("open", "high", "low", "close", "volume")
+
+
+class Indicador:
+    """
+    Definição de um indicador registrado.
+
+    Args:
+        nome (str): Nome do indicador no registro.
+        funcao (callable): Recebe as entradas resolvidas e os parâmetros (por nome).
+        entradas (callable): parâmetros -> {argumento: referência}, onde a referência
+            é o nome de uma série (ex: "close") ou (nome_indicador, parâmetros).
+        parametros (dict): Parâmetros padrão.
+        lookback (callable): parâmetros -> velas necessárias além das entradas.
+    """
+
+    def __init__(self, nome, funcao, entradas, parametros, lookback):
+        self.nome = nome
+        self.funcao = funcao
+        self.entradas = entradas
+        self.parametros = parametros
+        self.lookback = lookback
+
+
+REGISTRO = {}
+
+
+def registrar(nome, entradas, lookback=lambda p: 0, **parametros):
+    """
+    Decorador que registra um indicador.
+
+    Exemplo:
+        @registrar("obv", entradas=lambda p: {"close": "close", "volume": "volume"})
+        def _obv(close, volume): ...
+    """
+
+    def decorador(funcao):
+        REGISTRO[nome] = Indicador(nome, funcao, entradas, parametros, lookback)
+        return funcao
+
+    return decorador
+
+
+def _fonte(fonte):
+    """Referência para uma série base ou para um indicador derivado sem parâmetros."""
+    return fonte if fonte in SERIES else (fonte, {})
+
+
+# --- Indicadores registrados ---
+
+
+@registrar("hl2", entradas=lambda p: {"high": "high", "low": "low"})
+def _hl2(high, low):
+    return (high + low) / 2
+
+
+@registrar(
+    "sma",
+    entradas=lambda p: {"valores": _fonte(p["fonte"])},
+    lookback=lambda p: p["periodo"],
+    fonte="close",
+    periodo=20,
+)
+def _sma(valores, fonte, periodo):
+    if valores.size < periodo:
+        # Como calculate_sma: média de todos os valores disponíveis
+        return np.full(valores.size, valores.mean() if valores.size else np.nan)
+    return talib.SMA(valores, timeperiod=periodo)
+
+
+@registrar(
+    "ema",
+    entradas=lambda p: {"valores": _fonte(p["fonte"])},
+    lookback=lambda p: p["periodo"],
+    fonte="close",
+    periodo=20,
+)
+def _ema(valores, fonte, periodo):
+    return np.asarray(calculate_ema(valores, periodo), dtype=float)
+
+
+@registrar(
+    "macd",
+    entradas=lambda p: {
+        "ema_rapida": ("ema", {"periodo": p["rapida"]}),
+        "ema_lenta": ("ema", {"periodo": p["lenta"]}),
+    },
+    lookback=lambda p: p["sinal"],
+    rapida=12,
+    lenta=26,
+    sinal=9,
+)
+def _macd(ema_rapida, ema_lenta, rapida, lenta, sinal):
+    """Retorna (linha MACD, último valor do sinal), como calculate_macd."""
+    if ema_lenta.size < lenta:
+        return np.full(ema_lenta.size, np.nan), np.nan
+    linha = ema_rapida - ema_lenta
+    return linha, calculate_ema(linha, min(sinal, linha.size))[-1]
+
+
+@registrar(
+    "bollinger",
+    entradas=lambda p: {"close": "close", "media": ("sma", {"periodo": p["periodo"]})},
+    periodo=20,
+    desvios=2,
+)
+def _bollinger(close, media, periodo, desvios):
+    """Retorna (banda superior, banda inferior) da última vela, como calculate_bollinger_bands."""
+    if close.size < periodo:
+        return np.nan, np.nan
+    desvio = np.std(close[-periodo:])
+    return media[-1] + desvio * desvios, media[-1] - desvio * desvios
+
+
+@registrar("rsi", entradas=lambda p: {"close": "close"}, lookback=lambda p: p["periodo"] + 1, periodo=14)
+def _rsi(close, periodo):
+    return np.asarray(calculate_rsi(close, periodo), dtype=float)
+
+
+@registrar(
+    "vwap",
+    entradas=lambda p: {"close": "close", "volume": "volume"},
+    lookback=lambda p: p["periodo"],
+    periodo=20,
+)
+def _vwap(close, volume, periodo):
+    return np.asarray(calculate_vwap(close, volume, periodo), dtype=float)
+
+
+@registrar(
+    "atr",
+    entradas=lambda p: {"high": "high", "low": "low", "close": "close"},
+    lookback=lambda p: p["periodo"] + 1,
+    periodo=14,
+)
+def _atr(high, low, close, periodo):
+    return talib.ATR(high, low, close, timeperiod=periodo)
+
+
+@registrar(
+    "adx",
+    entradas=lambda p: {"high": "high", "low": "low", "close": "close"},
+    lookback=lambda p: 2 * p["periodo"],
+    periodo=14,
+)
+def _adx(high, low, close, periodo):
+    return talib.ADX(high, low, close, timeperiod=periodo)
+
+
+@registrar(
+    "estocastico",
+    entradas=lambda p: {"high": "high", "low": "low", "close": "close"},
+    lookback=lambda p: p["periodo"] + 4,
+    periodo=14,
+)
+def _estocastico(high, low, close, periodo):
+    """Retorna (%K, %D), como calculate_stochastic."""
+    return talib.STOCH(
+        high,
+        low,
+        close,
+        fastk_period=periodo,
+        slowk_period=3,
+        slowk_matype=0,
+        slowd_period=3,
+        slowd_matype=0,
+    )
+
+
+@registrar(
+    "ichimoku",
+    entradas=lambda p: {
+        "tenkan_sen": ("sma", {"fonte": "hl2", "periodo": p["tenkan"]}),
+        "kijun_sen": ("sma", {"fonte": "hl2", "periodo": p["kijun"]}),
+        "span_b": ("sma", {"fonte": "hl2", "periodo": p["senkou_b"]}),
+        "low": "low",
+    },
+    lookback=lambda p: p["deslocamento"],
+    tenkan=9,
+    kijun=26,
+    senkou_b=52,
+    deslocamento=26,
+)
+def _ichimoku(tenkan_sen, kijun_sen, span_b, low, tenkan, kijun, senkou_b, deslocamento):
+    """Mesmas linhas de calculate_ichimoku, a partir das médias do hl2 já calculadas."""
+    return {
+        "tenkan_sen": tenkan_sen,
+        "kijun_sen": kijun_sen,
+        "senkou_span_a": np.roll((tenkan_sen + kijun_sen) / 2, deslocamento),
+        "senkou_span_b": np.roll(span_b, deslocamento),
+        "chikou_span": np.roll(low, -deslocamento),
+    }
+
+
+@registrar(
+    "sar",
+    entradas=lambda p: {"high": "high", "low": "low"},
+    lookback=lambda p: 2,
+    aceleracao=0.02,
+    maximo=0.2,
+)
+def _sar(high, low, aceleracao, maximo):
+    """Parabolic SAR."""
+    return talib.SAR(high, low, acceleration=aceleracao, maximum=maximo)
+
+
+@registrar("obv", entradas=lambda p: {"close": "close", "volume": "volume"}, lookback=lambda p: 1)
+def _obv(close, volume):
+    """On-Balance Volume."""
+    return talib.OBV(close, volume)
+
+
+# --- Planejamento e avaliação ---
+
+
+def _chave(nome, parametros):
+    """Identidade de um nó: nome + parâmetros completos (com os padrões aplicados)."""
+    indicador = REGISTRO[nome]
+    completos = {**indicador.parametros, **parametros}
+    return nome, tuple(sorted(completos.items()))
+
+
+class PlanoIndicadores:
+    """
+    Grafo de cálculo para um conjunto de indicadores pedidos.
+
+    Args:
+        pedidos (dict): apelido -> nome do indicador ou (nome, parâmetros).
+            Ex: {"sma": ("sma", {"periodo": 20}), "bollinger": "bollinger"}.
+    """
+
+    def __init__(self, pedidos):
+        self.pedidos = {}
+        self.ordem = []  # Nós em ordem topológica (dependências antes)
+        self.dependencias = {}  # chave -> {argumento: chave ou série}
+        self._lookbacks = {}
+        for apelido, pedido in pedidos.items():
+            nome, parametros = (pedido, {}) if isinstance(pedido, str) else pedido
+            self.pedidos[apelido] = self._planejar(nome, parametros, set())
+        self.lookback = max((self._lookbacks[c] for c in self.pedidos.values()), default=0)
+
+    def _planejar(self, nome, parametros, visitando):
+        if nome not in REGISTRO:
+            raise KeyError(f"Indicador não registrado: {nome}")
+        chave = _chave(nome, parametros)
+        if chave in self.dependencias:
+            return chave  # Nó idêntico já planejado
+        if chave in visitando:
+            raise ValueError(f"Dependência circular em {nome}")
+        visitando.add(chave)
+
+        indicador = REGISTRO[nome]
+        completos = dict(chave[1])
+        entradas = {}
+        lookback_entradas = 0
+        for argumento, referencia in indicador.entradas(completos).items():
+            if isinstance(referencia, str):
+                entradas[argumento] = referencia
+            else:
+                dependencia = self._planejar(*referencia, visitando)
+                entradas[argumento] = dependencia
+                lookback_entradas = max(lookback_entradas, self._lookbacks[dependencia])
+
+        visitando.discard(chave)
+        self.dependencias[chave] = entradas
+        self._lookbacks[chave] = lookback_entradas + indicador.lookback(completos)
+        self.ordem.append(chave)
+        return chave
+
+    def avaliar(self, series):
+        """
+        Avalia o grafo para uma vela.
+
+        Args:
+            series (dict): Séries de entrada ("open", "high", "low", "close", "volume")
+                como arrays float64.
+
+        Returns:
+            dict: apelido -> valor do indicador.
+        """
+        valores = {}
+        for chave in self.ordem:
+            nome, parametros = chave
+            argumentos = {
+                argumento: series[ref] if isinstance(ref, str) else valores[ref]
+                for argumento, ref in self.dependencias[chave].items()
+            }
+            valores[chave] = REGISTRO[nome].funcao(**argumentos, **dict(parametros))
+        return {apelido: valores[chave] for apelido, chave in self.pedidos.items()}
+
+    def __len__(self):
+        return len(self.ordem)
+
+
+class AvaliadorIndicadores:
+    """
+    Avalia um plano por par/timeframe, memorizando o resultado da última vela:
+    chamadas repetidas para a mesma vela reutilizam o cálculo.
+    """
+
+    def __init__(self, plano):
+        self.plano = plano
+        self._ultimos = {}  # (símbolo, timeframe) -> (chave da vela, valores)
+
+    def avaliar(self, symbol, timeframe, velas):
+        """
+        Args:
+            symbol (str): Par.
+            timeframe (str): Timeframe das velas.
+            velas (list | SerieVelas): Velas no formato da Bybit (dicts com OHLCV e
+                "start") ou a série compacta do par.
+
+        Returns:
+            tuple: (séries OHLCV como arrays, valores dos indicadores por apelido).
+        """
+        ultima = velas[-1]
+        chave_vela = (ultima["start"], ultima["close"], ultima["volume"], len(velas))
+        memorizado = self._ultimos.get((symbol, timeframe))
+        if memorizado and memorizado[0] == chave_vela:
+            return memorizado[1], memorizado[2]
+
+        if hasattr(velas, "series"):  # SerieVelas (candle_store.py): colunas prontas
+            series = velas.series()
+        else:
+            series = {
+                nome: np.fromiter((float(v[nome]) for v in velas), dtype=float, count=len(velas))
+                for nome in SERIES
+            }
+        valores = self.plano.avaliar(series)
+        self._ultimos[(symbol, timeframe)] = (chave_vela, series, valores)
+        return series, valores
+
+
+# Indicadores usados pelo scanner (identify_entries + TP/SL)
+PEDIDOS_SCANNER = {
+    "sma": ("sma", {"periodo": 20}),
+    "ema": ("ema", {"periodo": 20}),
+    "rsi": ("rsi", {"periodo": 14}),
+    "macd": "macd",
+    "bollinger": ("bollinger", {"periodo": 20}),
+    "vwap": ("vwap", {"periodo": 20}),
+    "adx": ("adx", {"periodo": 14}),
+    "estocastico": ("estocastico", {"periodo": 14}),
+    "ichimoku": "ichimoku",
+    "atr": ("atr", {"periodo": 14}),
+    "sma_longa": ("sma", {"periodo": 200}),
+}
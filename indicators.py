@@ -7,6 +7,9 @@
 import numpy as np
 import talib
 
+from kernels import ema as ema_kernel, rsi_wilder, vwap_movel
+from volatility import volatilidade_realizada
+
 # Função para calcular a média móvel simples (SMA)
 
 
@@ -25,11 +28,8 @@ def calculate_ema(prices, period):
     if len(prices) < period:
         # Retorna a média de todos os preços disponíveis
         return [sum(prices) / len(prices)] * len(prices) if len(prices) > 0 else []
-    ema = [prices[0]]
-    k = 2 / (period + 1)
-    for i in range(1, len(prices)):
-        ema.append(prices[i] * k + ema[i - 1] * (1 - k))
-    return ema
+    # Recursão com semente no primeiro preço (kernel compilado quando disponível)
+    return ema_kernel(prices, period)
 
 
 # Função para calcular o MACD
@@ -52,46 +52,15 @@ def calculate_macd(prices, fast_period=12, slow_period=26, signal_period=9):
     return macd_line, signal_line
 
 
-# Função para calcular o RSI
+# Função para calcular o RSI (suavização de Wilder)
 def calculate_rsi(prices, period):
-    if len(prices) < period:
+    if len(prices) <= period:
         # Retorna um valor neutro quando não há dados suficientes
         return [50.0] * len(prices) if len(prices) > 0 else []
-
-    gains = []
-    losses = []
-
-    for i in range(1, len(prices)):
-        delta = prices[i] - prices[i - 1]
-        gains.append(max(delta, 0))
-        losses.append(max(-delta, 0))
-
-    avg_gain = (
-        sum(gains[:period]) / period
-        if len(gains) >= period
-        else sum(gains) / len(gains) if len(gains) > 0 else 0
-    )
-    avg_loss = (
-        sum(losses[:period]) / period
-        if len(losses) >= period
-        else sum(losses) / len(losses) if len(losses) > 0 else 0
-    )
-
-    # Evitar divisão por zero
-    if avg_loss == 0:
-        if avg_gain == 0:
-            return [50.0] * len(
-                prices
-            )  # Retorna neutro se não houver ganhos nem perdas
-        else:
-            return [100.0] * len(prices)  # Retorna 100 se houver ganhos e nenhuma perda
-
-    rs = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
-
-    return [rsi] * len(
-        prices
-    )  # Retorna uma lista com o mesmo valor para manter a consistência
+    rsi = rsi_wilder(prices, period)
+    # As primeiras posições não têm médias completas: usa o primeiro RSI válido
+    rsi[:period] = rsi[period]
+    return rsi
 
 
 # Função para calcular as Bandas de Bollinger
@@ -106,9 +75,10 @@ def calculate_bollinger_bands(prices, period=20, std_dev=2):
     return upper_band, lower_band
 
 
-# Função para calcular a volatilidade
-def calculate_volatility(prices):
-    return np.std(prices)
+# Função para calcular a volatilidade: desvio dos retornos logarítmicos (EWMA), em %
+# no período de referência, comparável entre pares (veja volatility.py)
+def calculate_volatility(prices, segundos_vela=None):
+    return volatilidade_realizada(prices, segundos_vela)
 
 
 def calculate_vwap(prices, volumes, period=20):
@@ -116,17 +86,7 @@ def calculate_vwap(prices, volumes, period=20):
         # Retorna valores que não afetam a análise quando não há dados suficientes
         return [np.nan] * len(prices)
 
-    vwap_values = []
-    for i in range(period - 1, len(prices)):
-        pv = [prices[j] * volumes[j] for j in range(i - period + 1, i + 1)]
-        soma_volumes = sum(volumes[i - period + 1 : i + 1])
-        if soma_volumes != 0:  # Verificar se a soma dos volumes é diferente de zero
-            vwap = sum(pv) / soma_volumes
-        else:
-            vwap = np.nan  # Ou defina outro valor padrão, como 0
-        vwap_values.append(vwap)
-
-    return vwap_values
+    return vwap_movel(prices, volumes, period)
 
 
 def calculate_adx(candles, period=14):
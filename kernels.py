@@ -0,0 +1,267 @@
+# Arquivo kernels.py
+# Este arquivo contém os kernels numéricos dos indicadores que não podem ser
+# expressos com o TA-Lib ou com somas acumuladas simples (EMA recursiva, RSI com
+# suavização de Wilder e VWAP móvel).
+# Cada kernel tem duas implementações com o mesmo resultado:
+# - "numba": o laço compilado pelo Numba (quando instalado), com cache em disco
+#   compartilhado (NUMBA_CACHE_DIR) para não recompilar a cada inicialização.
+# - "numpy": versão vetorizada em NumPy puro, usada quando o Numba não está disponível.
+# A paridade entre as duas é verificada com: python kernels.py
+
+import os
+
+import numpy as np
+
+from constants import KERNELS_BACKEND, NUMBA_CACHE_DIR
+
+# O Numba lê o diretório de cache na importação
+os.environ.setdefault("NUMBA_CACHE_DIR", NUMBA_CACHE_DIR)
+
+try:
+    if KERNELS_BACKEND == "numpy":
+        raise ImportError
+    import numba
+except ImportError:
+    numba = None
+
+BACKEND = "numba" if numba is not None else "numpy"
+
+# Tamanho dos blocos da recorrência linear vetorizada: limita a faixa dos fatores
+# a**-j para manter a precisão em float64
+BLOCO_RECORRENCIA = 64
+
+
+def _jit(funcao):
+    """Compila `funcao` com o Numba (cache em disco), ou a retorna sem alterações."""
+    if numba is None:
+        return funcao
+    return numba.njit(cache=True, nogil=True)(funcao)
+
+
+# --- Laços (compilados pelo Numba) ---
+
+
+def _ema_laco(valores, alfa):
+    saida = np.empty(valores.size)
+    if valores.size == 0:
+        return saida
+    saida[0] = valores[0]
+    for i in range(1, valores.size):
+        saida[i] = valores[i] * alfa + saida[i - 1] * (1.0 - alfa)
+    return saida
+
+
+def _rsi_wilder_laco(valores, periodo):
+    n = valores.size
+    saida = np.full(n, np.nan)
+    if n <= periodo:
+        return saida
+    media_ganho = 0.0
+    media_perda = 0.0
+    for i in range(1, periodo + 1):
+        delta = valores[i] - valores[i - 1]
+        if delta > 0:
+            media_ganho += delta
+        else:
+            media_perda -= delta
+    media_ganho /= periodo
+    media_perda /= periodo
+    for i in range(periodo, n):
+        if i > periodo:
+            delta = valores[i] - valores[i - 1]
+            ganho = delta if delta > 0 else 0.0
+            perda = -delta if delta < 0 else 0.0
+            media_ganho = (media_ganho * (periodo - 1) + ganho) / periodo
+            media_perda = (media_perda * (periodo - 1) + perda) / periodo
+        if media_perda == 0.0:
+            saida[i] = 50.0 if media_ganho == 0.0 else 100.0
+        else:
+            saida[i] = 100.0 - 100.0 / (1.0 + media_ganho / media_perda)
+    return saida
+
+
+def _vwap_movel_laco(precos, volumes, periodo):
+    n = precos.size
+    saida = np.empty(max(n - periodo + 1, 0))
+    soma_pv = 0.0
+    soma_volumes = 0.0
+    for i in range(n):
+        soma_pv += precos[i] * volumes[i]
+        soma_volumes += volumes[i]
+        if i >= periodo:
+            soma_pv -= precos[i - periodo] * volumes[i - periodo]
+            soma_volumes -= volumes[i - periodo]
+        if i >= periodo - 1:
+            saida[i - periodo + 1] = soma_pv / soma_volumes if soma_volumes != 0.0 else np.nan
+    return saida
+
+
+# --- Versões em NumPy puro ---
+
+
+def _recorrencia_linear(valores, alfa, inicial):
+    """
+    Resolve y[i] = alfa * x[i] + (1 - alfa) * y[i - 1], com y[-1] = `inicial`,
+    em blocos vetorizados (forma fechada com potências de 1 - alfa).
+    """
+    saida = np.empty(valores.size)
+    a = 1.0 - alfa
+    anterior = inicial
+    for inicio in range(0, valores.size, BLOCO_RECORRENCIA):
+        bloco = valores[inicio : inicio + BLOCO_RECORRENCIA]
+        j = np.arange(bloco.size)
+        potencias = a ** (j + 1)  # a^(t+1), multiplica o valor anterior ao bloco
+        if a == 0.0:
+            acumulado = bloco
+        else:
+            acumulado = np.cumsum(bloco * a ** -j) * a**j
+        saida[inicio : inicio + bloco.size] = potencias * anterior + alfa * acumulado
+        anterior = saida[inicio + bloco.size - 1]
+    return saida
+
+
+def _ema_numpy(valores, alfa):
+    if valores.size == 0:
+        return np.empty(0)
+    return _recorrencia_linear(valores, alfa, valores[0])
+
+
+def _rsi_wilder_numpy(valores, periodo):
+    n = valores.size
+    saida = np.full(n, np.nan)
+    if n <= periodo:
+        return saida
+    deltas = np.diff(valores)
+    ganhos = np.maximum(deltas, 0.0)
+    perdas = np.maximum(-deltas, 0.0)
+    alfa = 1.0 / periodo
+    # Médias iniciais simples; as seguintes com a suavização de Wilder (EMA com alfa 1/periodo)
+    medias_ganho = np.concatenate(
+        ([ganhos[:periodo].mean()], _recorrencia_linear(ganhos[periodo:], alfa, ganhos[:periodo].mean()))
+    )
+    medias_perda = np.concatenate(
+        ([perdas[:periodo].mean()], _recorrencia_linear(perdas[periodo:], alfa, perdas[:periodo].mean()))
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100.0 - 100.0 / (1.0 + medias_ganho / medias_perda)
+    rsi = np.where(medias_perda == 0.0, np.where(medias_ganho == 0.0, 50.0, 100.0), rsi)
+    saida[periodo:] = rsi
+    return saida
+
+
+def _vwap_movel_numpy(precos, volumes, periodo):
+    if precos.size < periodo:
+        return np.empty(0)
+    soma_pv = np.cumsum(np.concatenate(([0.0], precos * volumes)))
+    soma_volumes = np.cumsum(np.concatenate(([0.0], volumes)))
+    pv = soma_pv[periodo:] - soma_pv[:-periodo]
+    v = soma_volumes[periodo:] - soma_volumes[:-periodo]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(v != 0.0, pv / v, np.nan)
+
+
+IMPLEMENTACOES = {
+    "numpy": {
+        "ema": _ema_numpy,
+        "rsi_wilder": _rsi_wilder_numpy,
+        "vwap_movel": _vwap_movel_numpy,
+    },
+}
+if numba is not None:
+    IMPLEMENTACOES["numba"] = {
+        "ema": _jit(_ema_laco),
+        "rsi_wilder": _jit(_rsi_wilder_laco),
+        "vwap_movel": _jit(_vwap_movel_laco),
+    }
+
+
+def _como_array(valores):
+    return np.ascontiguousarray(valores, dtype=np.float64)
+
+
+# --- API pública ---
+
+
+def ema(valores, periodo, backend=None):
+    """
+    EMA recursiva com semente no primeiro valor (como `calculate_ema`).
+
+    Args:
+        valores (list | np.ndarray): Série de preços.
+        periodo (int): Período da EMA.
+        backend (str, optional): "numba" ou "numpy". Defaults to o backend ativo.
+
+    Returns:
+        np.ndarray: EMA com o mesmo tamanho da série.
+    """
+    return IMPLEMENTACOES[backend or BACKEND]["ema"](_como_array(valores), 2.0 / (periodo + 1))
+
+
+def rsi_wilder(valores, periodo=14, backend=None):
+    """
+    RSI com suavização de Wilder.
+
+    Returns:
+        np.ndarray: RSI com o mesmo tamanho da série (NaN nas primeiras `periodo` posições).
+    """
+    return IMPLEMENTACOES[backend or BACKEND]["rsi_wilder"](_como_array(valores), periodo)
+
+
+def vwap_movel(precos, volumes, periodo=20, backend=None):
+    """
+    VWAP em janela móvel de `periodo` velas.
+
+    Returns:
+        np.ndarray: Um valor por janela completa (len(precos) - periodo + 1);
+        NaN nas janelas sem volume.
+    """
+    return IMPLEMENTACOES[backend or BACKEND]["vwap_movel"](
+        _como_array(precos), _como_array(volumes), periodo
+    )
+
+
+def verificar_paridade(tamanho=5000, semente=42, tolerancia=1e-9):
+    """
+    Compara os backends disponíveis entre si e com uma referência em Python puro.
+
+    Returns:
+        dict: kernel -> maior diferença relativa encontrada.
+
+    Raises:
+        AssertionError: Se alguma diferença ultrapassar `tolerancia`.
+    """
+    rng = np.random.default_rng(semente)
+    precos = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, tamanho)))
+    volumes = rng.exponential(10, tamanho)
+    volumes[rng.integers(0, tamanho, tamanho // 20)] = 0.0
+
+    # Referência: laços em Python puro, sem compilação
+    referencia = {
+        "ema": _ema_laco(precos, 2.0 / 21),
+        "rsi_wilder": _rsi_wilder_laco(precos, 14),
+        "vwap_movel": _vwap_movel_laco(precos, volumes, 20),
+    }
+    diferencas = {}
+    for backend in IMPLEMENTACOES:
+        resultados = {
+            "ema": ema(precos, 20, backend),
+            "rsi_wilder": rsi_wilder(precos, 14, backend),
+            "vwap_movel": vwap_movel(precos, volumes, 20, backend),
+        }
+        for nome, valores in resultados.items():
+            esperado = referencia[nome]
+            assert valores.shape == esperado.shape, f"{backend}/{nome}: tamanho diferente"
+            assert np.array_equal(np.isnan(valores), np.isnan(esperado)), f"{backend}/{nome}: NaN"
+            validos = ~np.isnan(esperado)
+            erro = np.max(
+                np.abs(valores[validos] - esperado[validos]) / np.maximum(np.abs(esperado[validos]), 1.0)
+            )
+            assert erro <= tolerancia, f"{backend}/{nome}: diferença {erro:.3e}"
+            diferencas[f"{backend}/{nome}"] = float(erro)
+    return diferencas
+
+
+if __name__ == "__main__":
+    print(f"Backend ativo: {BACKEND}")
+    for nome, erro in verificar_paridade().items():
+        print(f"{nome}: diferença relativa máxima {erro:.2e}")
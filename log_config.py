@@ -0,0 +1,144 @@
+# Arquivo log_config.py
+# Este arquivo contém a configuração única de logs do bot (loguru):
+# - Sinks com fila (enqueue): a escrita em disco/console roda em uma thread
+#   separada, fora do caminho crítico do WebSocket.
+# - Limite por chave e por par para mensagens repetitivas: o registro passa
+#   `limite=<mensagens por minuto>` (e opcionalmente `symbol=`) como keyword, e as
+#   mensagens suprimidas são contadas e informadas na próxima emitida.
+# - Amostragem: `amostra=N` mantém uma a cada N mensagens da mesma chave.
+# - Modo estruturado compacto (JSON Lines) para o arquivo de log.
+#
+# Exemplo:
+#   logger.info("Sinal {} para {}", tipo, symbol, symbol=symbol, limite=6)
+
+import json
+import sys
+import time
+
+from loguru import logger
+
+from constants import (
+    LOG_FILE,
+    LOG_FILE_LEVEL,
+    LOG_JSON,
+    LOG_LEVEL,
+)
+
+# Campos de controle do limitador, que não vão para a saída estruturada
+CAMPOS_CONTROLE = ("limite", "amostra", "_decisao", "_json")
+
+
+class LimitadorLogs:
+    """
+    Filtro do loguru com limite de taxa e amostragem por chave.
+
+    A chave é o local do registro (arquivo:linha) mais o `symbol` do extra, então
+    a mesma mensagem de pares diferentes é limitada separadamente. A decisão é
+    guardada no próprio registro, que é compartilhado entre os sinks.
+    """
+
+    def __init__(self, janela_s=60.0, relogio=time.monotonic, niveis=None):
+        self.janela_s = janela_s
+        self.relogio = relogio
+        # Nível mínimo por módulo (ex: {"websocket_manager": "WARNING"} no replay)
+        self.niveis = {
+            modulo: logger.level(nivel).no for modulo, nivel in (niveis or {}).items()
+        }
+        self.janelas = {}  # chave -> [início da janela, emitidas, suprimidas]
+        self.contagens = {}  # chave -> mensagens vistas (amostragem)
+
+    def __call__(self, record):
+        extra = record["extra"]
+        decisao = extra.get("_decisao")
+        if decisao is None:
+            decisao = extra["_decisao"] = self._decidir(record, extra)
+        return decisao
+
+    def _decidir(self, record, extra):
+        if self.niveis and record["level"].no < self.niveis.get(record["name"], 0):
+            return False
+        limite = extra.get("limite")
+        amostra = extra.get("amostra")
+        if not limite and not amostra:
+            return True
+        chave = (record["file"].name, record["line"], extra.get("symbol"))
+
+        if amostra:
+            vistas = self.contagens.get(chave, 0)
+            self.contagens[chave] = vistas + 1
+            if vistas % amostra:
+                return False
+
+        if limite:
+            agora = self.relogio()
+            janela = self.janelas.get(chave)
+            if janela is None or agora - janela[0] >= self.janela_s:
+                suprimidas = janela[2] if janela else 0
+                janela = self.janelas[chave] = [agora, 0, 0]
+                if suprimidas:
+                    extra["suprimidas"] = suprimidas
+            if janela[1] >= limite:
+                janela[2] += 1
+                return False
+            janela[1] += 1
+        return True
+
+
+def _formato_json(record):
+    """Formato JSON Lines compacto (usado no lugar do `serialize` do loguru, mais verboso)."""
+    dados = {
+        "t": round(record["time"].timestamp(), 3),
+        "n": record["level"].name,
+        "m": record["message"],
+        "o": f"{record['name']}:{record['line']}",
+    }
+    extras = {k: v for k, v in record["extra"].items() if k not in CAMPOS_CONTROLE}
+    if extras:
+        dados["x"] = extras
+    if record["exception"]:
+        dados["e"] = repr(record["exception"].value)
+    record["extra"]["_json"] = json.dumps(dados, default=str, ensure_ascii=False)
+    return "{extra[_json]}\n"
+
+
+def _formato_texto(record):
+    sufixo = " (+{extra[suprimidas]} suprimidas)" if "suprimidas" in record["extra"] else ""
+    return (
+        "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | "
+        "<cyan>{name}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>" + sufixo + "\n{exception}"
+    )
+
+
+def configurar_logs(
+    nivel=LOG_LEVEL, arquivo=LOG_FILE, nivel_arquivo=LOG_FILE_LEVEL, em_json=LOG_JSON, niveis=None
+):
+    """
+    Substitui os sinks padrão do loguru pelos sinks com fila e limitador.
+
+    Args:
+        nivel (str, optional): Nível do console. Defaults to LOG_LEVEL.
+        arquivo (str, optional): Arquivo de log (rotação de 10 MB); None desativa.
+            Defaults to LOG_FILE.
+        nivel_arquivo (str, optional): Nível do arquivo. Defaults to LOG_FILE_LEVEL.
+        em_json (bool, optional): Grava o arquivo em JSON Lines. Defaults to LOG_JSON.
+        niveis (dict, optional): Nível mínimo por módulo. Defaults to None.
+
+    Returns:
+        LimitadorLogs: O limitador compartilhado pelos sinks.
+    """
+    limitador = LimitadorLogs(niveis=niveis)
+    logger.remove()
+    logger.add(sys.stderr, level=nivel, format=_formato_texto, filter=limitador, enqueue=True)
+    if arquivo:
+        logger.add(
+            arquivo,
+            level=nivel_arquivo,
+            format=_formato_json if em_json else _formato_texto,
+            filter=limitador,
+            enqueue=True,
+            colorize=False,
+            rotation="10 MB",
+            retention="10 days",
+            compression="gz",
+        )
+    return limitador
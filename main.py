@@ -2,28 +2,55 @@
 Arquivo principal para inicializar o bot de trading.
 - Estabelece conexão com a API da Bybit.
 - Inicia a execução assíncrona do bot de trading.
+
+Os subsistemas opcionais (executor, diário, métricas) e as bibliotecas pesadas
+(ccxt, numpy, talib) são importados apenas quando usados, e o tempo de cada
+etapa da inicialização é registrado no log.
 """
 
-import asyncio
-import os
-from loguru import logger
-from config_bybit import connect_bybit
-from dotenv import load_dotenv
-from bot_trading import executar_bot_trading
+from startup import cronometro
+
+with cronometro.etapa("importação base (asyncio, loguru, dotenv)"):
+    import asyncio
+    import os
+    from loguru import logger
+    from dotenv import load_dotenv
+    from constants import JOURNAL_ENABLED, METRICS_ENABLED
+    from log_config import configurar_logs
 
 # Carrega as variáveis de ambiente do arquivo .env
 load_dotenv()
 
-# Configuração do loguru
-logger.add("logs/bot_trading.log", rotation="10 MB", retention="10 days", level="DEBUG")
+# Configuração do loguru (sinks com fila, limite de mensagens repetitivas e modo JSON)
+configurar_logs()
+
+
+def conectar_exchange(is_testnet):
+    """Cria o cliente ccxt da Bybit (importa o ccxt apenas quando chamado)."""
+    from config_bybit import connect_bybit
+
+    exchange, market_type = connect_bybit(testnet=is_testnet)
+    logger.info(f"Conexão com a Bybit estabelecida com sucesso (mercado {market_type}).")
+    return exchange
+
+
+async def iniciar_executor(is_testnet, risk_manager):
+    """Cria o executor de ordens em segundo plano e conecta o gerenciador de risco."""
+    with cronometro.etapa("importação do executor de ordens"):
+        from order_execution import criar_executor
+
+    with cronometro.etapa("inicialização do executor de ordens"):
+        executor = await criar_executor(testnet=is_testnet)
+    executor.cache.ouvintes.append(risk_manager.ouvinte_ordens)
+    return executor
 
 
 async def main() -> None:
     """
     Função principal para execução do bot de trading.
     - Configura o ambiente (Testnet ou Produção).
-    - Conecta-se à API da Bybit.
-    - Inicia a lógica do bot.
+    - Inicia os subsistemas opcionais.
+    - Inicia a lógica do bot (a conexão com a Bybit é feita em segundo plano).
     """
     # Obter a configuração de Testnet do arquivo .env
     is_testnet = os.getenv("IS_TESTNET", "false").lower() == "true"
@@ -36,20 +63,56 @@ async def main() -> None:
         logger.error("Chaves de API não configuradas no arquivo .env")
         return
 
-    # Estabelecer conexão com a Bybit
-    try:
-        exchange, market_type = connect_bybit(testnet=is_testnet)
-        logger.info("Conexão com a Bybit estabelecida com sucesso.")
-    except Exception as e:
-        logger.error(f"Erro ao conectar com a Bybit: {e}")
-        return  # Encerra a execução se a conexão falhar
+    with cronometro.etapa("importação do bot de trading"):
+        from bot_trading import executar_bot_trading
+        from risk_manager import RiskManager
+
+    # Gerenciador de risco alimentado pelas posições do cache de ordens
+    risk_manager = RiskManager()
+
+    # Diário de sinais/operações (gravação em lote em segundo plano)
+    journal = None
+    if JOURNAL_ENABLED:
+        with cronometro.etapa("diário de sinais"):
+            from trade_journal import TradeJournal
+
+            journal = TradeJournal()
+            journal.start()
+
+    # Métricas publicadas em memória compartilhada para o dashboard
+    metrics = None
+    if METRICS_ENABLED:
+        with cronometro.etapa("métricas"):
+            from metrics import MetricsRegistry
+
+            metrics = MetricsRegistry()
+            metrics.start()
+
+    # O executor de ordens (dry-run por padrão, veja EXECUTION_DRY_RUN) é iniciado
+    # em paralelo com as inscrições do WebSocket
+    tarefa_executor = asyncio.create_task(iniciar_executor(is_testnet, risk_manager))
 
     # Iniciar a execução do bot de trading
     try:
-        logger.info(f"Iniciando o bot de trading para o mercado {market_type}...")
-        await executar_bot_trading(exchange)
+        logger.info("Iniciando o bot de trading...")
+        await executar_bot_trading(
+            lambda: conectar_exchange(is_testnet),
+            tarefa_executor,
+            risk_manager,
+            journal,
+            metrics,
+        )
     except Exception as e:
         logger.exception(f"Erro na execução do bot de trading: {e}")
+    finally:
+        if not tarefa_executor.done():
+            tarefa_executor.cancel()
+        elif not tarefa_executor.cancelled() and tarefa_executor.exception() is None:
+            await tarefa_executor.result().fechar()
+        if journal:
+            journal.stop()
+        if metrics:
+            metrics.stop()
 
 
 if __name__ == "__main__":
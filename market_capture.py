@@ -0,0 +1,316 @@
+# Arquivo market_capture.py
+# Este arquivo contém a captura dos frames brutos do WebSocket da Bybit, para
+# replay (replay.py), depuração e backtests.
+# - O `on_message` apenas anota o horário de recebimento e enfileira o frame em um
+#   buffer limitado; a compressão e a escrita ficam em uma thread separada.
+# - Os frames são gravados em blocos comprimidos (zstd, lz4 ou, sem essas
+#   bibliotecas, zlib), com registros prefixados pelo tamanho, em segmentos horários.
+# - Cada segmento tem um índice (.idx) com o intervalo de tempo e os pares de cada
+#   bloco, para buscar por tempo e par sem descomprimir o arquivo inteiro.
+#
+# Formato do segmento (capture-AAAAMMDD-HH.seg):
+#   cabeçalho: mágico (8 bytes) + codec (1 byte)
+#   blocos:    tamanho comprimido (uint32) + tamanho original (uint32) + payload
+#   payload:   registros de ts de recebimento em µs (int64) + tamanho (uint32) + frame
+
+import json
+import os
+import struct
+import time
+import zlib
+from collections import deque
+from threading import Thread
+
+from loguru import logger
+
+from constants import (
+    CAPTURE_BLOCK_BYTES,
+    CAPTURE_BUFFER_SIZE,
+    CAPTURE_CODEC,
+    CAPTURE_DIR,
+)
+
+MAGICO = b"STBCAP1\0"
+BLOCO = struct.Struct("<II")
+REGISTRO = struct.Struct("<qI")
+
+
+def _codec_zstd():
+    import zstandard
+
+    return zstandard.ZstdCompressor(level=3).compress, zstandard.ZstdDecompressor().decompress
+
+
+def _codec_lz4():
+    import lz4.frame
+
+    return lz4.frame.compress, lz4.frame.decompress
+
+
+def _codec_zlib():
+    return (lambda dados: zlib.compress(dados, 1)), zlib.decompress
+
+
+# id gravado no cabeçalho -> (nome, fábrica de (comprimir, descomprimir))
+CODECS = {1: ("zstd", _codec_zstd), 2: ("lz4", _codec_lz4), 3: ("zlib", _codec_zlib)}
+
+
+def escolher_codec(preferido=CAPTURE_CODEC):
+    """
+    Retorna o codec preferido, ou o primeiro disponível (zstd, lz4, zlib).
+
+    Returns:
+        tuple: (id do codec, comprimir, descomprimir).
+    """
+    ordem = sorted(CODECS, key=lambda i: CODECS[i][0] != preferido)
+    for codec_id in ordem:
+        nome, fabrica = CODECS[codec_id]
+        try:
+            return (codec_id, *fabrica())
+        except ImportError:
+            logger.debug(f"Codec {nome} indisponível para a captura.")
+    raise RuntimeError("Nenhum codec disponível")  # zlib faz parte da biblioteca padrão
+
+
+def extrair_simbolo(frame):
+    """Extrai o par do tópico do frame sem decodificar o JSON (ex: kline.1.BTCUSDT)."""
+    inicio = frame.find('"topic"')
+    if inicio < 0:
+        return None
+    inicio = frame.find('"', inicio + 7) + 1
+    fim = frame.find('"', inicio)
+    return frame[frame.rfind(".", inicio, fim) + 1 : fim] or None
+
+
+def nome_segmento(ts_us):
+    """Nome do segmento horário (UTC) do frame."""
+    return time.strftime("capture-%Y%m%d-%H.seg", time.gmtime(ts_us / 1e6))
+
+
+class MarketCapture:
+    """
+    Captura de frames do WebSocket em segmentos comprimidos.
+
+    Args:
+        diretorio (str, optional): Diretório dos segmentos. Defaults to CAPTURE_DIR.
+        capacidade (int, optional): Frames pendentes no buffer; acima disso os frames
+            são descartados (e contados), sem bloquear o WebSocket.
+            Defaults to CAPTURE_BUFFER_SIZE.
+        tamanho_bloco (int, optional): Bytes não comprimidos por bloco.
+            Defaults to CAPTURE_BLOCK_BYTES.
+        intervalo_flush (float, optional): Tempo máximo (s) de um bloco em memória. Defaults to 1.0.
+    """
+
+    def __init__(
+        self,
+        diretorio=CAPTURE_DIR,
+        capacidade=CAPTURE_BUFFER_SIZE,
+        tamanho_bloco=CAPTURE_BLOCK_BYTES,
+        intervalo_flush=1.0,
+    ):
+        self.diretorio = diretorio
+        self.capacidade = capacidade
+        self.tamanho_bloco = tamanho_bloco
+        self.intervalo_flush = intervalo_flush
+        self.codec_id, self._comprimir, _ = escolher_codec()
+        self.pendentes = deque()
+        self.descartados = 0
+        self.capturados = 0
+        self.is_running = False
+        self._thread = None
+        # Estado do escritor (usado apenas pela thread)
+        self._arquivo = None
+        self._indice = None
+        self._segmento = None
+        self._bloco = bytearray()
+        self._bloco_inicio = None
+        self._bloco_fim = None
+        self._bloco_simbolos = set()
+        self._bloco_aberto_em = 0.0
+
+    def registrar(self, frame):
+        """Chamado no `on_message`: anota o horário e enfileira o frame (O(1), sem lock)."""
+        if len(self.pendentes) >= self.capacidade:
+            self.descartados += 1
+            return
+        self.pendentes.append((time.time_ns() // 1000, frame))
+
+    def start(self):
+        os.makedirs(self.diretorio, exist_ok=True)
+        self.is_running = True
+        self._thread = Thread(target=self._executar, daemon=True)
+        self._thread.start()
+        logger.info(f"Captura de mercado ativa em {self.diretorio} ({CODECS[self.codec_id][0]}).")
+
+    def stop(self):
+        self.is_running = False
+        if self._thread:
+            self._thread.join()
+        if self.descartados:
+            logger.warning(f"Captura: {self.descartados} frames descartados (buffer cheio).")
+
+    # --- Escritor (thread) ---
+
+    def _executar(self):
+        while self.is_running or self.pendentes:
+            if not self.pendentes:
+                if self._bloco and time.monotonic() - self._bloco_aberto_em >= self.intervalo_flush:
+                    self._gravar_bloco()
+                time.sleep(0.05)
+                continue
+            try:
+                while self.pendentes:
+                    self._adicionar(*self.pendentes.popleft())
+            except Exception as e:
+                logger.error(f"Erro na captura de mercado: {e}")
+        try:
+            self._gravar_bloco()
+        finally:
+            self._fechar_segmento()
+
+    def _adicionar(self, ts_us, frame):
+        segmento = nome_segmento(ts_us)
+        if segmento != self._segmento:
+            self._gravar_bloco()
+            self._abrir_segmento(segmento)
+        if not self._bloco:
+            self._bloco_inicio = ts_us
+            self._bloco_aberto_em = time.monotonic()
+        dados = frame.encode() if isinstance(frame, str) else frame
+        self._bloco += REGISTRO.pack(ts_us, len(dados))
+        self._bloco += dados
+        self._bloco_fim = ts_us
+        simbolo = extrair_simbolo(frame if isinstance(frame, str) else frame.decode())
+        if simbolo:
+            self._bloco_simbolos.add(simbolo)
+        self.capturados += 1
+        if len(self._bloco) >= self.tamanho_bloco:
+            self._gravar_bloco()
+
+    def _abrir_segmento(self, segmento):
+        self._fechar_segmento()
+        self._segmento = segmento
+        nome, n = segmento, 0
+        while True:
+            caminho = os.path.join(self.diretorio, nome)
+            if not os.path.exists(caminho):
+                break
+            with open(caminho, "rb") as existente:
+                if existente.read(len(MAGICO) + 1) == MAGICO + bytes([self.codec_id]):
+                    break
+            # Segmento da mesma hora gravado com outro codec: continua em outro arquivo
+            # ("~" ordena depois de ".seg", preservando a ordem de leitura)
+            n += 1
+            nome = segmento.replace(".seg", f"~{n}.seg")
+        self._arquivo = open(caminho, "ab")
+        if self._arquivo.tell() == 0:
+            self._arquivo.write(MAGICO + bytes([self.codec_id]))
+        self._indice = open(caminho[:-4] + ".idx", "a")
+
+    def _fechar_segmento(self):
+        if self._arquivo:
+            self._arquivo.close()
+            self._indice.close()
+            self._arquivo = self._indice = None
+
+    def _gravar_bloco(self):
+        if not self._bloco:
+            return
+        comprimido = self._comprimir(bytes(self._bloco))
+        deslocamento = self._arquivo.tell()
+        self._arquivo.write(BLOCO.pack(len(comprimido), len(self._bloco)))
+        self._arquivo.write(comprimido)
+        self._arquivo.flush()
+        self._indice.write(
+            json.dumps(
+                {
+                    "offset": deslocamento,
+                    "inicio": self._bloco_inicio,
+                    "fim": self._bloco_fim,
+                    "simbolos": sorted(self._bloco_simbolos),
+                }
+            )
+            + "\n"
+        )
+        self._indice.flush()
+        self._bloco = bytearray()
+        self._bloco_simbolos = set()
+
+
+class LeitorCaptura:
+    """Lê os frames capturados de um diretório, usando os índices para pular blocos."""
+
+    def __init__(self, diretorio=CAPTURE_DIR):
+        self.diretorio = diretorio
+
+    def segmentos(self):
+        return sorted(
+            os.path.join(self.diretorio, nome)
+            for nome in os.listdir(self.diretorio)
+            if nome.endswith(".seg")
+        )
+
+    def frames(self, inicio=None, fim=None, simbolos=None):
+        """
+        Args:
+            inicio (float, optional): Horário inicial (s desde a época). Defaults to None.
+            fim (float, optional): Horário final (s desde a época). Defaults to None.
+            simbolos (iterable, optional): Pares desejados. Defaults to None (todos).
+
+        Yields:
+            tuple: (ts de recebimento em segundos, frame como str), em ordem.
+        """
+        inicio_us = int(inicio * 1e6) if inicio is not None else None
+        fim_us = int(fim * 1e6) if fim is not None else None
+        simbolos = set(simbolos) if simbolos else None
+        for caminho in self.segmentos():
+            for ts_us, frame in self._ler_segmento(caminho, inicio_us, fim_us, simbolos):
+                if simbolos and extrair_simbolo(frame) not in simbolos:
+                    continue
+                yield ts_us / 1e6, frame
+
+    def _ler_segmento(self, caminho, inicio_us, fim_us, simbolos):
+        with open(caminho, "rb") as arquivo:
+            cabecalho = arquivo.read(len(MAGICO) + 1)
+            if cabecalho[:-1] != MAGICO:
+                logger.warning(f"Segmento de captura inválido ignorado: {caminho}")
+                return
+            _, fabrica = CODECS[cabecalho[-1]]
+            _, descomprimir = fabrica()
+
+            for entrada in self._blocos(caminho, arquivo):
+                if fim_us is not None and entrada["inicio"] > fim_us:
+                    return
+                if inicio_us is not None and entrada["fim"] < inicio_us:
+                    continue
+                if simbolos and entrada["simbolos"] and not simbolos.intersection(entrada["simbolos"]):
+                    continue
+                arquivo.seek(entrada["offset"])
+                tamanho, _ = BLOCO.unpack(arquivo.read(BLOCO.size))
+                dados = descomprimir(arquivo.read(tamanho))
+                posicao = 0
+                while posicao < len(dados):
+                    ts_us, n = REGISTRO.unpack_from(dados, posicao)
+                    posicao += REGISTRO.size
+                    if (inicio_us is None or ts_us >= inicio_us) and (fim_us is None or ts_us <= fim_us):
+                        yield ts_us, dados[posicao : posicao + n].decode()
+                    posicao += n
+
+    @staticmethod
+    def _blocos(caminho, arquivo):
+        """Entradas do índice do segmento; sem índice, percorre os blocos do arquivo."""
+        caminho_indice = caminho[:-4] + ".idx"
+        if os.path.exists(caminho_indice):
+            with open(caminho_indice) as indice:
+                return [json.loads(linha) for linha in indice if linha.strip()]
+        entradas = []
+        arquivo.seek(len(MAGICO) + 1)
+        while True:
+            deslocamento = arquivo.tell()
+            cabecalho = arquivo.read(BLOCO.size)
+            if len(cabecalho) < BLOCO.size:
+                break
+            tamanho, _ = BLOCO.unpack(cabecalho)
+            arquivo.seek(tamanho, os.SEEK_CUR)
+            entradas.append({"offset": deslocamento, "inicio": 0, "fim": 2**63 - 1, "simbolos": []})
+        return entradas
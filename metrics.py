@@ -0,0 +1,231 @@
+# Arquivo metrics.py
+# Este arquivo contém a superfície de métricas do bot para o monitoramento em tempo
+# real (item 11 do Roadmap). O scanner atualiza as métricas em memória e uma thread
+# publica, em cadência fixa, um snapshot imutável em memória compartilhada, que o
+# dashboard (dashboard.py) lê sem interferir no processamento.
+
+import json
+import secrets
+import struct
+import time
+from array import array
+from multiprocessing import resource_tracker, shared_memory
+from threading import Lock, Thread
+
+from loguru import logger
+
+from constants import (
+    METRICS_PUBLISH_INTERVAL_S,
+    METRICS_SHM_NAME,
+    METRICS_SHM_SIZE,
+    METRICS_STALE_AFTER_S,
+)
+
+# Cabeçalho do segmento: sequência (uint64, ímpar durante a escrita), tamanho (uint32),
+# identidade do escritor (uint64, sorteada a cada execução do bot) e horário da
+# última publicação (double, epoch em segundos)
+CABECALHO = struct.Struct("<QIQd")
+
+
+class LatencyStats:
+    """Estatísticas de latência (ms) sobre uma janela circular de amostras."""
+
+    def __init__(self, tamanho=1024):
+        self.amostras = array("d", [0.0] * tamanho)
+        self.tamanho = tamanho
+        self.contagem = 0
+
+    def registrar(self, ms):
+        self.amostras[self.contagem % self.tamanho] = ms
+        self.contagem += 1
+
+    def resumo(self):
+        n = min(self.contagem, self.tamanho)
+        if n == 0:
+            return {"amostras": 0, "p50": None, "p99": None, "max": None}
+        ordenadas = sorted(self.amostras[:n])
+        return {
+            "amostras": self.contagem,
+            "p50": ordenadas[n // 2],
+            "p99": ordenadas[min(n - 1, int(n * 0.99))],
+            "max": ordenadas[-1],
+        }
+
+
+class MetricsRegistry:
+    """
+    Registro de métricas do scanner.
+
+    Cada atualização de símbolo substitui o dicionário do símbolo por um novo
+    (copy-on-write), de modo que o publicador só precisa de uma cópia rasa do
+    mapa para obter um snapshot consistente, sem travar o scanner.
+    """
+
+    def __init__(self, intervalo=METRICS_PUBLISH_INTERVAL_S):
+        self.intervalo = intervalo
+        self.simbolos = {}  # símbolo -> dict imutável com as últimas métricas
+        self.latencias = {}  # nome -> LatencyStats
+        self.provedor_posicoes = None  # Callable que retorna as posições abertas
+        self.is_running = False
+        self._lock = Lock()
+        self._publicador = None
+
+    def atualizar_simbolo(self, symbol, **campos):
+        """Mescla `campos` às métricas do símbolo (ex: preco, rsi, sinal)."""
+        self.simbolos[symbol] = {**self.simbolos.get(symbol, {}), **campos}
+
+    def registrar_latencia(self, nome, ms):
+        estatistica = self.latencias.get(nome)
+        if estatistica is None:
+            with self._lock:
+                estatistica = self.latencias.setdefault(nome, LatencyStats())
+        estatistica.registrar(ms)
+
+    def snapshot(self):
+        """Monta o snapshot atual (cópia rasa; os valores nunca são alterados)."""
+        posicoes = {}
+        if self.provedor_posicoes:
+            try:
+                posicoes = self.provedor_posicoes()
+            except Exception as e:
+                logger.error(f"Erro ao obter posições para as métricas: {e}")
+        return {
+            "ts": time.time(),
+            "simbolos": dict(self.simbolos),
+            "latencias": {nome: l.resumo() for nome, l in list(self.latencias.items())},
+            "posicoes": posicoes,
+        }
+
+    def start(self, nome=METRICS_SHM_NAME, tamanho=METRICS_SHM_SIZE):
+        self._publicador = SnapshotPublisher(nome, tamanho)
+        self.is_running = True
+        Thread(target=self._publicar, daemon=True).start()
+
+    def stop(self):
+        self.is_running = False
+        if self._publicador:
+            self._publicador.fechar()
+
+    def _publicar(self):
+        while self.is_running:
+            inicio = time.monotonic()
+            try:
+                self._publicador.publicar(self.snapshot())
+            except Exception as e:
+                logger.error(f"Erro ao publicar métricas: {e}")
+            time.sleep(max(0.0, self.intervalo - (time.monotonic() - inicio)))
+
+
+class SnapshotPublisher:
+    """
+    Escreve snapshots em um segmento de memória compartilhada protegido por um
+    seqlock: a sequência fica ímpar durante a escrita e o leitor repete a leitura
+    se ela mudar, então o escritor nunca espera pelos leitores.
+    """
+
+    def __init__(self, nome=METRICS_SHM_NAME, tamanho=METRICS_SHM_SIZE, relogio=time.time):
+        try:
+            self.shm = shared_memory.SharedMemory(name=nome, create=True, size=tamanho)
+        except FileExistsError:
+            # Segmento de uma execução anterior que não foi removido
+            self.shm = shared_memory.SharedMemory(name=nome)
+        self.sequencia = CABECALHO.unpack_from(self.shm.buf, 0)[0] & ~1
+        self.escritor = secrets.randbits(64)
+        self.relogio = relogio
+
+    def publicar(self, snapshot):
+        dados = json.dumps(snapshot, separators=(",", ":"), default=str).encode()
+        if len(dados) > self.shm.size - CABECALHO.size:
+            logger.warning(
+                f"Snapshot de métricas ({len(dados)} bytes) maior que o segmento; ignorado."
+            )
+            return
+        buf = self.shm.buf
+        self.sequencia += 1
+        CABECALHO.pack_into(buf, 0, self.sequencia, 0, self.escritor, 0.0)
+        buf[CABECALHO.size : CABECALHO.size + len(dados)] = dados
+        self.sequencia += 1
+        CABECALHO.pack_into(buf, 0, self.sequencia, len(dados), self.escritor, self.relogio())
+
+    def fechar(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+class SnapshotReader:
+    """
+    Lê o último snapshot publicado (usado pelo dashboard, em outro processo).
+
+    Se o bot ainda não criou o segmento, o leitor fica desconectado e tenta de novo
+    a cada `ler`, em vez de falhar. Um bot reiniciado cria um segmento novo com o
+    mesmo nome e o mapeamento antigo deixa de receber escritas: quando a última
+    publicação fica mais velha que `validade_s`, o leitor reabre o segmento pelo nome.
+    """
+
+    def __init__(self, nome=METRICS_SHM_NAME, validade_s=METRICS_STALE_AFTER_S, relogio=time.time):
+        self.nome = nome
+        self.validade_s = validade_s
+        self.relogio = relogio
+        self.escritor = None  # Identidade do último bot lido
+        self.shm = None
+        self._conectar()
+
+    def _conectar(self):
+        try:
+            self.shm = shared_memory.SharedMemory(name=self.nome)
+        except FileNotFoundError:
+            return False
+        # O leitor não é dono do segmento: evita que o resource_tracker o remova
+        resource_tracker.unregister(self.shm._name, "shared_memory")
+        return True
+
+    @property
+    def conectado(self):
+        return self.shm is not None
+
+    def ler(self, tentativas=10):
+        """
+        Returns:
+            dict | None: Último snapshot, ou None se nenhum foi publicado (ou o bot
+            não está em execução).
+        """
+        if self.shm is None and not self._conectar():
+            return None
+        lido = self._ler(tentativas)
+        if lido is not None and self.relogio() - lido[1] > self.validade_s:
+            # Publicação parada: bot encerrado ou reiniciado em outro segmento
+            self.fechar()
+            if not self._conectar():
+                return None
+            lido = self._ler(tentativas)
+            if lido is not None and self.relogio() - lido[1] > self.validade_s:
+                self.fechar()  # Segmento órfão de um bot que caiu
+                return None
+        if lido is None:
+            return None
+        escritor, _, snapshot = lido
+        if escritor != self.escritor:
+            if self.escritor is not None:
+                logger.info("Métricas: nova execução do bot detectada.")
+            self.escritor = escritor
+        return snapshot
+
+    def _ler(self, tentativas):
+        """Leitura consistente pelo seqlock: (escritor, publicado_em, snapshot) ou None."""
+        buf = self.shm.buf
+        for _ in range(tentativas):
+            sequencia, tamanho, escritor, publicado_em = CABECALHO.unpack_from(buf, 0)
+            if sequencia == 0:
+                return None
+            if sequencia & 1:
+                time.sleep(0.001)
+                continue
+            dados = bytes(buf[CABECALHO.size : CABECALHO.size + tamanho])
+            if CABECALHO.unpack_from(buf, 0)[0] == sequencia:
+                return escritor, publicado_em, json.loads(dados)
+        return None
+
+    def fechar(self):
+        if self.shm is not None:
+            self.shm.close()
+            self.shm = None
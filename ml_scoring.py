@@ -0,0 +1,369 @@
+# Arquivo ml_scoring.py
+# Este arquivo contém o estágio de pontuação por aprendizado de máquina (itens 8 e
+# 13 do Roadmap):
+# - No fechamento de cada vela, as decisões das regras de todos os pares ficam
+#   pendentes enquanto as velas confirmadas chegam; a matriz de features
+#   (pares x features) é montada uma única vez e o modelo roda em lote.
+# - A probabilidade do modelo é combinada com a pontuação das regras. Se o lote
+#   estourar o orçamento de latência, a vela usa apenas as regras.
+# - O treino offline lê o histórico gravado no diário (trade_journal.py), onde cada
+#   sinal de vela confirmada carrega as suas features.
+#
+# Treino: python ml_scoring.py --journal data/journal.db --saida models/ml_model.npz
+
+import argparse
+import json
+import os
+import sqlite3
+import time
+
+import numpy as np
+from loguru import logger
+
+from constants import (
+    ML_BUDGET_MS,
+    ML_COLLECT_MS,
+    ML_MIN_SCORE,
+    ML_MODEL_PATH,
+    ML_WEIGHT,
+)
+from tick_aggregator import timeframe_em_segundos
+
+NOMES_FEATURES = (
+    "rsi",
+    "distancia_ema",
+    "distancia_sma",
+    "volatilidade",
+    "macd",
+    "histograma_macd",
+    "volume_relativo",
+    "pontos_compra",
+    "pontos_venda",
+    "funding_z",
+    "oi_delta_pct",
+    "basis_pct",
+)
+
+
+def montar_features(valores, vela, resultado, sentimento=None):
+    """
+    Monta o vetor de features de um par na vela confirmada.
+
+    Args:
+        valores (dict): `EstadoIndicadores.valores()` do par.
+        vela (dict): Última vela confirmada.
+        resultado (dict): Resultado de `identify_entries`.
+        sentimento (dict, optional): `TickerFeatures.features` do par. Defaults to None.
+
+    Returns:
+        list: Valores na ordem de NOMES_FEATURES (0.0 quando indisponíveis).
+    """
+    preco = valores.get("preco") or float(vela["close"])
+
+    def relativo(valor):
+        return (preco - valor) / preco if valor else 0.0
+
+    macd = valores.get("macd") or 0.0
+    sinal = valores.get("macd_sinal") or 0.0
+    volume_medio = valores.get("volume_medio")
+    sentimento = sentimento or {}
+    return [
+        (valores.get("rsi") or 50.0) / 100,
+        relativo(valores.get("ema")),
+        relativo(valores.get("sma")),
+        (valores.get("desvio") or 0.0) / preco,
+        macd / preco,
+        (macd - sinal) / preco,
+        float(vela["volume"]) / volume_medio if volume_medio else 1.0,
+        resultado.get("pontos_compra", 0),
+        resultado.get("pontos_venda", 0),
+        sentimento.get("funding_z") or 0.0,
+        sentimento.get("oi_delta_pct") or 0.0,
+        sentimento.get("basis_pct") or 0.0,
+    ]
+
+
+class ModeloLogistico:
+    """Regressão logística (features padronizadas) salva em .npz; prevê P(alta)."""
+
+    def __init__(self, pesos, vies, media, desvio, nomes=NOMES_FEATURES):
+        self.pesos = np.asarray(pesos, dtype=float)
+        self.vies = float(vies)
+        self.media = np.asarray(media, dtype=float)
+        self.desvio = np.asarray(desvio, dtype=float)
+        self.nomes = tuple(nomes)
+
+    def prever(self, X):
+        z = ((X - self.media) / self.desvio) @ self.pesos + self.vies
+        return 1.0 / (1.0 + np.exp(-z))
+
+    def salvar(self, caminho):
+        if os.path.dirname(caminho):
+            os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        np.savez(
+            caminho,
+            pesos=self.pesos,
+            vies=self.vies,
+            media=self.media,
+            desvio=self.desvio,
+            nomes=np.array(self.nomes),
+        )
+
+    @classmethod
+    def carregar(cls, caminho):
+        with np.load(caminho) as dados:
+            return cls(
+                dados["pesos"], dados["vies"], dados["media"], dados["desvio"], dados["nomes"].tolist()
+            )
+
+
+class ModeloSklearn:
+    """Qualquer classificador do scikit-learn salvo com joblib (ex: gradient boosting)."""
+
+    def __init__(self, estimador):
+        self.estimador = estimador
+
+    def prever(self, X):
+        return self.estimador.predict_proba(X)[:, 1]
+
+
+def carregar_modelo(caminho=ML_MODEL_PATH):
+    """
+    Carrega o modelo salvo (.npz: regressão logística; .joblib: scikit-learn).
+
+    Returns:
+        ModeloLogistico | ModeloSklearn | None: None se o arquivo não existir.
+    """
+    if not os.path.exists(caminho):
+        return None
+    if caminho.endswith(".joblib"):
+        import joblib
+
+        return ModeloSklearn(joblib.load(caminho))
+    modelo = ModeloLogistico.carregar(caminho)
+    if modelo.nomes != NOMES_FEATURES:
+        logger.warning("Modelo de ML treinado com outras features; ignorado.")
+        return None
+    return modelo
+
+
+class EstagioML:
+    """
+    Agrupa as decisões das regras por vela e as pontua em lote.
+
+    Args:
+        duracao_vela_ms (int): Duração da vela (ms).
+        modelo (optional): Objeto com `prever(X) -> P(alta)`. Defaults to None
+            (apenas coleta as features, sem alterar as decisões).
+        peso (float, optional): Peso do modelo na combinação. Defaults to ML_WEIGHT.
+        pontuacao_minima (float, optional): Pontuação combinada mínima para manter um
+            sinal de compra/venda. Defaults to ML_MIN_SCORE.
+        orcamento_ms (float, optional): Orçamento de latência do lote. Defaults to ML_BUDGET_MS.
+        coleta_ms (int, optional): Espera após o fechamento da vela pelas velas
+            confirmadas dos demais pares. Defaults to ML_COLLECT_MS.
+    """
+
+    def __init__(
+        self,
+        duracao_vela_ms,
+        modelo=None,
+        peso=ML_WEIGHT,
+        pontuacao_minima=ML_MIN_SCORE,
+        orcamento_ms=ML_BUDGET_MS,
+        coleta_ms=ML_COLLECT_MS,
+    ):
+        self.duracao_vela_ms = duracao_vela_ms
+        self.modelo = modelo
+        self.peso = peso
+        self.pontuacao_minima = pontuacao_minima
+        self.orcamento_ms = orcamento_ms
+        self.coleta_ms = coleta_ms
+        self.pendentes = {}  # start da vela -> {símbolo: (resultado, preço, features)}
+        self.lotes = 0
+        self.estouros = 0  # Lotes que estouraram o orçamento (apenas regras)
+        self.ultima_latencia_ms = None
+
+    def adicionar(self, symbol, start, resultado, preco, features):
+        """Adia a decisão do par até o lote da vela `start`."""
+        self.pendentes.setdefault(int(start), {})[symbol] = (resultado, preco, features)
+
+    def dispensar(self, symbol, start):
+        """Conta o par como presente no lote da vela, sem decisão (ex: reprovado no pré-filtro)."""
+        self.pendentes.setdefault(int(start), {}).setdefault(symbol, None)
+
+    def prontos(self, agora_ms, total_pares):
+        """
+        Velas cujo lote deve ser processado: todos os pares chegaram ou o prazo
+        de coleta após o fechamento terminou.
+
+        Args:
+            agora_ms (int): Horário atual (ms), ex: o `ts` da mensagem.
+            total_pares (int): Pares monitorados.
+        """
+        return [
+            start
+            for start, linhas in self.pendentes.items()
+            if len(linhas) >= total_pares
+            or agora_ms >= start + self.duracao_vela_ms + self.coleta_ms
+        ]
+
+    def processar(self, start):
+        """
+        Pontua o lote da vela e aplica a combinação com as regras.
+
+        Returns:
+            list: (símbolo, resultado, preço) com as decisões finais.
+        """
+        linhas = {s: l for s, l in self.pendentes.pop(start, {}).items() if l is not None}
+        if not linhas:
+            return []
+        simbolos = list(linhas)
+        probabilidades = None
+        if self.modelo is not None:
+            inicio = time.perf_counter()
+            X = np.array([linhas[s][2] for s in simbolos], dtype=float)
+            try:
+                probabilidades = self.modelo.prever(X)
+            except Exception as e:
+                logger.error(f"Erro na inferência do modelo de ML: {e}")
+            self.ultima_latencia_ms = (time.perf_counter() - inicio) * 1000
+            self.lotes += 1
+            if self.ultima_latencia_ms > self.orcamento_ms:
+                self.estouros += 1
+                probabilidades = None
+                logger.warning(
+                    f"Lote de ML ({len(simbolos)} pares) levou {self.ultima_latencia_ms:.1f} ms "
+                    f"(orçamento {self.orcamento_ms} ms); usando apenas as regras."
+                )
+
+        decisoes = []
+        for i, symbol in enumerate(simbolos):
+            resultado, preco, features = linhas[symbol]
+            resultado["ml_features"] = features
+            resultado["ml_start"] = start  # Vela das features, para o rótulo do treino
+            if probabilidades is not None:
+                self._combinar(resultado, float(probabilidades[i]))
+            decisoes.append((symbol, resultado, preco))
+        return decisoes
+
+    def _combinar(self, resultado, prob_alta):
+        """Combina P(alta) com a concordância das regras no lado do sinal."""
+        resultado["ml_prob_alta"] = prob_alta
+        lado = {"BUY/LONG": 1, "SELL/SHORT": -1}.get(resultado["entry_type"])
+        if lado is None:
+            return
+        compra = resultado.get("pontos_compra", 0)
+        venda = resultado.get("pontos_venda", 0)
+        pontos_lado = compra if lado > 0 else venda
+        pontuacao_regras = pontos_lado / (compra + venda) if compra + venda else 0.0
+        prob_lado = prob_alta if lado > 0 else 1.0 - prob_alta
+        pontuacao = (1 - self.peso) * pontuacao_regras + self.peso * prob_lado
+        resultado["ml_pontuacao"] = pontuacao
+        if pontuacao < self.pontuacao_minima:
+            resultado["active_signals"].append(
+                f"ML: sinal {resultado['entry_type']} descartado (pontuação {pontuacao:.2f})."
+            )
+            resultado["entry_type"] = "NEUTRO"
+        else:
+            resultado["active_signals"].append(
+                f"ML: probabilidade favorável de {prob_lado:.0%} (pontuação {pontuacao:.2f})."
+            )
+
+
+# --- Treino offline ---
+
+
+def carregar_historico(caminho_journal, timeframe, horizonte):
+    """
+    Lê os sinais de velas confirmadas (com features) e rotula cada um pela direção
+    do preço `horizonte` velas depois, no mesmo par.
+
+    O rótulo é o registro da vela que começa `horizonte` durações depois (e não o
+    `horizonte`-ésimo registro seguinte, já que pares dispensados pelo pré-filtro,
+    prazos vencidos e reinícios deixam lacunas no diário); sem esse registro, a
+    amostra é descartada.
+
+    Returns:
+        tuple: (X, y, ts) ordenados pelo tempo.
+    """
+    duracao_ms = timeframe_em_segundos(timeframe) * 1000
+    conexao = sqlite3.connect(f"file:{caminho_journal}?mode=ro", uri=True)
+    try:
+        linhas = conexao.execute(
+            "SELECT symbol, ts, preco, dados FROM sinais "
+            "WHERE timeframe = ? AND dados LIKE '%ml_features%' ORDER BY symbol, ts",
+            (timeframe,),
+        ).fetchall()
+    finally:
+        conexao.close()
+
+    por_simbolo = {}
+    for symbol, ts, preco, dados in linhas:
+        dados = json.loads(dados)
+        start = dados.get("ml_start")
+        if start is None:
+            # Registros anteriores ao `ml_start`: gravados logo após o fechamento da vela
+            start = ts - ts % duracao_ms - duracao_ms
+        por_simbolo.setdefault(symbol, {})[int(start)] = (ts, preco, dados["ml_features"])
+
+    X, y, tempos = [], [], []
+    for registros in por_simbolo.values():
+        for start, (ts, preco, features) in registros.items():
+            futuro = registros.get(start + horizonte * duracao_ms)
+            futuro = futuro[1] if futuro else None
+            if preco and futuro and len(features) == len(NOMES_FEATURES):
+                X.append(features)
+                y.append(1.0 if futuro > preco else 0.0)
+                tempos.append(ts)
+    ordem = np.argsort(tempos)
+    return np.array(X, dtype=float)[ordem], np.array(y)[ordem], np.array(tempos)[ordem]
+
+
+def treinar_logistico(X, y, regularizacao=1e-3, iteracoes=500, taxa=0.5):
+    """Regressão logística por gradiente descendente (NumPy), com features padronizadas."""
+    media = X.mean(axis=0)
+    desvio = X.std(axis=0)
+    desvio[desvio == 0] = 1.0
+    Xn = (X - media) / desvio
+    pesos = np.zeros(X.shape[1])
+    vies = 0.0
+    for _ in range(iteracoes):
+        p = 1.0 / (1.0 + np.exp(-(Xn @ pesos + vies)))
+        erro = p - y
+        pesos -= taxa * (Xn.T @ erro / len(y) + regularizacao * pesos)
+        vies -= taxa * erro.mean()
+    return ModeloLogistico(pesos, vies, media, desvio)
+
+
+def _avaliar(modelo, X, y):
+    p = np.clip(modelo.prever(X), 1e-9, 1 - 1e-9)
+    perda = -np.mean(y * np.log(p) + (1 - y) * np.log(1 - p))
+    return float(np.mean((p > 0.5) == y)), float(perda)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Treina o modelo de pontuação de sinais.")
+    parser.add_argument("--journal", default="data/journal.db")
+    parser.add_argument("--saida", default=ML_MODEL_PATH)
+    parser.add_argument("--timeframe", default="1")
+    parser.add_argument("--horizonte", type=int, default=5, help="Velas até o rótulo")
+    args = parser.parse_args()
+
+    X, y, _ = carregar_historico(args.journal, args.timeframe, args.horizonte)
+    if len(y) < 100:
+        logger.error(f"Histórico insuficiente para treinar ({len(y)} amostras).")
+        return
+    # Validação temporal: treina nos 80% mais antigos, avalia nos 20% recentes
+    corte = int(len(y) * 0.8)
+    modelo = treinar_logistico(X[:corte], y[:corte])
+    acuracia, perda = _avaliar(modelo, X[corte:], y[corte:])
+    logger.info(
+        f"Validação ({len(y) - corte} amostras): acurácia {acuracia:.1%}, log loss {perda:.4f} "
+        f"(taxa de alta {y[corte:].mean():.1%})."
+    )
+    treinar_logistico(X, y).salvar(args.saida)
+    logger.info(f"Modelo salvo em {args.saida} ({len(y)} amostras).")
+
+
+if __name__ == "__main__":
+    main()
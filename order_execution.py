@@ -0,0 +1,502 @@
+# Arquivo order_execution.py
+# Este arquivo contém o subsistema de execução de ordens:
+# - Converte os resultados de `identify_entries` em ordem de entrada, escada de TPs e SL.
+# - Envia as ordens pela API assíncrona do ccxt, usando o endpoint de lote da Bybit.
+# - Mantém um cache local de ordens/posições alimentado pelo WebSocket privado.
+# - Oferece um modo dry-run contra uma exchange simulada local.
+
+import asyncio
+import hashlib
+import hmac
+import itertools
+import json
+import os
+import time
+from collections import deque
+from threading import Lock, Thread
+
+import websocket
+from loguru import logger
+
+from constants import (
+    EXECUTION_DRY_RUN,
+    EXECUTION_NOTIONAL_USDT,
+    ORDER_LATENCY_BUDGET_MS,
+)
+
+BYBIT_PRIVATE_WS = "wss://stream.bybit.com/v5/private"
+BYBIT_PRIVATE_WS_TESTNET = "wss://stream-testnet.bybit.com/v5/private"
+TAMANHO_LOTE_BYBIT = 10  # Máximo de ordens por requisição ao /v5/order/create-batch
+STATUS_FINAIS = {"Filled", "Cancelled", "Rejected", "Deactivated", "PartiallyFilledCanceled"}
+
+
+class OrderCache:
+    """
+    Cache em memória de ordens, posições e execuções.
+
+    É atualizado pelos tópicos privados `order`, `position` e `execution` da Bybit,
+    evitando consultas periódicas a `fetch_positions`/`fetch_open_orders`.
+    """
+
+    def __init__(self):
+        self.ordens = {}  # orderId -> dados da ordem (apenas ordens abertas)
+        self.posicoes = {}  # símbolo -> dados da posição
+        self.finalizadas = deque(maxlen=1000)  # Últimas ordens finalizadas
+        self.execucoes = deque(maxlen=1000)  # Últimas execuções (fills)
+        self.ouvintes = []  # Callbacks chamados como ouvinte(topico, item)
+        self._lock = Lock()
+
+    def on_message(self, message):
+        """Processa uma mensagem bruta do WebSocket privado."""
+        try:
+            data = json.loads(message)
+        except ValueError:
+            logger.error(f"Mensagem privada inválida: {message!r}")
+            return
+        topic = data.get("topic")
+        if topic:
+            self.processar(topic, data.get("data", []))
+        elif data.get("op") == "auth" and not data.get("success", True):
+            logger.error(f"Falha na autenticação do WebSocket privado: {data}")
+
+    def processar(self, topic, itens):
+        """Aplica uma lista de atualizações de um tópico privado ao cache."""
+        with self._lock:
+            for item in itens:
+                if topic.startswith("order"):
+                    self._atualizar_ordem(item)
+                elif topic.startswith("position"):
+                    self._atualizar_posicao(item)
+                elif topic.startswith("execution"):
+                    self.execucoes.append(item)
+        for item in itens:
+            for ouvinte in self.ouvintes:
+                try:
+                    ouvinte(topic, item)
+                except Exception as e:
+                    logger.error(f"Erro em ouvinte do cache de ordens: {e}")
+
+    def _atualizar_ordem(self, item):
+        order_id = item.get("orderId")
+        if not order_id:
+            return
+        if item.get("orderStatus") in STATUS_FINAIS:
+            self.ordens.pop(order_id, None)
+            self.finalizadas.append(item)
+        else:
+            self.ordens[order_id] = item
+
+    def _atualizar_posicao(self, item):
+        symbol = item.get("symbol")
+        if not symbol:
+            return
+        if float(item.get("size") or 0) == 0:
+            self.posicoes.pop(symbol, None)
+        else:
+            self.posicoes[symbol] = item
+
+    def posicao(self, symbol):
+        """Retorna a posição aberta do símbolo (ou None)."""
+        return self.posicoes.get(symbol)
+
+    def ordens_abertas(self, symbol=None):
+        """Retorna as ordens abertas, opcionalmente filtradas por símbolo."""
+        with self._lock:
+            return [
+                o for o in self.ordens.values() if symbol is None or o.get("symbol") == symbol
+            ]
+
+
+class PrivateStream:
+    """
+    Conexão autenticada ao WebSocket privado da Bybit (v5), em uma thread própria,
+    que encaminha os tópicos `order`, `position` e `execution` para o OrderCache.
+    """
+
+    def __init__(self, api_key, api_secret, cache, testnet=False):
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.cache = cache
+        self.url = BYBIT_PRIVATE_WS_TESTNET if testnet else BYBIT_PRIVATE_WS
+        self.ws = None
+        self.is_running = False
+
+    def _autenticar(self, ws):
+        expires = int((time.time() + 10) * 1000)
+        signature = hmac.new(
+            self.api_secret.encode(), f"GET/realtime{expires}".encode(), hashlib.sha256
+        ).hexdigest()
+        ws.send(json.dumps({"op": "auth", "args": [self.api_key, expires, signature]}))
+        ws.send(
+            json.dumps({"op": "subscribe", "args": ["order", "position", "execution"]})
+        )
+        logger.info("WebSocket privado autenticado e inscrito em order/position/execution.")
+
+    def _heartbeat(self, ws):
+        # A Bybit recomenda um ping de aplicação a cada 20 segundos
+        while self.is_running and ws.sock and ws.sock.connected:
+            time.sleep(20)
+            try:
+                ws.send(json.dumps({"op": "ping"}))
+            except Exception:
+                return
+
+    def _run(self):
+        while self.is_running:
+            try:
+                self.ws = websocket.WebSocketApp(
+                    self.url,
+                    on_open=lambda ws: (
+                        self._autenticar(ws),
+                        Thread(target=self._heartbeat, args=(ws,), daemon=True).start(),
+                    ),
+                    on_message=lambda ws, message: self.cache.on_message(message),
+                    on_error=lambda ws, error: logger.error(
+                        f"Erro no WebSocket privado: {error}"
+                    ),
+                )
+                self.ws.run_forever()
+            except Exception as e:
+                logger.error(f"Erro ao conectar ao WebSocket privado: {e}")
+            if self.is_running:
+                time.sleep(5)
+
+    def start(self):
+        self.is_running = True
+        Thread(target=self._run, daemon=True).start()
+
+    def stop(self):
+        self.is_running = False
+        if self.ws:
+            self.ws.close()
+
+
+class ExchangeSimulada:
+    """
+    Exchange local usada no modo dry-run.
+
+    Implementa o subconjunto da API assíncrona do ccxt usado pelo OrderExecutor e
+    publica no OrderCache as mesmas atualizações que o WebSocket privado enviaria.
+    """
+
+    has = {"createOrders": True}
+
+    def __init__(self, cache, latencia_ms=0.0):
+        self.cache = cache
+        self.latencia_ms = latencia_ms
+        self._ids = itertools.count(1)
+
+    async def load_markets(self, reload=False):
+        return {}
+
+    def amount_to_precision(self, symbol, amount):
+        return f"{amount:.6f}"
+
+    def price_to_precision(self, symbol, price):
+        return f"{price:.8f}"
+
+    async def create_order(self, symbol, type, side, amount, price=None, params=None):
+        params = params or {}
+        if self.latencia_ms:
+            await asyncio.sleep(self.latencia_ms / 1000)
+
+        order_id = f"dry-{next(self._ids)}"
+        lado = "Buy" if side == "buy" else "Sell"
+        preenchida = type == "market"
+        ordem = {
+            "orderId": order_id,
+            "symbol": symbol,
+            "side": lado,
+            "orderType": "Market" if preenchida else "Limit",
+            "qty": str(amount),
+            "price": str(price or ""),
+            "avgPrice": str(price or "") if preenchida else "",
+            "cumExecQty": str(amount) if preenchida else "0",
+            "orderStatus": "Filled" if preenchida else "New",
+            "reduceOnly": bool(params.get("reduceOnly", False)),
+        }
+        self.cache.processar("order", [ordem])
+
+        if preenchida:
+            self.cache.processar(
+                "execution",
+                [
+                    {
+                        "orderId": order_id,
+                        "symbol": symbol,
+                        "side": lado,
+                        "execQty": str(amount),
+                        "execPrice": str(price),
+                        "execTime": str(int(time.time() * 1000)),
+                    }
+                ],
+            )
+            self.cache.processar(
+                "position",
+                [
+                    {
+                        "symbol": symbol,
+                        "side": lado,
+                        "size": str(amount),
+                        "entryPrice": str(price),
+                        "stopLoss": str(params.get("stopLoss", {}).get("triggerPrice", "")),
+                    }
+                ],
+            )
+
+        return {"id": order_id, "symbol": symbol, "status": ordem["orderStatus"], "info": ordem}
+
+    async def create_orders(self, orders, params=None):
+        return [
+            await self.create_order(
+                o["symbol"], o["type"], o["side"], o["amount"], o.get("price"), o.get("params")
+            )
+            for o in orders
+        ]
+
+    async def close(self):
+        return None
+
+
+def mercados_lineares(markets_by_id):
+    """
+    Mapeia os IDs da Bybit para os símbolos unificados dos contratos lineares.
+
+    O mesmo ID ("BTCUSDT") existe no spot e no perpétuo linear; sem o símbolo
+    unificado, o ccxt resolve o ID pelo `defaultType` e pode cair no mercado spot.
+
+    Args:
+        markets_by_id (dict): `exchange.markets_by_id` (ID -> lista de mercados).
+
+    Returns:
+        dict: ID -> símbolo (ex: "BTC/USDT:USDT").
+    """
+    mercados = {}
+    for id_mercado, entradas in (markets_by_id or {}).items():
+        for mercado in entradas if isinstance(entradas, list) else [entradas]:
+            if mercado.get("linear") and mercado.get("swap"):
+                mercados[id_mercado] = mercado["symbol"]
+                break
+    return mercados
+
+
+class OrderExecutor:
+    """
+    Transforma os resultados de `identify_entries` em ordens na exchange.
+
+    Para cada sinal envia:
+        - Ordem de entrada a mercado com o SL anexado (parâmetro `stopLoss` da Bybit).
+        - Escada de TPs como ordens limite reduce-only, enviadas em lote.
+
+    A latência entre o sinal e a confirmação da ordem de entrada é medida e
+    comparada com o orçamento `ORDER_LATENCY_BUDGET_MS`.
+    """
+
+    def __init__(
+        self,
+        exchange,
+        cache=None,
+        dry_run=EXECUTION_DRY_RUN,
+        orcamento_latencia_ms=ORDER_LATENCY_BUDGET_MS,
+        notional_usdt=EXECUTION_NOTIONAL_USDT,
+    ):
+        self.exchange = exchange
+        self.cache = cache if cache is not None else OrderCache()
+        self.dry_run = dry_run
+        self.orcamento_latencia_ms = orcamento_latencia_ms
+        self.notional_usdt = notional_usdt
+        self.latencias = deque(maxlen=500)
+        self.loop = None
+        self.mercados = {}  # ID da Bybit ("BTCUSDT") -> símbolo unificado linear do ccxt
+
+    async def iniciar(self):
+        """Carrega os mercados e aquece a conexão antes do primeiro sinal."""
+        self.loop = asyncio.get_running_loop()
+        await self.exchange.load_markets()
+        self.mercados = mercados_lineares(getattr(self.exchange, "markets_by_id", None))
+        if not self.dry_run and hasattr(self.exchange, "is_unified_enabled"):
+            # O ccxt consulta o tipo de conta no primeiro envio; antecipar a
+            # chamada tira essa ida à API do caminho crítico da primeira ordem.
+            await self.exchange.is_unified_enabled()
+        logger.info(f"Executor de ordens iniciado ({'dry-run' if self.dry_run else 'real'}).")
+
+    def mercado(self, symbol):
+        """
+        Símbolo do ccxt para um par da Bybit: o contrato perpétuo linear (ex:
+        "BTC/USDT:USDT"), ou o próprio ID sem mercados carregados (dry-run).
+        """
+        return self.mercados.get(symbol, symbol)
+
+    def submeter(self, symbol, resultado, preco, quantidade=None):
+        """
+        Agenda a execução de um sinal a partir de qualquer thread
+        (ex: a thread do WebSocketManager).
+
+        Returns:
+            concurrent.futures.Future | None: Futuro com o resultado da execução.
+        """
+        if self.loop is None:
+            logger.error("Executor de ordens não iniciado; sinal ignorado.")
+            return None
+        return asyncio.run_coroutine_threadsafe(
+            self.executar_sinal(symbol, resultado, preco, quantidade, time.perf_counter()),
+            self.loop,
+        )
+
+    async def executar_sinal(self, symbol, resultado, preco, quantidade=None, t_sinal=None):
+        """
+        Envia a entrada, o SL e a escada de TPs de um sinal.
+
+        Args:
+            symbol (str): Símbolo do par (ex: "BTCUSDT").
+            resultado (dict): Resultado de `identify_entries`.
+            preco (float): Preço atual do ativo, usado para dimensionar a posição.
+            quantidade (float, optional): Quantidade da ordem. Defaults to
+                EXECUTION_NOTIONAL_USDT / preco.
+            t_sinal (float, optional): Instante do sinal (time.perf_counter()).
+
+        Returns:
+            dict | None: Ordens criadas e latência da entrada, ou None se não houve envio.
+        """
+        t_sinal = t_sinal if t_sinal is not None else time.perf_counter()
+        entry_type = resultado.get("entry_type")
+        if entry_type not in ("BUY/LONG", "SELL/SHORT"):
+            return None
+
+        lado = "buy" if entry_type == "BUY/LONG" else "sell"
+        lado_saida = "sell" if lado == "buy" else "buy"
+        mercado = self.mercado(symbol)
+        quantidade = self._quantidade(mercado, quantidade or self.notional_usdt / preco)
+        if quantidade <= 0:
+            logger.warning(f"Quantidade inválida para {symbol}; sinal ignorado.")
+            return None
+
+        sl = resultado.get("sl")
+        params_entrada = {"stopLoss": {"triggerPrice": sl}} if sl else {}
+
+        try:
+            entrada = await self.exchange.create_order(
+                mercado,
+                "market",
+                lado,
+                quantidade,
+                preco if self.dry_run else None,
+                params_entrada,
+            )
+        except Exception as e:
+            logger.error(f"Erro ao enviar a entrada de {symbol}: {e}")
+            return None
+
+        latencia_ms = (time.perf_counter() - t_sinal) * 1000
+        self.latencias.append(latencia_ms)
+        if latencia_ms > self.orcamento_latencia_ms:
+            logger.warning(
+                f"Latência sinal→ordem de {symbol} acima do orçamento: "
+                f"{latencia_ms:.1f} ms > {self.orcamento_latencia_ms:.0f} ms"
+            )
+
+        ordens_tp = self._montar_escada_tp(mercado, lado_saida, quantidade, resultado.get("tps") or [])
+        try:
+            tps = await self._enviar_lote(ordens_tp)
+        except Exception as e:
+            logger.error(f"Erro ao enviar a escada de TPs de {symbol}: {e}")
+            tps = []
+
+        logger.info(
+            f"{entry_type} {symbol}: entrada {quantidade} enviada em {latencia_ms:.1f} ms, "
+            f"{len(tps)} TP(s), SL {sl}"
+        )
+        return {"entrada": entrada, "tps": tps, "latencia_ms": latencia_ms}
+
+    def _quantidade(self, symbol, quantidade):
+        try:
+            return float(self.exchange.amount_to_precision(symbol, quantidade))
+        except Exception as e:
+            logger.error(f"Erro ao ajustar a precisão da quantidade de {symbol}: {e}")
+            return 0.0
+
+    def _montar_escada_tp(self, symbol, lado, quantidade, tps):
+        """Divide a quantidade entre os TPs como ordens limite reduce-only."""
+        ordens = []
+        restante = quantidade
+        for i, tp in enumerate(tps):
+            ultimo = i == len(tps) - 1
+            parte = self._quantidade(symbol, restante if ultimo else quantidade / len(tps))
+            if parte <= 0:
+                continue
+            restante -= parte
+            ordens.append(
+                {
+                    "symbol": symbol,
+                    "type": "limit",
+                    "side": lado,
+                    "amount": parte,
+                    "price": float(self.exchange.price_to_precision(symbol, tp)),
+                    "params": {"reduceOnly": True},
+                }
+            )
+        return ordens
+
+    async def _enviar_lote(self, ordens):
+        """Envia ordens pelo endpoint de lote quando disponível."""
+        if not ordens:
+            return []
+        if self.exchange.has.get("createOrders"):
+            criadas = []
+            for i in range(0, len(ordens), TAMANHO_LOTE_BYBIT):
+                criadas.extend(await self.exchange.create_orders(ordens[i : i + TAMANHO_LOTE_BYBIT]))
+            return criadas
+        return await asyncio.gather(
+            *[
+                self.exchange.create_order(
+                    o["symbol"], o["type"], o["side"], o["amount"], o["price"], o["params"]
+                )
+                for o in ordens
+            ]
+        )
+
+    def estatisticas_latencia(self):
+        """Retorna p50, p99 e máximo (ms) das últimas latências sinal→ordem."""
+        if not self.latencias:
+            return {"amostras": 0, "p50": None, "p99": None, "max": None}
+        ordenadas = sorted(self.latencias)
+        n = len(ordenadas)
+        return {
+            "amostras": n,
+            "p50": ordenadas[n // 2],
+            "p99": ordenadas[min(n - 1, int(n * 0.99))],
+            "max": ordenadas[-1],
+        }
+
+    async def fechar(self):
+        await self.exchange.close()
+
+
+async def criar_executor(testnet=False, dry_run=EXECUTION_DRY_RUN):
+    """
+    Cria e inicia o OrderExecutor.
+
+    No modo dry-run usa a ExchangeSimulada; caso contrário conecta o ccxt
+    assíncrono e o WebSocket privado que alimenta o cache de ordens/posições.
+
+    Args:
+        testnet (bool, optional): Usa a Testnet da Bybit. Defaults to False.
+        dry_run (bool, optional): Usa a exchange simulada local. Defaults to EXECUTION_DRY_RUN.
+
+    Returns:
+        OrderExecutor: Executor pronto para receber sinais.
+    """
+    cache = OrderCache()
+    if dry_run:
+        exchange = ExchangeSimulada(cache)
+    else:
+        from config_bybit import connect_bybit_async
+
+        exchange, _ = connect_bybit_async(testnet=testnet)
+        PrivateStream(
+            os.getenv("BYBIT_API_KEY"), os.getenv("BYBIT_API_SECRET"), cache, testnet
+        ).start()
+
+    executor = OrderExecutor(exchange, cache, dry_run=dry_run)
+    await executor.iniciar()
+    return executor
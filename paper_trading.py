@@ -0,0 +1,282 @@
+# Arquivo paper_trading.py
+# Este arquivo contém o simulador de operações (paper trading): cada alerta emitido
+# abre uma posição virtual com a escada de TPs e o SL de `calculate_tp_sl`, e cada
+# preço recebido (kline, negócios ou melhor bid/ask do tópico tickers) é conferido
+# contra os níveis abertos.
+# - Os níveis ficam em índices ordenados por par e por sentido de cruzamento; um
+#   preço dispara apenas o prefixo/sufixo cruzado (bisect), então cada tick custa
+#   O(log n + níveis atingidos), e não uma varredura das posições.
+# - Posições compradas saem pelo bid e vendidas pelo ask. TPs parciais encerram uma
+#   fração igual da posição; o SL encerra o restante.
+# - Cada saída (parcial ou total) é gravada no diário (tabela `resultados`), o que
+#   alimenta as estatísticas, o drawdown e o relatório do TradeJournal.
+# O relógio é injetável, então o mesmo simulador roda no bot ao vivo e no replay.
+
+import bisect
+import itertools
+import time
+
+from loguru import logger
+
+from constants import PAPER_FEE_PCT, PAPER_NOTIONAL_USDT
+
+
+class IndiceNiveis:
+    """
+    Níveis de preço ordenados, disparados quando o preço cruza o nível em um sentido.
+
+    Args:
+        acima (bool): True para níveis disparados com preço >= nível (ex: TP de
+            compra); False para preço <= nível (ex: SL de compra).
+    """
+
+    __slots__ = ("acima", "niveis", "itens")
+
+    def __init__(self, acima):
+        self.acima = acima
+        self.niveis = []  # Preços, em ordem crescente
+        self.itens = []  # (posição, índice do nível na posição), na mesma ordem
+
+    def adicionar(self, nivel, item):
+        i = bisect.bisect_right(self.niveis, nivel)
+        self.niveis.insert(i, nivel)
+        self.itens.insert(i, item)
+
+    def remover(self, nivel, item):
+        i = bisect.bisect_left(self.niveis, nivel)
+        while i < len(self.niveis) and self.niveis[i] == nivel:
+            if self.itens[i] is item:
+                del self.niveis[i]
+                del self.itens[i]
+                return
+            i += 1
+
+    def disparar(self, preco):
+        """
+        Remove e retorna os itens cujos níveis foram cruzados pelo preço, do nível
+        mais próximo do preço anterior ao mais distante (um salto por vários TPs sai
+        como TP1, TP2, ...).
+        """
+        if self.acima:
+            fim = bisect.bisect_right(self.niveis, preco)
+            if not fim:
+                return []
+            disparados = self.itens[:fim]
+            del self.niveis[:fim]
+            del self.itens[:fim]
+        else:
+            inicio = bisect.bisect_left(self.niveis, preco)
+            if inicio == len(self.niveis):
+                return []
+            disparados = self.itens[inicio:][::-1]  # Do nível mais alto ao mais baixo
+            del self.niveis[inicio:]
+            del self.itens[inicio:]
+        return disparados
+
+    def __len__(self):
+        return len(self.niveis)
+
+
+class PosicaoVirtual:
+    """Posição aberta pelo simulador."""
+
+    __slots__ = (
+        "id",
+        "symbol",
+        "timeframe",
+        "entry_type",
+        "entrada",
+        "quantidade",
+        "restante",
+        "tps",
+        "sl",
+        "tps_atingidos",
+        "pnl",
+        "aberta_em",
+        "niveis",
+    )
+
+    def __init__(self, id, symbol, timeframe, entry_type, entrada, quantidade, tps, sl, aberta_em):
+        self.id = id
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.entry_type = entry_type
+        self.entrada = entrada
+        self.quantidade = quantidade
+        self.restante = quantidade
+        self.tps = tps
+        self.sl = sl
+        self.tps_atingidos = 0
+        self.pnl = 0.0
+        self.aberta_em = aberta_em
+        self.niveis = []  # (índice, nível, item) registrados, para remover ao encerrar
+
+    @property
+    def comprada(self):
+        return self.entry_type == "BUY/LONG"
+
+
+class PaperTrading:
+    """
+    Simulador de operações a partir dos alertas.
+
+    Args:
+        journal (TradeJournal, optional): Diário onde as saídas são gravadas. Defaults to None.
+        notional (float, optional): Valor (USDT) de cada posição. Defaults to PAPER_NOTIONAL_USDT.
+        taxa_pct (float, optional): Taxa por lado (% do notional). Defaults to PAPER_FEE_PCT.
+        relogio (callable, optional): Horário atual (s). Defaults to time.time.
+    """
+
+    def __init__(
+        self,
+        journal=None,
+        notional=PAPER_NOTIONAL_USDT,
+        taxa_pct=PAPER_FEE_PCT,
+        relogio=time.time,
+    ):
+        self.journal = journal
+        self.notional = notional
+        self.taxa = taxa_pct / 100
+        self.relogio = relogio
+        # símbolo -> (acima pelo bid, abaixo pelo bid, acima pelo ask, abaixo pelo ask)
+        self.indices = {}
+        self.abertas = {}  # id -> PosicaoVirtual
+        self.ids = itertools.count(1)
+        self.encerradas = 0
+        self.vitorias = 0
+        self.pnl_total = 0.0
+
+    def _indices(self, symbol):
+        indices = self.indices.get(symbol)
+        if indices is None:
+            indices = self.indices[symbol] = tuple(
+                IndiceNiveis(acima) for acima in (True, False, True, False)
+            )
+        return indices
+
+    def abrir(self, symbol, timeframe, resultado, preco):
+        """
+        Abre uma posição virtual a partir de um sinal de compra/venda.
+
+        Returns:
+            PosicaoVirtual | None: A posição, ou None se o sinal não tem TP/SL válidos.
+        """
+        entry_type = resultado.get("entry_type")
+        tps = [float(tp) for tp in resultado.get("tps") or []]
+        sl = resultado.get("sl")
+        if entry_type not in ("BUY/LONG", "SELL/SHORT") or not preco or sl is None:
+            return None
+        comprada = entry_type == "BUY/LONG"
+        # Apenas TPs do lado do lucro (a escada pode conter o próprio preço de entrada)
+        tps = sorted(
+            (tp for tp in tps if (tp > preco if comprada else tp < preco)), reverse=not comprada
+        )
+        posicao = PosicaoVirtual(
+            next(self.ids),
+            symbol,
+            timeframe,
+            entry_type,
+            float(preco),
+            self.notional / float(preco),
+            tps,
+            float(sl),
+            self.relogio(),
+        )
+        acima_bid, abaixo_bid, acima_ask, abaixo_ask = self._indices(symbol)
+        # Compradas saem pelo bid (TP acima, SL abaixo); vendidas pelo ask (o inverso)
+        indice_tp, indice_sl = (acima_bid, abaixo_bid) if comprada else (abaixo_ask, acima_ask)
+        for i, tp in enumerate(tps):
+            self._registrar(posicao, indice_tp, tp, i)
+        self._registrar(posicao, indice_sl, posicao.sl, None)
+        self.abertas[posicao.id] = posicao
+        return posicao
+
+    @staticmethod
+    def _registrar(posicao, indice, nivel, tp):
+        item = (posicao, tp)
+        indice.adicionar(nivel, item)
+        posicao.niveis.append((indice, nivel, item))
+
+    def on_preco(self, symbol, bid, ask=None):
+        """
+        Confere um preço do par contra os níveis abertos.
+
+        Args:
+            symbol (str): Par.
+            bid (float): Melhor bid (ou o último preço, sem livro).
+            ask (float, optional): Melhor ask. Defaults to None (igual ao bid).
+
+        Returns:
+            int: Níveis atingidos.
+        """
+        indices = self.indices.get(symbol)
+        if indices is None:
+            return 0
+        ask = bid if ask is None else ask
+        acima_bid, abaixo_bid, acima_ask, abaixo_ask = indices
+        atingidos = 0
+        for indice, preco in ((acima_bid, bid), (abaixo_bid, bid), (acima_ask, ask), (abaixo_ask, ask)):
+            if not indice.niveis:
+                continue
+            for posicao, tp in indice.disparar(preco):
+                if posicao.id not in self.abertas:
+                    continue
+                atingidos += 1
+                if tp is None:
+                    self._sair(posicao, preco, posicao.restante, "SL")
+                else:
+                    self._sair_tp(posicao, tp)
+        return atingidos
+
+    def _sair_tp(self, posicao, tp):
+        posicao.tps_atingidos += 1
+        ultimo = posicao.tps_atingidos == len(posicao.tps)
+        quantidade = posicao.restante if ultimo else posicao.quantidade / len(posicao.tps)
+        # Ordem limitada no nível: preenchida no preço do TP
+        self._sair(posicao, posicao.tps[tp], quantidade, f"TP{tp + 1}")
+
+    def _sair(self, posicao, preco, quantidade, motivo):
+        sentido = 1 if posicao.comprada else -1
+        taxas = (posicao.entrada + preco) * quantidade * self.taxa
+        pnl = (preco - posicao.entrada) * quantidade * sentido - taxas
+        posicao.restante -= quantidade
+        posicao.pnl += pnl
+        if self.journal:
+            self.journal.registrar_resultado(
+                posicao.symbol,
+                posicao.timeframe,
+                posicao.entry_type,
+                posicao.entrada,
+                preco,
+                quantidade,
+                pnl,
+                motivo,
+                ts=self.relogio(),
+            )
+        if posicao.restante <= posicao.quantidade * 1e-9:
+            self._encerrar(posicao)
+
+    def _encerrar(self, posicao):
+        del self.abertas[posicao.id]
+        for indice, nivel, item in posicao.niveis:
+            indice.remover(nivel, item)
+        self.encerradas += 1
+        self.vitorias += posicao.pnl > 0
+        self.pnl_total += posicao.pnl
+        logger.debug(
+            "Paper trading: {} {} encerrada com PnL {:.2f} USDT ({} TPs).",
+            posicao.entry_type,
+            posicao.symbol,
+            posicao.pnl,
+            posicao.tps_atingidos,
+            symbol=posicao.symbol,
+        )
+
+    def resumo(self):
+        return {
+            "abertas": len(self.abertas),
+            "encerradas": self.encerradas,
+            "taxa_acerto": self.vitorias / self.encerradas if self.encerradas else None,
+            "pnl_total": self.pnl_total,
+            "pnl_aberto_realizado": sum(p.pnl for p in self.abertas.values()),
+        }
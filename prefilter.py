@@ -0,0 +1,170 @@
+# Arquivo prefilter.py
+# Este arquivo contém o nível 1 da avaliação em dois níveis do scanner:
+# - Para cada atualização de vela, algumas features O(1) são lidas do estado
+#   incremental do par (EstadoIndicadores): RSI (com o preço atual), distância do
+#   preço à EMA e volume relativo.
+# - Um sinal de compra/venda de `identify_entries` exige o RSI além dos limiares
+#   (30/70); pares longe deles (com uma folga) não passam pela pilha completa de
+#   indicadores, Ichimoku, padrões e ATR.
+# - As features ficam em arrays por par, o que permite calcular a taxa de aprovação
+#   de todos os pares de uma vez a cada vela confirmada.
+# - No modo de auditoria, uma fração dos pares reprovados é avaliada por completo
+#   para contar os sinais que o pré-filtro teria perdido.
+
+import numpy as np
+from loguru import logger
+
+from constants import (
+    PREFILTER_AUDIT_EVERY,
+    PREFILTER_MIN_VOLUME_RATIO,
+    PREFILTER_RSI_MARGIN,
+)
+
+
+class PreFiltro:
+    """
+    Pré-filtro (nível 1) das avaliações do scanner.
+
+    Args:
+        limiar_compra (float, optional): RSI de compra de identify_entries. Defaults to 30.
+        limiar_venda (float, optional): RSI de venda de identify_entries. Defaults to 70.
+        folga_rsi (float, optional): Folga sobre os limiares. Defaults to PREFILTER_RSI_MARGIN.
+        volume_minimo (float, optional): Volume relativo mínimo (0 desativa).
+            Defaults to PREFILTER_MIN_VOLUME_RATIO.
+        auditar_a_cada (int, optional): Avalia por completo 1 a cada N reprovados
+            (0 desativa). Defaults to PREFILTER_AUDIT_EVERY.
+    """
+
+    def __init__(
+        self,
+        limiar_compra=30,
+        limiar_venda=70,
+        folga_rsi=PREFILTER_RSI_MARGIN,
+        volume_minimo=PREFILTER_MIN_VOLUME_RATIO,
+        auditar_a_cada=PREFILTER_AUDIT_EVERY,
+        capacidade=256,
+    ):
+        self.rsi_compra = limiar_compra + folga_rsi
+        self.rsi_venda = limiar_venda - folga_rsi
+        self.volume_minimo = volume_minimo
+        self.auditar_a_cada = auditar_a_cada
+        self.posicoes = {}  # símbolo -> posição nos arrays
+        # Features da última atualização de cada par (NaN enquanto aquece)
+        self.rsi = np.full(capacidade, np.nan)
+        self.distancia_ema = np.full(capacidade, np.nan)
+        self.volume_relativo = np.full(capacidade, np.nan)
+        # Contadores: avaliações, aprovadas, auditadas e sinais perdidos
+        self.avaliacoes = self.aprovadas = self.auditadas = self.perdidos = 0
+        self._reprovadas = 0
+        self._ultima_vela = None
+
+    def _posicao(self, symbol):
+        posicao = self.posicoes.get(symbol)
+        if posicao is None:
+            posicao = self.posicoes[symbol] = len(self.posicoes)
+            if posicao >= len(self.rsi):
+                novo = len(self.rsi) * 2
+                for nome in ("rsi", "distancia_ema", "volume_relativo"):
+                    antigo = getattr(self, nome)
+                    array = np.full(novo, np.nan)
+                    array[: len(antigo)] = antigo
+                    setattr(self, nome, array)
+        return posicao
+
+    def avaliar(self, symbol, estado, vela):
+        """
+        Decide se o par passa para a avaliação completa.
+
+        Args:
+            symbol (str): Par.
+            estado (EstadoIndicadores): Estado incremental do par.
+            vela (dict): Última vela (confirmada ou em andamento).
+
+        Returns:
+            tuple: (aprovado, auditoria). `auditoria` indica um par reprovado que
+            deve ser avaliado por completo apenas para conferência.
+        """
+        indicadores = estado.indicadores
+        preco = float(vela["close"])
+        if not indicadores["rsi"].pronto:
+            return True, False  # Aquecendo: sem features confiáveis
+        # Vela em andamento: valores provisórios (o estado não é alterado)
+        valores = estado.espiar(vela)
+        rsi, ema = valores["rsi"], valores["ema"]
+        volume_medio = indicadores["volume"].media  # Média das velas confirmadas
+
+        posicao = self._posicao(symbol)
+        self.rsi[posicao] = rsi
+        self.distancia_ema[posicao] = (preco - ema) / ema * 100 if ema else np.nan
+        volume_relativo = float(vela["volume"]) / volume_medio if volume_medio else np.nan
+        self.volume_relativo[posicao] = volume_relativo
+
+        aprovado = rsi <= self.rsi_compra or rsi >= self.rsi_venda
+        if aprovado and self.volume_minimo and volume_relativo == volume_relativo:
+            aprovado = volume_relativo >= self.volume_minimo
+
+        self.avaliacoes += 1
+        if aprovado:
+            self.aprovadas += 1
+            return True, False
+        self._reprovadas += 1
+        auditoria = bool(self.auditar_a_cada) and self._reprovadas % self.auditar_a_cada == 0
+        if auditoria:
+            self.auditadas += 1
+        return False, auditoria
+
+    def registrar_auditoria(self, symbol, result):
+        """Conta um sinal de compra/venda encontrado em um par reprovado."""
+        if result and result.get("entry_type") in ("BUY/LONG", "SELL/SHORT"):
+            self.perdidos += 1
+            logger.warning(
+                "Pré-filtro reprovou um sinal {} de {}.",
+                result["entry_type"],
+                symbol,
+                symbol=symbol,
+                limite=1,
+            )
+
+    def mascara(self):
+        """Aprovação de todos os pares pelas últimas features (avaliação vetorizada)."""
+        n = len(self.posicoes)
+        rsi = self.rsi[:n]
+        aprovados = (rsi <= self.rsi_compra) | (rsi >= self.rsi_venda) | np.isnan(rsi)
+        if self.volume_minimo:
+            volume = self.volume_relativo[:n]
+            aprovados &= ~(volume < self.volume_minimo)
+        return aprovados
+
+    def fechar_vela(self, start):
+        """
+        Registra no log a taxa de aprovação ao mudar a vela confirmada.
+
+        Returns:
+            bool: True se `start` é uma nova vela.
+        """
+        if start == self._ultima_vela:
+            return False
+        if self._ultima_vela is not None and self.posicoes:
+            mascara = self.mascara()
+            logger.info(
+                "Pré-filtro: {}/{} pares aprovados na vela ({:.0%} das avaliações{}).",
+                int(mascara.sum()),
+                len(mascara),
+                self.taxa_aprovacao(),
+                f"; {self.perdidos} perdidos em {self.auditadas} auditadas" if self.auditadas else "",
+                limite=1,
+            )
+        self._ultima_vela = start
+        return True
+
+    def taxa_aprovacao(self):
+        return self.aprovadas / self.avaliacoes if self.avaliacoes else 1.0
+
+    def estatisticas(self):
+        return {
+            "avaliacoes": self.avaliacoes,
+            "aprovadas": self.aprovadas,
+            "taxa_aprovacao": self.taxa_aprovacao(),
+            "auditadas": self.auditadas,
+            "perdidos": self.perdidos,
+        }
@@ -0,0 +1,355 @@
+# Arquivo replay.py
+# Este arquivo contém o modo de replay de eventos: frames do WebSocket da Bybit
+# gravados são entregues, na ordem e o mais rápido possível, ao mesmo pipeline do
+# bot ao vivo (WebSocketManager.on_message -> indicadores -> identify_entries ->
+# alertas), com um relógio virtual e um coletor local no lugar do Telegram.
+# Ao final, informa a vazão e a divergência em relação aos alertas gravados no diário.
+#
+# Fontes de frames:
+# - Diretório de captura (market_capture.py), com filtro opcional por tempo e par.
+# - JSON Lines (opcionalmente .gz), uma linha por frame recebido:
+#   {"ts": <segundos desde a época, no recebimento>, "frame": "<mensagem original>"}
+#
+# Uso: python replay.py data/capture [--journal data/journal.db] [--timeframe 1]
+
+import argparse
+import bisect
+import gzip
+import json
+import os
+import sqlite3
+import time
+from collections import defaultdict
+
+from loguru import logger
+
+from constants import (
+    CANDLE_SOURCE,
+    BAR_SCHEDULER_ENABLED,
+    ML_ENABLED,
+    PAPER_TRADING_ENABLED,
+    PREFILTER_ENABLED,
+    SR_ENABLED,
+    TICK_AGGREGATION_ENABLED,
+    TICKER_FEATURES_ENABLED,
+    TIMEFRAME,
+)
+from tick_aggregator import timeframe_em_segundos
+
+
+class RelogioVirtual:
+    """Relógio controlado pelo replay: avança com o timestamp de cada frame."""
+
+    def __init__(self, inicio=0.0):
+        self.agora = inicio
+
+    def __call__(self):
+        return self.agora
+
+    def avancar(self, ts):
+        if ts > self.agora:
+            self.agora = ts
+
+
+class ColetorAlertas:
+    """Substitui o envio ao Telegram, guardando os alertas com o horário virtual."""
+
+    def __init__(self, relogio):
+        self.relogio = relogio
+        self.alertas = []  # (ts, símbolo, tipo de entrada, mensagem)
+        self.intrabar = []  # Provisórios e cancelamentos, fora da comparação com o diário
+
+    def enviar(self, mensagem):
+        destino = (
+            self.intrabar
+            if mensagem.get("provisorio") or mensagem.get("cancelado")
+            else self.alertas
+        )
+        destino.append((self.relogio(), mensagem["simbolo"], mensagem["tipo_entrada"], mensagem))
+
+
+def ler_frames(caminhos, inicio=None, fim=None, simbolos=None):
+    """
+    Lê os frames gravados, em ordem, de diretórios de captura ou arquivos JSON Lines.
+    Os filtros por tempo e par valem apenas para os diretórios de captura.
+
+    Yields:
+        tuple: (ts em segundos, frame original como str).
+    """
+    for caminho in caminhos:
+        if os.path.isdir(caminho):
+            from market_capture import LeitorCaptura
+
+            yield from LeitorCaptura(caminho).frames(inicio, fim, simbolos)
+            continue
+        abrir = gzip.open if caminho.endswith(".gz") else open
+        with abrir(caminho, "rt", encoding="utf-8") as arquivo:
+            for linha in arquivo:
+                if linha.strip():
+                    registro = json.loads(linha)
+                    yield registro["ts"], registro["frame"]
+
+
+class Replay:
+    """
+    Monta o pipeline ao vivo em modo offline.
+
+    Args:
+        timeframe (str, optional): Timeframe das velas. Defaults to TIMEFRAME.
+        com_risco (bool, optional): Aplica o RiskManager (no relógio virtual), como
+            no bot ao vivo. Defaults to True.
+        journal (TradeJournal, optional): Diário onde gravar sinais/alertas do replay.
+            Defaults to None.
+    """
+
+    def __init__(self, timeframe=TIMEFRAME, com_risco=True, journal=None):
+        from risk_manager import RiskManager
+        from websocket_manager import WebSocketManager
+
+        self.timeframe = timeframe
+        self.relogio = RelogioVirtual()
+        self.coletor = ColetorAlertas(self.relogio)
+
+        self.tick_aggregator = None
+        if TICK_AGGREGATION_ENABLED or CANDLE_SOURCE == "trades":
+            from tick_aggregator import TickAggregator
+
+            # Sem a thread de relógio: as velas fecham pelo relógio virtual (veja executar)
+            self.tick_aggregator = TickAggregator(timeframe, relogio=self.relogio)
+
+        ticker_features = None
+        if TICKER_FEATURES_ENABLED:
+            from ticker_features import TickerFeatures
+
+            ticker_features = TickerFeatures()
+
+        ml = None
+        if ML_ENABLED:
+            from ml_scoring import EstagioML, carregar_modelo
+
+            ml = EstagioML(timeframe_em_segundos(timeframe) * 1000, carregar_modelo())
+
+        prefiltro = None
+        if PREFILTER_ENABLED:
+            from prefilter import PreFiltro
+
+            prefiltro = PreFiltro()
+
+        agendador = None
+        if BAR_SCHEDULER_ENABLED:
+            from bar_scheduler import AgendadorBarras
+
+            agendador = AgendadorBarras(timeframe_em_segundos(timeframe) * 1000)
+
+        paper = None
+        if PAPER_TRADING_ENABLED:
+            from paper_trading import PaperTrading
+
+            paper = PaperTrading(journal, relogio=self.relogio)
+
+        suporte_resistencia = None
+        if SR_ENABLED:
+            from support_resistance import MotorSR
+
+            suporte_resistencia = MotorSR()
+
+        self.manager = WebSocketManager(
+            "replay://",
+            [],
+            timeframe,
+            risk_manager=RiskManager(relogio=self.relogio) if com_risco else None,
+            journal=journal,
+            tick_aggregator=self.tick_aggregator,
+            ticker_features=ticker_features,
+            ml=ml,
+            prefiltro=prefiltro,
+            agendador=agendador,
+            paper=paper,
+            suporte_resistencia=suporte_resistencia,
+        )
+        self.manager.enviar_alerta = self.coletor.enviar
+
+    def executar(self, frames):
+        """
+        Entrega os frames ao `on_message` do manager.
+
+        Args:
+            frames (iterable): (ts, frame) em ordem de recebimento.
+
+        Returns:
+            dict: Estatísticas de vazão do replay.
+        """
+        duracao = timeframe_em_segundos(self.timeframe)
+        proximo_fechamento = None
+        quantidade = 0
+        primeiro_ts = None
+        inicio = time.perf_counter()
+        for ts, frame in frames:
+            if primeiro_ts is None:
+                primeiro_ts = ts
+                proximo_fechamento = (ts // duracao + 1) * duracao
+            self.relogio.avancar(ts)
+            if self.tick_aggregator and ts >= proximo_fechamento:
+                # Mesmo papel da thread de relógio do TickAggregator no bot ao vivo
+                self.tick_aggregator.fechar_barras(ts)
+                proximo_fechamento = (ts // duracao + 1) * duracao
+            self.manager.on_message(None, frame)
+            quantidade += 1
+        decorrido = time.perf_counter() - inicio
+        simulado = (self.relogio() - primeiro_ts) if primeiro_ts is not None else 0.0
+        return {
+            "frames": quantidade,
+            "pares": len(self.manager.data),
+            "alertas": len(self.coletor.alertas),
+            "segundos": decorrido,
+            "frames_por_segundo": quantidade / decorrido if decorrido > 0 else 0.0,
+            "tempo_simulado_s": simulado,
+            "aceleracao": simulado / decorrido if decorrido > 0 else 0.0,
+            "inicio": primeiro_ts,
+            "fim": self.relogio(),
+            "prefiltro": self.manager.prefiltro.estatisticas() if self.manager.prefiltro else None,
+            "agendador": self.manager.agendador.estatisticas() if self.manager.agendador else None,
+            "paper": self.manager.paper.resumo() if self.manager.paper else None,
+            "intrabar": dict(self.manager.contagem_intrabar) if self.manager.intrabar else None,
+        }
+
+
+def carregar_alertas_gravados(caminho_journal, timeframe, inicio, fim):
+    """
+    Lê os alertas emitidos pelo bot ao vivo no intervalo do replay.
+
+    Returns:
+        list: (ts em segundos, símbolo, tipo de entrada).
+    """
+    conexao = sqlite3.connect(f"file:{caminho_journal}?mode=ro", uri=True)
+    try:
+        linhas = conexao.execute(
+            "SELECT ts, symbol, entry_type FROM alertas "
+            "WHERE timeframe = ? AND ts BETWEEN ? AND ? ORDER BY ts",
+            (timeframe, int(inicio * 1000), int(fim * 1000)),
+        ).fetchall()
+    finally:
+        conexao.close()
+    return [(ts / 1000, symbol, entry_type) for ts, symbol, entry_type in linhas]
+
+
+def divergencia(alertas_replay, alertas_gravados, tolerancia_s):
+    """
+    Compara os alertas do replay com os gravados: um par casa quando símbolo e tipo
+    de entrada coincidem e os horários diferem em até `tolerancia_s`.
+
+    Returns:
+        dict: Contagens de coincidentes, apenas ao vivo e apenas no replay, e os
+        alertas divergentes.
+    """
+    disponiveis = defaultdict(list)  # (símbolo, tipo) -> horários do replay ainda livres
+    for ts, symbol, entry_type, *_ in alertas_replay:
+        disponiveis[(symbol, entry_type)].append(ts)
+    for horarios in disponiveis.values():
+        horarios.sort()
+
+    apenas_ao_vivo = []
+    coincidentes = 0
+    for ts, symbol, entry_type in alertas_gravados:
+        horarios = disponiveis.get((symbol, entry_type), [])
+        i = bisect.bisect_left(horarios, ts - tolerancia_s)
+        if i < len(horarios) and horarios[i] <= ts + tolerancia_s:
+            horarios.pop(i)
+            coincidentes += 1
+        else:
+            apenas_ao_vivo.append((ts, symbol, entry_type))
+
+    apenas_replay = sorted(
+        (ts, symbol, entry_type)
+        for (symbol, entry_type), horarios in disponiveis.items()
+        for ts in horarios
+    )
+    total = coincidentes + len(apenas_ao_vivo) + len(apenas_replay)
+    return {
+        "coincidentes": coincidentes,
+        "apenas_ao_vivo": len(apenas_ao_vivo),
+        "apenas_replay": len(apenas_replay),
+        "concordancia": coincidentes / total if total else 1.0,
+        "divergentes": {"ao_vivo": apenas_ao_vivo, "replay": apenas_replay},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay de frames gravados do WebSocket.")
+    parser.add_argument(
+        "arquivos", nargs="+", help="Diretórios de captura ou arquivos JSON Lines (.jsonl, .jsonl.gz)"
+    )
+    parser.add_argument("--inicio", type=float, help="Início (s desde a época), para capturas")
+    parser.add_argument("--fim", type=float, help="Fim (s desde a época), para capturas")
+    parser.add_argument("--simbolos", nargs="*", help="Pares a reproduzir, para capturas")
+    parser.add_argument("--timeframe", default=TIMEFRAME)
+    parser.add_argument("--journal", help="Diário do bot ao vivo para medir a divergência")
+    parser.add_argument("--sem-risco", action="store_true", help="Não aplica o RiskManager")
+    args = parser.parse_args()
+
+    # O pipeline registra cada sinal no log; no replay, apenas avisos e erros, sem arquivo
+    from log_config import configurar_logs
+
+    configurar_logs(arquivo=None, niveis={"websocket_manager": "WARNING"})
+
+    replay = Replay(args.timeframe, com_risco=not args.sem_risco)
+    estatisticas = replay.executar(
+        ler_frames(args.arquivos, args.inicio, args.fim, args.simbolos)
+    )
+    logger.info(
+        f"Replay: {estatisticas['frames']} frames de {estatisticas['pares']} pares em "
+        f"{estatisticas['segundos']:.1f} s ({estatisticas['frames_por_segundo']:.0f} frames/s, "
+        f"{estatisticas['aceleracao']:.0f}x o tempo real); {estatisticas['alertas']} alertas."
+    )
+
+    if estatisticas["prefiltro"]:
+        prefiltro = estatisticas["prefiltro"]
+        logger.info(
+            f"Pré-filtro: {prefiltro['aprovadas']}/{prefiltro['avaliacoes']} avaliações aprovadas "
+            f"({prefiltro['taxa_aprovacao']:.1%}); {prefiltro['perdidos']} sinais perdidos em "
+            f"{prefiltro['auditadas']} auditadas."
+        )
+
+    if estatisticas["agendador"]:
+        agendador = estatisticas["agendador"]
+        logger.info(
+            f"Agendador: {agendador['lotes']} lotes de velas ({agendador['lotes_no_prazo']} "
+            f"liberados pelo prazo); {agendador['atrasadas']} confirmações atrasadas."
+        )
+
+    if estatisticas["paper"]:
+        paper = estatisticas["paper"]
+        taxa = f"{paper['taxa_acerto']:.0%}" if paper["taxa_acerto"] is not None else "N/A"
+        logger.info(
+            f"Paper trading: {paper['encerradas']} posições encerradas (acerto {taxa}), "
+            f"PnL {paper['pnl_total']:.2f} USDT; {paper['abertas']} ainda abertas."
+        )
+
+    if estatisticas["intrabar"]:
+        intrabar = estatisticas["intrabar"]
+        logger.info(
+            f"Intrabar: {intrabar['avaliacoes']} avaliações; {intrabar['provisorios']} sinais "
+            f"provisórios, {intrabar['confirmados']} confirmados e {intrabar['cancelados']} "
+            f"cancelados no fechamento."
+        )
+
+    if args.journal and estatisticas["inicio"] is not None:
+        gravados = carregar_alertas_gravados(
+            args.journal, args.timeframe, estatisticas["inicio"], estatisticas["fim"]
+        )
+        resultado = divergencia(
+            replay.coletor.alertas, gravados, timeframe_em_segundos(args.timeframe)
+        )
+        logger.info(
+            f"Divergência: {resultado['coincidentes']} coincidentes, "
+            f"{resultado['apenas_ao_vivo']} apenas ao vivo, {resultado['apenas_replay']} "
+            f"apenas no replay (concordância {resultado['concordancia']:.1%})."
+        )
+        for ts, symbol, entry_type in resultado["divergentes"]["ao_vivo"][:20]:
+            logger.info(f"  apenas ao vivo: {time.strftime('%H:%M:%S', time.gmtime(ts))} {symbol} {entry_type}")
+        for ts, symbol, entry_type in resultado["divergentes"]["replay"][:20]:
+            logger.info(f"  apenas no replay: {time.strftime('%H:%M:%S', time.gmtime(ts))} {symbol} {entry_type}")
+
+
+if __name__ == "__main__":
+    main()
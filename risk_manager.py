@@ -0,0 +1,323 @@
+# Arquivo risk_manager.py
+# Este arquivo contém o gerenciador de risco em tempo real (item 3 do Roadmap).
+# Mantém agregados incrementais de exposição (por par, total e por grupo de pares
+# correlacionados), perda diária e frequência de sinais, de modo que cada
+# verificação pré-trade custe O(1) e possa rodar no caminho crítico.
+# Cada sinal aprovado reserva o seu notional até o fill (liquidada), a rejeição ou
+# o vencimento (liberada), para que uma rajada de sinais não passe pelos limites
+# antes de qualquer fill chegar.
+
+import time
+from collections import deque
+from threading import Lock
+
+from constants import (
+    CORRELATION_CLUSTERS,
+    DEFAULT_LEVERAGE,
+    LEVERAGE_MULTIPLIERS,
+    LEVERAGE_THRESHOLDS,
+    RISK_MAX_DAILY_LOSS_USDT,
+    RISK_MAX_EXPOSURE_CLUSTER_USDT,
+    RISK_MAX_EXPOSURE_SYMBOL_USDT,
+    RISK_MAX_EXPOSURE_TOTAL_USDT,
+    RISK_MAX_SIGNALS_PER_SYMBOL,
+    RISK_MAX_SIGNALS_TOTAL,
+    RISK_RESERVATION_TTL_S,
+    RISK_SIGNAL_WINDOW_S,
+    SL_DISTANCE_MULTIPLIERS,
+)
+from order_execution import STATUS_FINAIS
+
+
+class RiskManager:
+    """
+    Gerenciador de risco com agregados atualizados incrementalmente.
+
+    - Exposição (notional com sinal, em USDT) por par, total e por grupo correlacionado:
+      posição (fills) mais as reservas dos sinais aprovados ainda sem fill.
+    - PnL realizado do dia (UTC), com bloqueio ao atingir a perda máxima.
+    - Frequência de sinais por par e total em uma janela deslizante.
+
+    As atualizações acontecem nos fills/posições e nos sinais; `verificar` apenas
+    compara os agregados com os limites. Os sinais chegam pela thread do WebSocket
+    público e os fills pela do privado, por isso os agregados ficam sob um lock.
+    """
+
+    def __init__(
+        self,
+        max_exposicao_simbolo=RISK_MAX_EXPOSURE_SYMBOL_USDT,
+        max_exposicao_total=RISK_MAX_EXPOSURE_TOTAL_USDT,
+        max_exposicao_cluster=RISK_MAX_EXPOSURE_CLUSTER_USDT,
+        max_perda_diaria=RISK_MAX_DAILY_LOSS_USDT,
+        max_sinais_simbolo=RISK_MAX_SIGNALS_PER_SYMBOL,
+        max_sinais_total=RISK_MAX_SIGNALS_TOTAL,
+        janela_sinais_s=RISK_SIGNAL_WINDOW_S,
+        clusters=CORRELATION_CLUSTERS,
+        validade_reserva_s=RISK_RESERVATION_TTL_S,
+        relogio=time.time,
+    ):
+        self.max_exposicao_simbolo = max_exposicao_simbolo
+        self.max_exposicao_total = max_exposicao_total
+        self.max_exposicao_cluster = max_exposicao_cluster
+        self.max_perda_diaria = max_perda_diaria
+        self.max_sinais_simbolo = max_sinais_simbolo
+        self.max_sinais_total = max_sinais_total
+        self.janela_sinais_s = janela_sinais_s
+        self.validade_reserva_s = validade_reserva_s
+        self.relogio = relogio
+        self._lock = Lock()
+
+        # Pares fora de um grupo formam um grupo próprio
+        self.cluster_de = {
+            symbol: f"cluster{i}" for i, grupo in enumerate(clusters) for symbol in grupo
+        }
+
+        self.posicao = {}  # símbolo -> notional com sinal das posições (long > 0, short < 0)
+        self.reservado = {}  # símbolo -> notional com sinal reservado por sinais sem fill
+        self.exposicao = {}  # símbolo -> posição + reservado
+        self.exposicao_total = 0.0  # Soma de |exposição| de todos os pares
+        self.exposicao_cluster = {}  # grupo -> soma de |exposição| dos pares do grupo
+        self.pnl_diario = 0.0
+        self.dia = self._dia_atual()
+        self._pnl_acumulado = {}  # símbolo -> último cumRealisedPnl recebido
+        self.sinais = {}  # símbolo -> deque de timestamps dos sinais
+        self.sinais_total = deque()
+        self.reservas = {}  # ID da reserva -> (símbolo, notional com sinal)
+        self._reservas_simbolo = {}  # símbolo -> deque de IDs, da mais antiga à mais nova
+        self._vencimentos = deque()  # (vence_em, ID), em ordem de criação
+        self._proxima_reserva = 0
+
+    def _dia_atual(self):
+        return int(self.relogio() // 86400)
+
+    def _cluster(self, symbol):
+        return self.cluster_de.get(symbol, symbol)
+
+    # --- Atualizações incrementais ---
+
+    def _atualizar_exposicao(self, symbol):
+        """Recalcula a exposição do par (posição + reservas) e ajusta os agregados pela diferença."""
+        anterior = abs(self.exposicao.get(symbol, 0.0))
+        notional = self.posicao.get(symbol, 0.0) + self.reservado.get(symbol, 0.0)
+        if notional:
+            self.exposicao[symbol] = notional
+        else:
+            self.exposicao.pop(symbol, None)
+        delta = abs(notional) - anterior
+        self.exposicao_total += delta
+        cluster = self._cluster(symbol)
+        self.exposicao_cluster[cluster] = self.exposicao_cluster.get(cluster, 0.0) + delta
+
+    def definir_exposicao(self, symbol, notional):
+        """
+        Define a posição atual do par, ajustando os agregados pela diferença.
+
+        Args:
+            symbol (str): Símbolo do par.
+            notional (float): Notional com sinal (positivo = long, negativo = short).
+        """
+        with self._lock:
+            if notional:
+                self.posicao[symbol] = notional
+            else:
+                self.posicao.pop(symbol, None)
+            self._atualizar_exposicao(symbol)
+
+    def registrar_fill(self, symbol, lado, quantidade, preco):
+        """Soma um fill à posição do par ("buy" aumenta, "sell" reduz)."""
+        sinal = 1 if lado.lower() == "buy" else -1
+        self.definir_exposicao(
+            symbol, self.posicao.get(symbol, 0.0) + sinal * quantidade * preco
+        )
+
+    def registrar_pnl(self, valor):
+        """Soma um PnL realizado ao acumulado do dia (zerado na virada do dia UTC)."""
+        with self._lock:
+            self._virar_dia()
+            self.pnl_diario += valor
+
+    def registrar_sinal(self, symbol):
+        """Registra um sinal emitido para o controle de frequência."""
+        with self._lock:
+            agora = self.relogio()
+            self.sinais.setdefault(symbol, deque()).append(agora)
+            self.sinais_total.append(agora)
+
+    def reservar(self, symbol, entry_type, notional):
+        """
+        Reserva o notional de um sinal aprovado na exposição do par, até o fill
+        (`liquidar`), a rejeição (`liberar`) ou o vencimento (`validade_reserva_s`).
+
+        Returns:
+            int: ID da reserva.
+        """
+        with self._lock:
+            self._proxima_reserva += 1
+            reserva = self._proxima_reserva
+            valor = notional if entry_type == "BUY/LONG" else -notional
+            self.reservas[reserva] = (symbol, valor)
+            self._reservas_simbolo.setdefault(symbol, deque()).append(reserva)
+            self._vencimentos.append((self.relogio() + self.validade_reserva_s, reserva))
+            self.reservado[symbol] = self.reservado.get(symbol, 0.0) + valor
+            self._atualizar_exposicao(symbol)
+            return reserva
+
+    def liberar(self, reserva):
+        """Desfaz uma reserva (sinal rejeitado ou vencido). IDs já liberados são ignorados."""
+        with self._lock:
+            self._liberar(reserva)
+
+    def liquidar(self, symbol):
+        """
+        Encerra a reserva mais antiga do par (a ordem dela foi finalizada); um fill
+        passa a contar pela posição.
+        """
+        with self._lock:
+            fila = self._reservas_simbolo.get(symbol)
+            while fila:
+                if self._liberar(fila[0]):
+                    return
+
+    def _liberar(self, reserva):
+        dados = self.reservas.pop(reserva, None)
+        if dados is None:
+            return False
+        symbol, valor = dados
+        fila = self._reservas_simbolo[symbol]
+        fila.remove(reserva)  # Em geral a primeira: O(1)
+        if not fila:
+            del self._reservas_simbolo[symbol]
+        restante = self.reservado[symbol] - valor
+        if fila and restante:
+            self.reservado[symbol] = restante
+        else:
+            self.reservado.pop(symbol, None)
+        self._atualizar_exposicao(symbol)
+        return True
+
+    def _vencer_reservas(self):
+        agora = self.relogio()
+        while self._vencimentos and self._vencimentos[0][0] <= agora:
+            self._liberar(self._vencimentos.popleft()[1])
+
+    def ouvinte_ordens(self, topic, item):
+        """
+        Ouvinte para `OrderCache.ouvintes`: mantém a exposição a partir do tópico
+        `position`, o PnL diário a partir do `cumRealisedPnl` de cada posição e
+        encerra a reserva do par quando uma ordem de entrada é finalizada (tópico
+        `order`: executada, cancelada ou rejeitada).
+        """
+        symbol = item.get("symbol")
+        if not symbol:
+            return
+        if topic.startswith("order"):
+            if item.get("orderStatus") in STATUS_FINAIS and not item.get("reduceOnly"):
+                self.liquidar(symbol)
+            return
+        if not topic.startswith("position"):
+            return
+        tamanho = float(item.get("size") or 0)
+        preco = float(item.get("entryPrice") or item.get("avgPrice") or 0)
+        sinal = -1 if item.get("side") == "Sell" else 1
+        self.definir_exposicao(symbol, sinal * tamanho * preco)
+
+        if item.get("cumRealisedPnl") not in (None, ""):
+            acumulado = float(item["cumRealisedPnl"])
+            anterior = self._pnl_acumulado.get(symbol)
+            self._pnl_acumulado[symbol] = acumulado
+            if anterior is not None:
+                self.registrar_pnl(acumulado - anterior)
+
+    # --- Verificação pré-trade ---
+
+    def _virar_dia(self):
+        dia = self._dia_atual()
+        if dia != self.dia:
+            self.dia = dia
+            self.pnl_diario = 0.0
+
+    @staticmethod
+    def _expirar(fila, limite):
+        while fila and fila[0] < limite:
+            fila.popleft()
+
+    def verificar(self, symbol, entry_type, notional):
+        """
+        Verifica se um novo sinal/ordem respeita os limites de risco.
+
+        Args:
+            symbol (str): Símbolo do par.
+            entry_type (str): "BUY/LONG" ou "SELL/SHORT".
+            notional (float): Tamanho da ordem em USDT.
+
+        Returns:
+            tuple: (aprovado (bool), motivo (str | None)).
+        """
+        with self._lock:
+            return self._verificar(symbol, entry_type, notional)
+
+    def _verificar(self, symbol, entry_type, notional):
+        self._virar_dia()
+        self._vencer_reservas()
+        if self.pnl_diario <= -self.max_perda_diaria:
+            return False, f"Perda diária máxima atingida ({self.pnl_diario:.2f} USDT)"
+
+        limite = self.relogio() - self.janela_sinais_s
+        fila = self.sinais.get(symbol)
+        if fila:
+            self._expirar(fila, limite)
+            if len(fila) >= self.max_sinais_simbolo:
+                return False, f"Muitos sinais para {symbol} na janela ({len(fila)})"
+        self._expirar(self.sinais_total, limite)
+        if len(self.sinais_total) >= self.max_sinais_total:
+            return False, f"Muitos sinais na janela ({len(self.sinais_total)})"
+
+        # Exposição após a ordem; ordens que reduzem a posição sempre passam
+        atual = self.exposicao.get(symbol, 0.0)
+        nova = atual + (notional if entry_type == "BUY/LONG" else -notional)
+        delta = abs(nova) - abs(atual)
+        if delta <= 0:
+            return True, None
+        if abs(nova) > self.max_exposicao_simbolo:
+            return False, f"Exposição máxima do par excedida ({abs(nova):.2f} USDT)"
+        if self.exposicao_total + delta > self.max_exposicao_total:
+            return False, f"Exposição total máxima excedida ({self.exposicao_total + delta:.2f} USDT)"
+        cluster = self._cluster(symbol)
+        exposicao_cluster = self.exposicao_cluster.get(cluster, 0.0) + delta
+        if exposicao_cluster > self.max_exposicao_cluster:
+            return False, f"Exposição máxima do grupo {cluster} excedida ({exposicao_cluster:.2f} USDT)"
+        return True, None
+
+    def alavancagem(self, pontos, distancia_sl):
+        """
+        Define a alavancagem a partir de LEVERAGE_THRESHOLDS, LEVERAGE_MULTIPLIERS
+        e SL_DISTANCE_MULTIPLIERS.
+
+        O nível i é permitido quando os pontos do lado do sinal atingem
+        LEVERAGE_THRESHOLDS[i] e a distância relativa do SL não passa de
+        SL_DISTANCE_MULTIPLIERS[i].
+
+        Args:
+            pontos (int): Pontos do lado do sinal (`pontos_do_lado`), não a soma
+                compra + venda.
+            distancia_sl (float): |entrada - SL| / entrada.
+
+        Returns:
+            str: Alavancagem sugerida (ex: "10x").
+        """
+        for limiar, multiplicador, distancia_max in zip(
+            LEVERAGE_THRESHOLDS, LEVERAGE_MULTIPLIERS, SL_DISTANCE_MULTIPLIERS
+        ):
+            if pontos >= limiar and distancia_sl <= distancia_max:
+                return multiplicador
+        return DEFAULT_LEVERAGE
+
+    def resumo(self):
+        """Retorna um resumo dos agregados de risco (para logs e monitoramento)."""
+        return {
+            "exposicao_total": self.exposicao_total,
+            "reservas": len(self.reservas),
+            "exposicao_cluster": dict(self.exposicao_cluster),
+            "pnl_diario": self.pnl_diario,
+            "sinais_janela": len(self.sinais_total),
+        }
@@ -0,0 +1,251 @@
+# Arquivo signal_state.py
+# Este arquivo contém o vetor de condições de `identify_entries` e o estado de
+# sinais por par:
+# - Cada condição booleana (preço vs SMA/EMA/VWAP, MACD vs sinal, Bollinger, ADX,
+#   estocástico, Ichimoku, volume e sentimento) é um bit de uma máscara inteira.
+# - A pontuação (pontos de compra/venda e decisão) e as mensagens dependem apenas
+#   da máscara (e das bordas) e ficam memorizadas: um vetor já visto não é
+#   pontuado nem descrito de novo.
+# - O estado por par guarda o vetor da vela anterior; as bordas (bits que mudaram
+#   desde ela) separam um cruzamento real ("cruzou") de uma condição que apenas
+#   se mantém.
+
+from functools import lru_cache
+
+# Ordem dos bits da máscara (os argumentos de `montar_mascara`)
+CONDICOES = (
+    "sma",  # Preço acima da SMA
+    "ema",  # Preço acima da EMA
+    "macd",  # MACD acima do sinal
+    "bollinger_inferior",  # Preço abaixo da banda inferior
+    "bollinger_superior",  # Preço acima da banda superior
+    "rsi_compra",  # RSI abaixo do limiar de compra
+    "rsi_venda",  # RSI acima do limiar de venda
+    "vwap",  # Preço acima do VWAP
+    "adx",  # ADX acima de 25
+    "estocastico_k_acima",  # %K acima de %D
+    "estocastico_compra",  # %K acima de %D e abaixo de 80
+    "estocastico_venda",  # %K abaixo de %D e acima de 20
+    "ichimoku_tenkan_kijun",  # Tenkan-sen acima da Kijun-sen
+    "ichimoku_acima_nuvem",  # Preço acima da nuvem
+    "volume_compra",  # Volume confirma a compra
+    "volume_venda",  # Volume confirma a venda
+    "funding_alto",
+    "funding_baixo",
+    "oi_alta",
+    "basis_premio",
+    "basis_desconto",
+)
+BIT = {nome: 1 << i for i, nome in enumerate(CONDICOES)}
+
+# Condições em nível: pontuam para a compra quando ativas e para a venda quando inativas
+NIVEL = ("sma", "ema", "macd", "vwap", "adx")
+# Condições de um lado só: (condição, lado)
+LADO_UNICO = (
+    ("bollinger_inferior", "compra"),
+    ("bollinger_superior", "venda"),
+    ("estocastico_compra", "compra"),
+    ("estocastico_venda", "venda"),
+)
+
+
+def montar_mascara(*condicoes):
+    """Máscara com um bit por condição, na ordem de CONDICOES."""
+    mascara = 0
+    for i, ativa in enumerate(condicoes):
+        if ativa:
+            mascara |= 1 << i
+    return mascara
+
+
+@lru_cache(maxsize=4096)
+def pontuar(mascara, long_term=False):
+    """
+    Pontos de compra/venda e decisão de um vetor de condições.
+
+    Returns:
+        tuple: (pontos de compra, pontos de venda, entry_type), com entry_type
+        "BUY/LONG", "SELL/SHORT" ou "NEUTRO".
+    """
+
+    def ativa(nome):
+        return bool(mascara & BIT[nome])
+
+    # A confirmação de volume dobra o peso de cada condição do seu lado
+    peso = {
+        "compra": 2 if ativa("volume_compra") else 1,
+        "venda": 2 if ativa("volume_venda") else 1,
+    }
+    pontos = {"compra": 0, "venda": 0}
+    for nome in NIVEL:
+        lado = "compra" if ativa(nome) else "venda"
+        pontos[lado] += peso[lado]
+    for nome, lado in LADO_UNICO:
+        if ativa(nome):
+            pontos[lado] += peso[lado]
+
+    # Ichimoku: as duas condições juntas (compra) ou nenhuma delas (venda)
+    tenkan_kijun, acima_nuvem = ativa("ichimoku_tenkan_kijun"), ativa("ichimoku_acima_nuvem")
+    if tenkan_kijun and acima_nuvem:
+        pontos["compra"] += peso["compra"]
+    elif not tenkan_kijun and not acima_nuvem:
+        pontos["venda"] += peso["venda"]
+
+    # Sentimento: um ponto, sem a confirmação de volume
+    if ativa("funding_alto"):
+        pontos["venda"] += 1
+    elif ativa("funding_baixo"):
+        pontos["compra"] += 1
+    if ativa("oi_alta"):
+        pontos["compra" if ativa("sma") else "venda"] += 1
+    if ativa("basis_premio"):
+        pontos["venda"] += 1
+    elif ativa("basis_desconto"):
+        pontos["compra"] += 1
+
+    compra, venda = pontos["compra"], pontos["venda"]
+    if compra > 5 and (ativa("rsi_compra") or long_term):
+        entry_type = "BUY/LONG"
+    elif venda > 5 and (ativa("rsi_venda") or long_term):
+        entry_type = "SELL/SHORT"
+    else:
+        entry_type = "NEUTRO"
+    return compra, venda, entry_type
+
+
+def pontos_do_lado(resultado):
+    """
+    Pontos do lado do sinal de um resultado de `identify_entries`: os de compra em
+    "BUY/LONG", os de venda em "SELL/SHORT" e 0 sem sinal. Ao contrário de
+    `forca_do_sinal` (compra + venda), distingue um sinal forte de um fraco.
+    """
+    entry_type = resultado.get("entry_type")
+    if entry_type == "BUY/LONG":
+        return resultado.get("pontos_compra", 0)
+    if entry_type == "SELL/SHORT":
+        return resultado.get("pontos_venda", 0)
+    return 0
+
+
+# Mensagens por condição: (ao cruzar para ativa, ao cruzar para inativa, enquanto ativa)
+MENSAGENS = {
+    "sma": (
+        "SMA: Preço cruzou a SMA de baixo para cima.",
+        "SMA: Preço cruzou a SMA de cima para baixo.",
+        "SMA: Preço acima da SMA.",
+    ),
+    "ema": (
+        "EMA: Preço cruzou a EMA de baixo para cima.",
+        "EMA: Preço cruzou a EMA de cima para baixo.",
+        "EMA: Preço acima da EMA.",
+    ),
+    "macd": (
+        "MACD: MACD cruzou o sinal de baixo para cima.",
+        "MACD: MACD cruzou o sinal de cima para baixo.",
+        "MACD: MACD acima do sinal.",
+    ),
+    "bollinger_inferior": (
+        "Bollinger: Preço rompeu a banda inferior de Bollinger.",
+        None,
+        "Bollinger: Preço abaixo da banda inferior de Bollinger.",
+    ),
+    "bollinger_superior": (
+        "Bollinger: Preço rompeu a banda superior de Bollinger.",
+        None,
+        "Bollinger: Preço acima da banda superior de Bollinger.",
+    ),
+    "vwap": (
+        "VWAP: Preço cruzou o VWAP de baixo para cima.",
+        "VWAP: Preço cruzou o VWAP de cima para baixo.",
+        "VWAP: Preço está acima do VWAP.",
+    ),
+    "adx": ("ADX: ADX passou de 25, tendência ganhando força.", None, "ADX: Sinal forte"),
+}
+
+
+@lru_cache(maxsize=4096)
+def descrever(mascara, subida=0, descida=0):
+    """
+    Mensagens dos sinais ativos. "Cruzou" só aparece quando a condição mudou desde a
+    vela anterior (bits em `subida`/`descida`); as mensagens de sentimento, que
+    trazem valores, são montadas por `identify_entries`.
+
+    Returns:
+        tuple: Mensagens, na ordem de CONDICOES.
+    """
+    mensagens = []
+    for nome, (ao_ativar, ao_desativar, ativa) in MENSAGENS.items():
+        bit = BIT[nome]
+        if subida & bit:
+            mensagens.append(ao_ativar)
+        elif descida & bit and ao_desativar:
+            mensagens.append(ao_desativar)
+        elif mascara & bit:
+            mensagens.append(ativa)
+
+    # Estocástico: cruzamento real apenas quando %K passou por %D nesta vela
+    k_acima = BIT["estocastico_k_acima"]
+    if mascara & BIT["estocastico_compra"]:
+        mensagens.append(
+            "Estocástico: Cruzamento de compra"
+            if subida & k_acima
+            else "Estocástico: %K acima de %D."
+        )
+    if mascara & BIT["estocastico_venda"]:
+        mensagens.append(
+            "Estocástico: Cruzamento de venda"
+            if descida & k_acima
+            else "Estocástico: %K abaixo de %D."
+        )
+
+    if mascara & BIT["ichimoku_tenkan_kijun"] and mascara & BIT["ichimoku_acima_nuvem"]:
+        mensagens.append(
+            "Ichimoku: Tenkan-sen cruzou acima da Kijun-sen e preço acima da nuvem."
+            if subida & BIT["ichimoku_tenkan_kijun"]
+            else "Ichimoku: Tenkan-sen acima da Kijun-sen e preço acima da nuvem."
+        )
+    return tuple(mensagens)
+
+
+class EstadoSinais:
+    """
+    Vetor de condições de um par, para detectar as bordas entre velas.
+
+    Várias avaliações da mesma vela (atualizações em andamento) comparam-se sempre
+    com o último vetor da vela anterior. Se a vela anterior não foi avaliada (ex:
+    dispensada pelo pré-filtro), não há bordas: nenhum cruzamento é anunciado sem
+    a vela em que ele ocorreu.
+    """
+
+    __slots__ = ("start", "mascara", "start_anterior", "anterior")
+
+    def __init__(self):
+        self.start = None
+        self.mascara = None
+        self.start_anterior = None
+        self.anterior = None  # Último vetor da vela anterior
+
+    def atualizar(self, mascara, start, start_anterior=None):
+        """
+        Registra o vetor da vela `start`.
+
+        Args:
+            mascara (int): Vetor de condições.
+            start (int): Início da vela avaliada.
+            start_anterior (int, optional): Início da vela imediatamente anterior.
+                Defaults to None (qualquer vela avaliada antes conta como anterior).
+
+        Returns:
+            tuple: (subida, descida): bits que ficaram ativos/inativos desde a vela
+            anterior ((0, 0) sem ela).
+        """
+        if start != self.start:
+            self.start_anterior, self.anterior = self.start, self.mascara
+            self.start = start
+        self.mascara = mascara
+        if self.anterior is None or (
+            start_anterior is not None and self.start_anterior != start_anterior
+        ):
+            return 0, 0
+        mudou = mascara ^ self.anterior
+        return mudou & mascara, mudou & self.anterior
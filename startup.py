@@ -0,0 +1,46 @@
+# Arquivo startup.py
+# Este arquivo contém o cronômetro da inicialização do bot.
+# Registra o tempo de importação e de cada etapa de inicialização, para que o
+# log mostre onde o tempo é gasto até a primeira vela chegar.
+
+import time
+from contextlib import contextmanager
+
+from loguru import logger
+
+
+class CronometroInicializacao:
+    """Acumula a duração de cada etapa e os marcos desde o início do processo."""
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.etapas = []  # (nome, duração em ms)
+        self.marcos = []  # (nome, ms desde o início)
+        self.resumido = False
+
+    @contextmanager
+    def etapa(self, nome):
+        """Mede a duração do bloco `with` como uma etapa."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.etapas.append((nome, (time.perf_counter() - inicio) * 1000))
+
+    def marcar(self, nome):
+        """Registra um marco (ms desde o início do processo)."""
+        self.marcos.append((nome, (time.perf_counter() - self.inicio) * 1000))
+
+    def resumo(self):
+        """Escreve no log a divisão do tempo de inicialização (apenas uma vez)."""
+        if self.resumido:
+            return
+        self.resumido = True
+        logger.info("Tempo de inicialização:")
+        for nome, ms in self.etapas:
+            logger.info(f"  {nome:<45} {ms:8.1f} ms")
+        for nome, ms in self.marcos:
+            logger.info(f"  [marco] {nome:<37} {ms:8.1f} ms desde o início")
+
+
+cronometro = CronometroInicializacao()
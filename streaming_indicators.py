@@ -0,0 +1,266 @@
+# Arquivo streaming_indicators.py
+# Este arquivo contém versões incrementais (streaming) dos indicadores.
+# Cada indicador é atualizado em O(1) a cada vela confirmada e expõe o seu estado
+# interno (`estado`/`restaurar`), o que permite salvá-lo em checkpoints e
+# retomar a análise sem reprocessar todo o histórico.
+
+from volatility import VolatilidadeStreaming
+
+
+class EMAStreaming:
+    """Média Móvel Exponencial incremental (semente: primeiro valor, como calculate_ema)."""
+
+    __slots__ = ("periodo", "k", "valor", "n")
+
+    def __init__(self, periodo):
+        self.periodo = periodo
+        self.k = 2 / (periodo + 1)
+        self.valor = None
+        self.n = 0
+
+    def atualizar(self, x):
+        self.valor = x if self.valor is None else x * self.k + self.valor * (1 - self.k)
+        self.n += 1
+        return self.valor
+
+    def espiar(self, x):
+        """EMA que resultaria de `x` como próximo valor, sem alterar o estado."""
+        return x if self.valor is None else x * self.k + self.valor * (1 - self.k)
+
+    @property
+    def pronto(self):
+        return self.n >= self.periodo
+
+    def estado(self):
+        return [self.valor, self.n]
+
+    def restaurar(self, estado):
+        self.valor, self.n = estado
+
+
+class RSIStreaming:
+    """RSI com suavização de Wilder; as médias iniciais são médias simples de `periodo` variações."""
+
+    __slots__ = ("periodo", "anterior", "media_ganho", "media_perda", "n")
+
+    def __init__(self, periodo=14):
+        self.periodo = periodo
+        self.anterior = None
+        self.media_ganho = 0.0
+        self.media_perda = 0.0
+        self.n = 0  # Variações processadas
+
+    def atualizar(self, x):
+        if self.anterior is not None:
+            delta = x - self.anterior
+            ganho, perda = max(delta, 0.0), max(-delta, 0.0)
+            self.n += 1
+            if self.n <= self.periodo:
+                self.media_ganho += (ganho - self.media_ganho) / self.n
+                self.media_perda += (perda - self.media_perda) / self.n
+            else:
+                self.media_ganho = (self.media_ganho * (self.periodo - 1) + ganho) / self.periodo
+                self.media_perda = (self.media_perda * (self.periodo - 1) + perda) / self.periodo
+        self.anterior = x
+        return self.valor
+
+    @property
+    def valor(self):
+        return self._rsi(self.n, self.media_ganho, self.media_perda)
+
+    def espiar(self, x):
+        """RSI que resultaria de `x` como próximo preço, sem alterar o estado."""
+        if self.anterior is None:
+            return 50.0
+        delta = x - self.anterior
+        ganho, perda = max(delta, 0.0), max(-delta, 0.0)
+        n = self.n + 1
+        if n <= self.periodo:
+            media_ganho = self.media_ganho + (ganho - self.media_ganho) / n
+            media_perda = self.media_perda + (perda - self.media_perda) / n
+        else:
+            media_ganho = (self.media_ganho * (self.periodo - 1) + ganho) / self.periodo
+            media_perda = (self.media_perda * (self.periodo - 1) + perda) / self.periodo
+        return self._rsi(n, media_ganho, media_perda)
+
+    @staticmethod
+    def _rsi(n, media_ganho, media_perda):
+        if n == 0 or (media_ganho == 0 and media_perda == 0):
+            return 50.0
+        if media_perda == 0:
+            return 100.0
+        return 100 - 100 / (1 + media_ganho / media_perda)
+
+    @property
+    def pronto(self):
+        return self.n >= self.periodo
+
+    def estado(self):
+        return [self.anterior, self.media_ganho, self.media_perda, self.n]
+
+    def restaurar(self, estado):
+        self.anterior, self.media_ganho, self.media_perda, self.n = estado
+
+
+class SomaMovel:
+    """Soma e soma dos quadrados em uma janela deslizante (média e desvio padrão em O(1))."""
+
+    __slots__ = ("periodo", "valores", "i", "soma", "soma_quadrados")
+
+    def __init__(self, periodo):
+        self.periodo = periodo
+        self.valores = []
+        self.i = 0  # Posição do valor mais antigo quando a janela está cheia
+        self.soma = 0.0
+        self.soma_quadrados = 0.0
+
+    def atualizar(self, x):
+        if len(self.valores) < self.periodo:
+            self.valores.append(x)
+        else:
+            antigo = self.valores[self.i]
+            self.valores[self.i] = x
+            self.i = (self.i + 1) % self.periodo
+            self.soma -= antigo
+            self.soma_quadrados -= antigo * antigo
+        self.soma += x
+        self.soma_quadrados += x * x
+        return self.media
+
+    @property
+    def media(self):
+        return self.soma / len(self.valores) if self.valores else None
+
+    def espiar(self, x):
+        """(média, desvio) que resultariam de `x` como próximo valor, sem alterar o estado."""
+        n = len(self.valores)
+        soma, soma_quadrados = self.soma + x, self.soma_quadrados + x * x
+        if n < self.periodo:
+            n += 1
+        else:
+            antigo = self.valores[self.i]
+            soma -= antigo
+            soma_quadrados -= antigo * antigo
+        media = soma / n
+        return media, max(soma_quadrados / n - media**2, 0.0) ** 0.5
+
+    @property
+    def desvio(self):
+        """Desvio padrão populacional (como np.std)."""
+        n = len(self.valores)
+        if n == 0:
+            return None
+        return max(self.soma_quadrados / n - (self.soma / n) ** 2, 0.0) ** 0.5
+
+    @property
+    def pronto(self):
+        return len(self.valores) == self.periodo
+
+    def estado(self):
+        return [self.valores, self.i, self.soma, self.soma_quadrados]
+
+    def restaurar(self, estado):
+        valores, self.i, self.soma, self.soma_quadrados = estado
+        self.valores = list(valores)
+
+
+class EstadoIndicadores:
+    """
+    Estado incremental dos indicadores de um par, alimentado apenas por velas
+    confirmadas (cada vela é aplicada uma única vez, pelo seu "start").
+    """
+
+    def __init__(self, periodo=20, periodo_rsi=14, macd=(12, 26, 9)):
+        rapida, lenta, sinal = macd
+        self.indicadores = {
+            "ema": EMAStreaming(periodo),
+            "sma": SomaMovel(periodo),
+            "rsi": RSIStreaming(periodo_rsi),
+            "ema_rapida": EMAStreaming(rapida),
+            "ema_lenta": EMAStreaming(lenta),
+            "macd_sinal": EMAStreaming(sinal),
+            "volume": SomaMovel(periodo),
+            "volatilidade": VolatilidadeStreaming(),
+        }
+        self.ultimo_start = None
+        self.ultimo_preco = None
+
+    def atualizar(self, vela):
+        """Aplica uma vela confirmada. Velas já aplicadas são ignoradas."""
+        start = int(vela["start"])
+        if self.ultimo_start is not None and start <= self.ultimo_start:
+            return False
+        preco = float(vela["close"])
+        ind = self.indicadores
+        ind["ema"].atualizar(preco)
+        ind["sma"].atualizar(preco)
+        ind["rsi"].atualizar(preco)
+        macd = ind["ema_rapida"].atualizar(preco) - ind["ema_lenta"].atualizar(preco)
+        ind["macd_sinal"].atualizar(macd)
+        ind["volume"].atualizar(float(vela["volume"]))
+        ind["volatilidade"].atualizar(vela)
+        self.ultimo_start = start
+        self.ultimo_preco = preco
+        return True
+
+    def valores(self):
+        """Últimos valores dos indicadores (ex: para prefiltros e métricas)."""
+        ind = self.indicadores
+        sma = ind["sma"]
+        macd = (
+            ind["ema_rapida"].valor - ind["ema_lenta"].valor
+            if ind["ema_lenta"].valor is not None
+            else None
+        )
+        return {
+            "preco": self.ultimo_preco,
+            "ema": ind["ema"].valor,
+            "sma": sma.media,
+            "desvio": sma.desvio,
+            "rsi": ind["rsi"].valor,
+            "macd": macd,
+            "macd_sinal": ind["macd_sinal"].valor,
+            "volume_medio": ind["volume"].media,
+        }
+
+    def espiar(self, vela):
+        """
+        Valores (como `valores`) com a vela em andamento como última vela provisória.
+        Nada é aplicado ao estado, então não há o que desfazer quando a vela muda ou
+        fecha; uma vela já aplicada retorna os valores atuais.
+        """
+        if self.ultimo_start is not None and int(vela["start"]) <= self.ultimo_start:
+            return self.valores()
+        preco = float(vela["close"])
+        ind = self.indicadores
+        macd = ind["ema_rapida"].espiar(preco) - ind["ema_lenta"].espiar(preco)
+        media, desvio = ind["sma"].espiar(preco)
+        volume_medio, _ = ind["volume"].espiar(float(vela["volume"]))
+        return {
+            "preco": preco,
+            "ema": ind["ema"].espiar(preco),
+            "sma": media,
+            "desvio": desvio,
+            "rsi": ind["rsi"].espiar(preco),
+            "macd": macd,
+            "macd_sinal": ind["macd_sinal"].espiar(macd),
+            "volume_medio": volume_medio,
+        }
+
+    def volatilidade(self, segundos_vela=None):
+        """Volatilidade realizada principal (% no período de referência), ou None no aquecimento."""
+        return self.indicadores["volatilidade"].principal(segundos_vela)
+
+    def estado(self):
+        return {
+            "ultimo_start": self.ultimo_start,
+            "ultimo_preco": self.ultimo_preco,
+            "indicadores": {nome: ind.estado() for nome, ind in self.indicadores.items()},
+        }
+
+    def restaurar(self, estado):
+        self.ultimo_start = estado["ultimo_start"]
+        self.ultimo_preco = estado["ultimo_preco"]
+        for nome, valor in estado["indicadores"].items():
+            if nome in self.indicadores:
+                self.indicadores[nome].restaurar(valor)
@@ -0,0 +1,298 @@
+# Arquivo support_resistance.py
+# Este arquivo contém o índice incremental de suportes e resistências por par:
+# - Pivôs (topos e fundos) detectados a cada vela confirmada, com SR_PIVOT_BARS
+#   velas de cada lado.
+# - Pivôs próximos (SR_CLUSTER_PCT) agrupados em um único nível, com o preço médio
+#   ponderado pelos toques; os níveis ficam em uma lista ordenada por preço.
+# - Opcionalmente, paredes de liquidez do livro de ofertas local (tópico
+#   `orderbook` da Bybit): snapshot e deltas aplicados a arrays ordenados.
+# Os níveis mais próximos acima e abaixo de um preço saem por bisect (O(log n)),
+# sem percorrer o histórico a cada sinal.
+
+import bisect
+from array import array
+from collections import deque
+
+from constants import (
+    SR_CLUSTER_PCT,
+    SR_MAX_LEVELS,
+    SR_ORDERBOOK_ENABLED,
+    SR_PIVOT_BARS,
+    SR_WALL_FACTOR,
+)
+
+
+class NiveisSR:
+    """
+    Níveis de preço de um par, ordenados, formados pelo agrupamento de pivôs.
+
+    Args:
+        tolerancia_pct (float): Distância máxima (% do preço) para um pivô se juntar a um nível.
+        maximo (int): Níveis mantidos; acima disso, sai o tocado há mais tempo.
+    """
+
+    __slots__ = ("tolerancia", "maximo", "precos", "toques", "ultimos")
+
+    def __init__(self, tolerancia_pct=SR_CLUSTER_PCT, maximo=SR_MAX_LEVELS):
+        self.tolerancia = tolerancia_pct / 100
+        self.maximo = maximo
+        self.precos = []  # Em ordem crescente
+        self.toques = []
+        self.ultimos = []  # "start" da vela do último toque
+
+    def adicionar(self, preco, start):
+        i = bisect.bisect_left(self.precos, preco)
+        # Nível mais próximo: o anterior ou o seguinte na ordem
+        vizinhos = [j for j in (i - 1, i) if 0 <= j < len(self.precos)]
+        j = min(vizinhos, key=lambda j: abs(self.precos[j] - preco), default=None)
+        toques = 1
+        if j is not None and abs(self.precos[j] - preco) <= preco * self.tolerancia:
+            toques = self.toques[j] + 1
+            preco = (self.precos[j] * self.toques[j] + preco) / toques
+            self._remover(j)
+        i = bisect.bisect_left(self.precos, preco)
+        self.precos.insert(i, preco)
+        self.toques.insert(i, toques)
+        self.ultimos.insert(i, start)
+        if len(self.precos) > self.maximo:
+            self._remover(self.ultimos.index(min(self.ultimos)))
+
+    def _remover(self, i):
+        del self.precos[i]
+        del self.toques[i]
+        del self.ultimos[i]
+
+    def acima(self, preco, n=1):
+        """Até `n` níveis acima do preço, do mais próximo ao mais distante."""
+        i = bisect.bisect_right(self.precos, preco)
+        return self.precos[i : i + n]
+
+    def abaixo(self, preco, n=1):
+        """Até `n` níveis abaixo do preço, do mais próximo ao mais distante."""
+        i = bisect.bisect_left(self.precos, preco)
+        return self.precos[max(i - n, 0) : i][::-1]
+
+    def __len__(self):
+        return len(self.precos)
+
+
+class DetectorPivos:
+    """
+    Topos e fundos locais: a vela central de uma janela de 2 * `barras` + 1 velas
+    confirmadas com a máxima (ou mínima) da janela.
+    """
+
+    __slots__ = ("barras", "janela", "ultimo_start")
+
+    def __init__(self, barras=SR_PIVOT_BARS):
+        self.barras = barras
+        self.janela = deque(maxlen=2 * barras + 1)  # (start, high, low)
+        self.ultimo_start = None
+
+    def atualizar(self, vela):
+        """
+        Aplica uma vela confirmada.
+
+        Returns:
+            list: Pivôs confirmados por esta vela, como (preço, start).
+        """
+        start = int(vela["start"])
+        if self.ultimo_start is not None and start <= self.ultimo_start:
+            return []
+        self.ultimo_start = start
+        self.janela.append((start, float(vela["high"]), float(vela["low"])))
+        if len(self.janela) < self.janela.maxlen:
+            return []
+        k = self.barras
+        janela = list(self.janela)
+        centro_start, high, low = janela[k]
+        esquerda, direita = janela[:k], janela[k + 1 :]
+        pivos = []
+        # Estrito à esquerda, para uma sequência de máximas iguais gerar um único pivô
+        if all(high > h for _, h, _ in esquerda) and all(high >= h for _, h, _ in direita):
+            pivos.append((high, centro_start))
+        if all(low < m for _, _, m in esquerda) and all(low <= m for _, _, m in direita):
+            pivos.append((low, centro_start))
+        return pivos
+
+
+class LivroOfertas:
+    """
+    Livro de ofertas local de um par (tópico `orderbook.{profundidade}.{par}`).
+
+    Os dois lados ficam em arrays de preços em ordem crescente, com as quantidades
+    nos arrays paralelos; cada delta é um bisect e uma inserção/remoção.
+    """
+
+    __slots__ = ("bids", "qtd_bids", "asks", "qtd_asks", "u")
+
+    def __init__(self):
+        self.bids, self.qtd_bids = array("d"), array("d")
+        self.asks, self.qtd_asks = array("d"), array("d")
+        self.u = None  # ID da última atualização aplicada
+
+    def aplicar(self, tipo, dados):
+        """Aplica um snapshot ou delta da Bybit ({"b": [[preço, qtd]], "a": [...], "u"})."""
+        # u == 1: a Bybit reiniciou o livro e o delta é um snapshot
+        if tipo == "snapshot" or dados.get("u") == 1:
+            for lado in (self.bids, self.qtd_bids, self.asks, self.qtd_asks):
+                del lado[:]
+        for preco, qtd in dados.get("b", ()):
+            self._atualizar(self.bids, self.qtd_bids, float(preco), float(qtd))
+        for preco, qtd in dados.get("a", ()):
+            self._atualizar(self.asks, self.qtd_asks, float(preco), float(qtd))
+        self.u = dados.get("u")
+
+    @staticmethod
+    def _atualizar(precos, quantidades, preco, qtd):
+        i = bisect.bisect_left(precos, preco)
+        existe = i < len(precos) and precos[i] == preco
+        if qtd == 0:
+            if existe:
+                del precos[i]
+                del quantidades[i]
+        elif existe:
+            quantidades[i] = qtd
+        else:
+            precos.insert(i, preco)
+            quantidades.insert(i, qtd)
+
+    @property
+    def melhor_bid(self):
+        return self.bids[-1] if self.bids else None
+
+    @property
+    def melhor_ask(self):
+        return self.asks[0] if self.asks else None
+
+    def paredes(self, fator=SR_WALL_FACTOR):
+        """
+        Preços com liquidez parada de pelo menos `fator` vezes a quantidade mediana
+        do próprio lado do livro.
+
+        Returns:
+            tuple: (preços das paredes de compra, preços das paredes de venda), crescentes.
+        """
+        return (
+            self._paredes(self.bids, self.qtd_bids, fator),
+            self._paredes(self.asks, self.qtd_asks, fator),
+        )
+
+    @staticmethod
+    def _paredes(precos, quantidades, fator):
+        if not quantidades:
+            return []
+        ordenadas = sorted(quantidades)
+        limiar = ordenadas[len(ordenadas) // 2] * fator
+        return [p for p, q in zip(precos, quantidades) if q >= limiar]
+
+
+class MotorSR:
+    """
+    Suportes e resistências de todos os pares: pivôs agrupados e, com o livro de
+    ofertas, as paredes de liquidez.
+
+    Args:
+        barras_pivo (int, optional): Velas de cada lado de um pivô. Defaults to SR_PIVOT_BARS.
+        tolerancia_pct (float, optional): Agrupamento dos pivôs (% do preço).
+            Defaults to SR_CLUSTER_PCT.
+        maximo (int, optional): Níveis por par. Defaults to SR_MAX_LEVELS.
+        com_livro (bool, optional): Mantém o livro de ofertas (assina o tópico
+            `orderbook`). Defaults to SR_ORDERBOOK_ENABLED.
+        fator_parede (float, optional): Veja `LivroOfertas.paredes`. Defaults to SR_WALL_FACTOR.
+    """
+
+    def __init__(
+        self,
+        barras_pivo=SR_PIVOT_BARS,
+        tolerancia_pct=SR_CLUSTER_PCT,
+        maximo=SR_MAX_LEVELS,
+        com_livro=SR_ORDERBOOK_ENABLED,
+        fator_parede=SR_WALL_FACTOR,
+    ):
+        self.barras_pivo = barras_pivo
+        self.tolerancia_pct = tolerancia_pct
+        self.maximo = maximo
+        self.com_livro = com_livro
+        self.fator_parede = fator_parede
+        self.detectores = {}  # símbolo -> DetectorPivos
+        self.niveis_pivo = {}  # símbolo -> NiveisSR
+        self.livros = {}  # símbolo -> LivroOfertas
+        self.paredes = {}  # símbolo -> preços das paredes (compra e venda), crescentes
+
+    def on_vela(self, symbol, vela):
+        """Aplica uma vela confirmada do par."""
+        detector = self.detectores.get(symbol)
+        if detector is None:
+            detector = self.detectores[symbol] = DetectorPivos(self.barras_pivo)
+            self.niveis_pivo[symbol] = NiveisSR(self.tolerancia_pct, self.maximo)
+        for preco, start in detector.atualizar(vela):
+            self.niveis_pivo[symbol].adicionar(preco, start)
+
+    def semear(self, symbol, velas):
+        """Aplica as velas confirmadas de um histórico (ex: restaurado do checkpoint)."""
+        for vela in velas:
+            if vela.get("confirm"):
+                self.on_vela(symbol, vela)
+
+    def on_livro(self, mensagem):
+        """
+        Aplica uma mensagem do tópico `orderbook` e recalcula as paredes do par
+        (O(D log D) na profundidade assinada), para `niveis` apenas consultar.
+        """
+        dados = mensagem["data"]
+        livro = self.livros.get(dados["s"])
+        if livro is None:
+            livro = self.livros[dados["s"]] = LivroOfertas()
+        livro.aplicar(mensagem.get("type"), dados)
+        compra, venda = livro.paredes(self.fator_parede)
+        self.paredes[dados["s"]] = sorted(set(compra).union(venda))
+
+    def niveis(self, symbol, preco, n=5):
+        """
+        Suportes e resistências mais próximos do preço.
+
+        Returns:
+            dict: {"suportes": [...], "resistencias": [...]}, do mais próximo ao mais
+            distante, com até `n` níveis de cada lado.
+        """
+        niveis = self.niveis_pivo.get(symbol)
+        suportes = niveis.abaixo(preco, n) if niveis else []
+        resistencias = niveis.acima(preco, n) if niveis else []
+        paredes = self.paredes.get(symbol)
+        if paredes:
+            i = bisect.bisect_left(paredes, preco)
+            j = bisect.bisect_right(paredes, preco)
+            suportes = sorted(suportes + paredes[max(i - n, 0) : i], reverse=True)[:n]
+            resistencias = sorted(resistencias + paredes[j : j + n])[:n]
+        return {"suportes": suportes, "resistencias": resistencias}
+
+
+def ajustar_tps(tps, preco, entry_type, niveis_sr):
+    """
+    Recua cada TP até o último nível de S/R antes dele (resistências na compra,
+    suportes na venda), mantendo a escada de TPs em ordem.
+
+    Args:
+        tps (list): TPs calculados pelo ATR, do mais próximo ao mais distante.
+        preco (float): Preço de entrada.
+        entry_type (str): "BUY/LONG" ou "SELL/SHORT".
+        niveis_sr (dict): Resultado de `MotorSR.niveis`.
+
+    Returns:
+        list: TPs ajustados.
+    """
+    comprado = entry_type == "BUY/LONG"
+    niveis = niveis_sr.get("resistencias" if comprado else "suportes") or []
+    ajustados = []
+    anterior = preco
+    for tp in tps:
+        if comprado:
+            candidatos = [nivel for nivel in niveis if anterior < nivel <= tp]
+            tp = max(candidatos, default=tp)
+        else:
+            candidatos = [nivel for nivel in niveis if tp <= nivel < anterior]
+            tp = min(candidatos, default=tp)
+        ajustados.append(tp)
+        anterior = tp
+    return ajustados
@@ -0,0 +1,43 @@
+# Arquivo symbol_ids.py
+# Este arquivo contém a tabela compartilhada de IDs dos pares: cada símbolo é
+# internado (uma única string em memória, usada como chave em todos os módulos)
+# e recebe um inteiro sequencial, usado como posição em arrays por par
+# (armazenamento de velas, pré-filtro).
+
+import sys
+from threading import Lock
+
+
+class TabelaSimbolos:
+    """Símbolo <-> ID inteiro, com IDs estáveis durante a execução."""
+
+    def __init__(self):
+        self._ids = {}
+        self._simbolos = []
+        self._lock = Lock()
+
+    def id(self, symbol):
+        """ID do par, criado (e a string internada) no primeiro uso."""
+        simbolo_id = self._ids.get(symbol)
+        if simbolo_id is None:
+            with self._lock:
+                simbolo_id = self._ids.get(symbol)
+                if simbolo_id is None:
+                    symbol = sys.intern(symbol)
+                    simbolo_id = self._ids[symbol] = len(self._simbolos)
+                    self._simbolos.append(symbol)
+        return simbolo_id
+
+    def simbolo(self, simbolo_id):
+        return self._simbolos[simbolo_id]
+
+    def internar(self, symbol):
+        """Retorna a instância compartilhada da string do par."""
+        return self._simbolos[self.id(symbol)]
+
+    def __len__(self):
+        return len(self._simbolos)
+
+
+# Tabela única do processo
+SIMBOLOS = TabelaSimbolos()
@@ -3,29 +3,37 @@
 
 import os
 import requests
-import logging
 from dotenv import load_dotenv
+from loguru import logger
+
+from constants import LOG_RATE_LIMIT_PER_MIN
 
 # Carregar variáveis de ambiente (caso utilize um .env)
 load_dotenv()
 
-# Configuração de logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
-logger = logging.getLogger()
-
 
 # Função para enviar a mensagem via Telegram
-def send_telegram_message(mensagem):
+def send_telegram_message(mensagem, chat_id=None, sessao=None):
+    """
+    Envia uma mensagem via Telegram.
+
+    Args:
+        mensagem (str): Texto em Markdown.
+        chat_id (str, optional): Chat de destino. Defaults to None (TELEGRAM_CHAT_ID).
+        sessao (requests.Session, optional): Sessão HTTP reutilizada entre envios.
+            Defaults to None.
+
+    Returns:
+        requests.Response | None: A resposta da API, ou None se não foi possível enviar.
+    """
     token = os.getenv("TELEGRAM_BOT_TOKEN")
-    chat_id = os.getenv("TELEGRAM_CHAT_ID")
+    chat_id = chat_id or os.getenv("TELEGRAM_CHAT_ID")
 
     if not token or not chat_id:
         logger.error(
             "Variáveis de ambiente TELEGRAM_BOT_TOKEN e TELEGRAM_CHAT_ID não configuradas."
         )
-        return
+        return None
 
     url = f"https://api.telegram.org/bot{token}/sendMessage"
     payload = {
@@ -35,10 +43,13 @@ def send_telegram_message(mensagem):
     }
 
     try:
-        response = requests.post(url, data=payload)
-        response.raise_for_status()  # Lança exceção para erros HTTP
+        response = (sessao or requests).post(url, data=payload, timeout=10)
+        if response.status_code != 429:  # O limite de envio é tratado por quem reenvia
+            response.raise_for_status()  # Lança exceção para erros HTTP
+        return response
     except requests.exceptions.RequestException as e:
-        logger.error(f"Erro ao enviar mensagem via Telegram: {e}")
+        logger.error("Erro ao enviar mensagem via Telegram: {}", e, limite=LOG_RATE_LIMIT_PER_MIN)
+        return None
 
 
 def formatar_valor(valor):
@@ -62,17 +73,17 @@ def formatar_valor(valor):
     return str_valor  # Manter o valor original sem formatação
 
 
-def enviar_mensagem_formatada(dados_mensagem):
-    alavancagem = dados_mensagem.get(
-        "alavancagem", "N/A"
-    )  # Obter a alavancagem da mensagem
-
-    simbolo = dados_mensagem.get("simbolo", "N/A")  # Obter o símbolo da mensagem
+def validar_dados(dados_mensagem):
+    """
+    Verifica se os dados do alerta têm os campos obrigatórios.
 
+    Returns:
+        bool: True se os dados são válidos.
+    """
     # Validação dos dados_mensagem recebidos
     if not isinstance(dados_mensagem, dict):
         logger.error("Erro: 'dados_mensagem' não é um dicionário!")
-        return
+        return False
 
     required_keys = [
         "simbolo",
@@ -87,11 +98,48 @@ def enviar_mensagem_formatada(dados_mensagem):
             logger.error(
                 f"Erro: A chave '{chave}' não foi encontrada nos dados_mensagem!"
             )
-            return
+            return False
 
     if not dados_mensagem["simbolo"]:
         logger.error("Erro: O valor de 'simbolo' está vazio!")
-        return
+        return False
+    return True
+
+
+def situacao_sinal(dados_mensagem):
+    """Marcação de sinais intrabar: provisório (vela em andamento) ou confirmado no fechamento."""
+    if dados_mensagem.get("provisorio"):
+        return " ⏳ (provisório, vela em andamento)"
+    if dados_mensagem.get("confirmado"):
+        return " ✅ (confirmado no fechamento)"
+    return ""
+
+
+def formatar_cancelamento(dados_mensagem):
+    """Aviso de um sinal provisório que a vela fechada não confirmou."""
+    return (
+        f"⚪️ **Sinal provisório cancelado**: `{dados_mensagem['simbolo']}` "
+        f"{dados_mensagem['tipo_entrada']} (a vela fechou sem confirmar o sinal)"
+    )
+
+
+def formatar_mensagem(dados_mensagem):
+    """
+    Monta o texto completo do alerta.
+
+    Returns:
+        str | None: A mensagem em Markdown, ou None se os dados são inválidos.
+    """
+    if not validar_dados(dados_mensagem):
+        return None
+    if dados_mensagem.get("cancelado"):
+        return formatar_cancelamento(dados_mensagem)
+
+    alavancagem = dados_mensagem.get(
+        "alavancagem", "N/A"
+    )  # Obter a alavancagem da mensagem
+
+    simbolo = dados_mensagem.get("simbolo", "N/A")  # Obter o símbolo da mensagem
 
     # Extrair os dados_mensagem do dicionário (com valores padrão caso não existam)
     entrada = dados_mensagem.get("entrada", "N/A")
@@ -102,18 +150,16 @@ def enviar_mensagem_formatada(dados_mensagem):
     # Determinar o emoji com base no tipo de entrada
     tipo_sinal = "🟢" if tipo_entrada == "BUY/LONG" else "🔴"
     # Formatar os Take Profits (TPs) como uma lista de strings
-    tps_str = {
-        chr(10).join(
-            [
-                f"🎯 - TP{i+1}: `{formatar_valor(tp)}`"
-                for i, tp in enumerate(dados_mensagem["tps"])
-            ]
-        )
-    }
+    tps_str = chr(10).join(
+        [
+            f"🎯 - TP{i+1}: `{formatar_valor(tp)}`"
+            for i, tp in enumerate(dados_mensagem["tps"])
+        ]
+    )
 
     # Construir a mensagem formatada
     mensagem = f"""
-    {tipo_sinal} **Sinal de {tipo_entrada}**
+    {tipo_sinal} **Sinal de {tipo_entrada}**{situacao_sinal(dados_mensagem)}
 
     💱 **Par**: `{simbolo}`
     💰 **Entrada**: `{formatar_valor(entrada)}`
@@ -126,5 +172,34 @@ def enviar_mensagem_formatada(dados_mensagem):
     📝 **Motivos da Decisão**:
     \n{chr(10).join([f'      • {motivo.ljust(60)}' for motivo in motivos])}
     """
-    logger.info("Mensagem formatada para envio: %s", mensagem)  # Usando o logger
-    send_telegram_message(mensagem)  # Enviar a mensagem
+    logger.debug("Mensagem formatada para envio: {}", mensagem, symbol=simbolo)
+    return mensagem
+
+
+def formatar_mensagem_compacta(dados_mensagem):
+    """
+    Monta o alerta em uma linha (para canais com muitos sinais).
+
+    Returns:
+        str | None: A mensagem em Markdown, ou None se os dados são inválidos.
+    """
+    if not validar_dados(dados_mensagem):
+        return None
+    if dados_mensagem.get("cancelado"):
+        return formatar_cancelamento(dados_mensagem)
+    tipo_entrada = dados_mensagem["tipo_entrada"]
+    tipo_sinal = "🟢" if tipo_entrada == "BUY/LONG" else "🔴"
+    tps = " / ".join(formatar_valor(tp) for tp in dados_mensagem["tps"]) or "N/A"
+    return (
+        f"{tipo_sinal} `{dados_mensagem['simbolo']}` {tipo_entrada} "
+        f"@ `{formatar_valor(dados_mensagem['entrada'])}` | TP `{tps}` | "
+        f"SL `{formatar_valor(dados_mensagem['sl'])}` | "
+        f"{dados_mensagem.get('alavancagem', 'N/A')}{situacao_sinal(dados_mensagem)}"
+    )
+
+
+def enviar_mensagem_formatada(dados_mensagem):
+    """Formata o alerta e o envia ao chat padrão (TELEGRAM_CHAT_ID)."""
+    mensagem = formatar_mensagem(dados_mensagem)
+    if mensagem is not None:
+        send_telegram_message(mensagem)  # Enviar a mensagem
@@ -0,0 +1,8 @@
+# Arquivo tests/conftest.py
+# Este arquivo coloca a raiz do repositório no caminho de importação dos testes
+# (os módulos do bot ficam na raiz, fora de um pacote).
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,44 @@
+# Arquivo tests/test_metrics.py
+# Este arquivo contém os testes do leitor de métricas do dashboard: ele reabre o
+# segmento quando o bot é reiniciado e se desconecta quando o bot para de publicar.
+
+import os
+
+import metrics
+from metrics import SnapshotPublisher, SnapshotReader
+
+
+class Relogio:
+    def __init__(self, agora=0.0):
+        self.agora = agora
+
+    def __call__(self):
+        return self.agora
+
+
+def test_leitor_segue_o_bot_reiniciado_e_detecta_bot_parado(monkeypatch):
+    # Escritor e leitor no mesmo processo dividem o registro do resource_tracker
+    monkeypatch.setattr(metrics.resource_tracker, "unregister", lambda *args: None)
+    nome = f"smarttradingbot_teste_{os.getpid()}"
+    relogio = Relogio(100.0)
+    primeiro = SnapshotPublisher(nome, 4096, relogio=relogio)
+    primeiro.publicar({"execucao": 1})
+    leitor = SnapshotReader(nome, validade_s=5, relogio=relogio)
+    try:
+        assert leitor.ler() == {"execucao": 1}
+
+        # Reinício: o segmento antigo é removido e o novo bot cria outro com o mesmo nome
+        primeiro.fechar()
+        segundo = SnapshotPublisher(nome, 4096, relogio=relogio)
+        relogio.agora = 110.0
+        segundo.publicar({"execucao": 2})
+        assert leitor.ler() == {"execucao": 2}
+        assert leitor.escritor == segundo.escritor
+
+        # Bot caiu sem remover o segmento: a publicação envelhece e o leitor desconecta
+        relogio.agora = 120.0
+        assert leitor.ler() is None
+        assert not leitor.conectado
+        segundo.fechar()
+    finally:
+        leitor.fechar()
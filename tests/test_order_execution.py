@@ -0,0 +1,58 @@
+# Arquivo tests/test_order_execution.py
+# Este arquivo contém os testes do executor de ordens: resolução dos IDs da Bybit
+# para o contrato perpétuo linear quando o mapa de mercados tem spot e linear.
+
+import asyncio
+
+from order_execution import ExchangeSimulada, OrderCache, OrderExecutor, mercados_lineares
+
+MARKETS_BY_ID = {
+    "BTCUSDT": [
+        {"symbol": "BTC/USDT", "spot": True, "swap": False, "linear": None},
+        {"symbol": "BTC/USDT:USDT", "spot": False, "swap": True, "linear": True},
+    ],
+    "ETHUSDT": [
+        {"symbol": "ETH/USDT", "spot": True, "swap": False, "linear": None},
+        {"symbol": "ETH/USDT:USDT", "spot": False, "swap": True, "linear": True},
+    ],
+    "BTCUSD": [{"symbol": "BTC/USD:BTC", "spot": False, "swap": True, "linear": False}],
+}
+
+
+class ExchangeComMercados(ExchangeSimulada):
+    """Exchange simulada com o mapa de mercados do ccxt, registrando os símbolos usados."""
+
+    markets_by_id = MARKETS_BY_ID
+
+    def __init__(self, cache):
+        super().__init__(cache)
+        self.simbolos = []
+
+    def amount_to_precision(self, symbol, amount):
+        self.simbolos.append(symbol)
+        return super().amount_to_precision(symbol, amount)
+
+    async def create_order(self, symbol, type, side, amount, price=None, params=None):
+        self.simbolos.append(symbol)
+        return await super().create_order(symbol, type, side, amount, price, params)
+
+
+def test_mercados_lineares_ignora_spot_e_inverso():
+    assert mercados_lineares(MARKETS_BY_ID) == {
+        "BTCUSDT": "BTC/USDT:USDT",
+        "ETHUSDT": "ETH/USDT:USDT",
+    }
+
+
+def test_executor_envia_entrada_e_tps_no_contrato_linear():
+    async def executar():
+        exchange = ExchangeComMercados(OrderCache())
+        executor = OrderExecutor(exchange, exchange.cache, dry_run=True)
+        await executor.iniciar()
+        resultado = {"entry_type": "BUY/LONG", "sl": 95.0, "tps": [101.0, 102.0]}
+        enviado = await executor.executar_sinal("BTCUSDT", resultado, 100.0)
+        return exchange, enviado
+
+    exchange, enviado = asyncio.run(executar())
+    assert enviado is not None and len(enviado["tps"]) == 2
+    assert set(exchange.simbolos) == {"BTC/USDT:USDT"}
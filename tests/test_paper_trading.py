@@ -0,0 +1,49 @@
+# Arquivo tests/test_paper_trading.py
+# Este arquivo contém os testes do simulador de operações: ordem das saídas quando
+# um único preço salta por vários TPs.
+
+import pytest
+
+from paper_trading import IndiceNiveis, PaperTrading
+
+
+class DiarioFalso:
+    def __init__(self):
+        self.saidas = []
+
+    def registrar_resultado(self, symbol, timeframe, entry_type, entrada, saida, quantidade, pnl, motivo, ts=None):
+        self.saidas.append((motivo, saida, quantidade))
+
+
+def simulador():
+    diario = DiarioFalso()
+    return PaperTrading(journal=diario, notional=100.0, taxa_pct=0.0, relogio=lambda: 0.0), diario
+
+
+@pytest.mark.parametrize(
+    "entry_type, tps, sl, salto",
+    [
+        ("BUY/LONG", [101.0, 102.0, 103.0], 95.0, 104.0),
+        ("SELL/SHORT", [99.0, 98.0, 97.0], 105.0, 96.0),
+    ],
+)
+def test_salto_por_varios_tps_sai_do_mais_proximo_ao_mais_distante(entry_type, tps, sl, salto):
+    paper, diario = simulador()
+    paper.abrir("BTCUSDT", "1", {"entry_type": entry_type, "tps": tps, "sl": sl}, 100.0)
+    assert paper.on_preco("BTCUSDT", salto) == 3
+    assert [(motivo, saida) for motivo, saida, _ in diario.saidas] == [
+        ("TP1", tps[0]),
+        ("TP2", tps[1]),
+        ("TP3", tps[2]),
+    ]
+    # Frações iguais da posição (1 unidade a 100 USDT): o último TP encerra o restante
+    assert [quantidade for _, _, quantidade in diario.saidas] == pytest.approx([1 / 3] * 3)
+    assert not paper.abertas
+
+
+@pytest.mark.parametrize("acima, preco, esperado", [(True, 3.5, [1, 2, 3]), (False, 1.5, [4, 3, 2])])
+def test_indice_dispara_do_nivel_mais_proximo(acima, preco, esperado):
+    indice = IndiceNiveis(acima)
+    for nivel in (1, 2, 3, 4):
+        indice.adicionar(float(nivel), nivel)
+    assert indice.disparar(preco) == esperado
@@ -0,0 +1,111 @@
+# Arquivo tests/test_risk_manager.py
+# Este arquivo contém os testes do gerenciador de risco: reservas de exposição dos
+# sinais aprovados e níveis de alavancagem pelos pontos do lado do sinal.
+
+import pytest
+
+from risk_manager import RiskManager
+from signal_state import pontos_do_lado
+
+
+class Relogio:
+    def __init__(self, agora=0.0):
+        self.agora = agora
+
+    def __call__(self):
+        return self.agora
+
+
+def criar_gerenciador(relogio=None, **limites):
+    parametros = {
+        "max_exposicao_simbolo": 100.0,
+        "max_exposicao_total": 1000.0,
+        "max_exposicao_cluster": 1000.0,
+        "max_sinais_simbolo": 100,
+        "max_sinais_total": 100,
+        "validade_reserva_s": 60,
+        "clusters": [],
+        "relogio": relogio or Relogio(),
+    }
+    parametros.update(limites)
+    return RiskManager(**parametros)
+
+
+def test_rajada_de_sinais_respeita_o_limite_do_par_sem_fills():
+    risco = criar_gerenciador()
+    aprovados = 0
+    for _ in range(5):
+        aprovado, _ = risco.verificar("BTCUSDT", "BUY/LONG", 40.0)
+        if aprovado:
+            risco.reservar("BTCUSDT", "BUY/LONG", 40.0)
+            aprovados += 1
+    assert aprovados == 2
+    assert risco.exposicao_total == pytest.approx(80.0)
+
+
+def test_reserva_vence_e_libera_a_exposicao():
+    relogio = Relogio()
+    risco = criar_gerenciador(relogio)
+    risco.reservar("BTCUSDT", "BUY/LONG", 80.0)
+    assert not risco.verificar("BTCUSDT", "BUY/LONG", 40.0)[0]
+    relogio.agora = 61
+    assert risco.verificar("BTCUSDT", "BUY/LONG", 40.0)[0]
+    assert risco.exposicao_total == 0.0
+
+
+def test_fill_liquida_a_reserva_e_passa_a_contar_pela_posicao():
+    risco = criar_gerenciador()
+    risco.reservar("BTCUSDT", "SELL/SHORT", 50.0)
+    risco.ouvinte_ordens(
+        "order", {"symbol": "BTCUSDT", "orderStatus": "Filled", "reduceOnly": False}
+    )
+    risco.ouvinte_ordens(
+        "position", {"symbol": "BTCUSDT", "side": "Sell", "size": "0.5", "entryPrice": "100"}
+    )
+    assert risco.reservas == {}
+    assert risco.exposicao["BTCUSDT"] == pytest.approx(-50.0)
+    assert risco.exposicao_total == pytest.approx(50.0)
+
+
+def test_ordem_rejeitada_libera_a_reserva():
+    risco = criar_gerenciador()
+    risco.reservar("ETHUSDT", "BUY/LONG", 50.0)
+    risco.ouvinte_ordens("order", {"symbol": "ETHUSDT", "orderStatus": "New"})
+    assert risco.exposicao_total == pytest.approx(50.0)
+    risco.ouvinte_ordens("order", {"symbol": "ETHUSDT", "orderStatus": "Rejected"})
+    assert risco.exposicao_total == 0.0
+    assert risco.exposicao_cluster["ETHUSDT"] == 0.0
+
+
+def test_tp_executado_nao_liquida_a_reserva_da_entrada():
+    risco = criar_gerenciador()
+    risco.reservar("ETHUSDT", "BUY/LONG", 50.0)
+    risco.ouvinte_ordens(
+        "order", {"symbol": "ETHUSDT", "orderStatus": "Filled", "reduceOnly": True}
+    )
+    assert len(risco.reservas) == 1
+
+
+@pytest.mark.parametrize(
+    "pontos, distancia_sl, esperado",
+    [
+        (10, 0.015, "20x"),
+        (9, 0.015, "3x"),
+        (8, 0.008, "10x"),
+        (7, 0.008, "3x"),
+        (6, 0.004, "5x"),
+        (6, 0.008, "3x"),
+        (16, 0.03, "3x"),
+    ],
+)
+def test_cada_nivel_de_alavancagem_e_alcancavel(pontos, distancia_sl, esperado):
+    assert criar_gerenciador().alavancagem(pontos, distancia_sl) == esperado
+
+
+def test_alavancagem_usa_os_pontos_do_lado_do_sinal():
+    # Compra com 6 pontos e 4 de venda: a soma (10) liberaria o nível de 20x
+    resultado = {"entry_type": "BUY/LONG", "pontos_compra": 6, "pontos_venda": 4}
+    assert pontos_do_lado(resultado) == 6
+    assert criar_gerenciador().alavancagem(pontos_do_lado(resultado), 0.015) == "3x"
+    venda = {"entry_type": "SELL/SHORT", "pontos_compra": 2, "pontos_venda": 11}
+    assert criar_gerenciador().alavancagem(pontos_do_lado(venda), 0.015) == "20x"
@@ -0,0 +1,34 @@
+# Arquivo tests/test_tick_aggregator.py
+# Este arquivo contém os testes da confirmação de volume das velas locais: a vela
+# avaliada é procurada pelo `start` e só é confirmada depois de fechada.
+
+from tick_aggregator import TickAggregator
+
+MINUTO = 60_000
+
+
+def agregador_com_velas(volumes, periodo_volume=3):
+    """Agregador com uma vela de 1 minuto por volume (compras) e a seguinte ainda aberta."""
+    agregador = TickAggregator("1", periodo_volume=periodo_volume)
+    for i, volume in enumerate(volumes):
+        agregador.adicionar_trade("BTCUSDT", i * MINUTO, 100.0, volume, True)
+    agregador.adicionar_trade("BTCUSDT", len(volumes) * MINUTO, 100.0, 1.0, False)
+    return agregador
+
+
+def test_confirma_a_vela_pedida_e_nao_a_ultima():
+    agregador = agregador_com_velas([1.0, 1.0, 1.0, 5.0, 1.0])
+
+    avaliada = agregador.confirmacao_volume("BTCUSDT", 3 * MINUTO)
+    seguinte = agregador.confirmacao_volume("BTCUSDT", 4 * MINUTO)
+
+    assert avaliada["compra"] and avaliada["volume_relativo"] == 5.0
+    assert not seguinte["compra"]
+
+
+def test_vela_aberta_ou_sem_historico_retorna_none():
+    agregador = agregador_com_velas([1.0, 1.0, 1.0, 5.0])
+
+    assert agregador.confirmacao_volume("BTCUSDT", 4 * MINUTO) is None  # ainda aberta
+    assert agregador.confirmacao_volume("BTCUSDT", 2 * MINUTO) is None  # sem 3 anteriores
+    assert agregador.confirmacao_volume("ETHUSDT", 3 * MINUTO) is None
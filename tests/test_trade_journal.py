@@ -0,0 +1,17 @@
+# Arquivo tests/test_trade_journal.py
+# Este arquivo contém os testes do drawdown do diário: o cálculo por intervalo segue
+# a ordem de gravação dos resultados, como a curva mantida em `curva_pnl`.
+
+from trade_journal import TradeJournal
+
+
+def test_drawdown_do_intervalo_desempata_pela_ordem_de_gravacao(tmp_path):
+    journal = TradeJournal(str(tmp_path / "diario.db"), intervalo_flush=0.01)
+    journal.start()
+    # Mesmo ts: na ordem de gravação a queda máxima é 3; ordenado por pnl seria 6
+    for pnl in (10.0, -3.0, 10.0, -3.0):
+        journal.registrar_resultado("BTCUSDT", "1", "BUY/LONG", 100.0, 101.0, 1.0, pnl, ts=1.0)
+    journal.stop()
+
+    assert journal.drawdown_maximo() == 3.0
+    assert journal.drawdown_maximo(desde=0, ate=2_000) == 3.0
@@ -0,0 +1,322 @@
+# Arquivo tick_aggregator.py
+# Este arquivo contém a agregação local de negócios (tópico `publicTrade` da Bybit):
+# - Monta velas OHLCV de qualquer timeframe, fechadas no limite do relógio local.
+# - Mantém um perfil de volume por preço (janela deslizante) e o delta compra/venda.
+# - Fornece uma confirmação de volume para `identify_entries`.
+
+import time
+from array import array
+from collections import deque
+from threading import Lock, Thread
+
+from loguru import logger
+
+from constants import (
+    TICK_BUFFER_CAPACITY,
+    VOLUME_PROFILE_BUCKET_PCT,
+    VOLUME_PROFILE_WINDOW_S,
+)
+
+
+def timeframe_em_segundos(timeframe):
+    """Converte um intervalo de kline da Bybit ("1", "15", "60", "D", "W") em segundos."""
+    especiais = {"D": 86400, "W": 604800}
+    if timeframe in especiais:
+        return especiais[timeframe]
+    return int(timeframe) * 60
+
+
+class BarraEmConstrucao:
+    """Vela em construção a partir dos negócios."""
+
+    __slots__ = (
+        "start",
+        "open",
+        "high",
+        "low",
+        "close",
+        "volume",
+        "turnover",
+        "volume_compra",
+        "volume_venda",
+        "vazia",
+    )
+
+    def __init__(self, start, preco_anterior):
+        self.start = start
+        self.open = self.high = self.low = self.close = preco_anterior
+        self.volume = self.turnover = self.volume_compra = self.volume_venda = 0.0
+        self.vazia = True
+
+    def adicionar(self, preco, tamanho, compra):
+        if self.vazia:
+            self.open = self.high = self.low = preco
+            self.vazia = False
+        elif preco > self.high:
+            self.high = preco
+        elif preco < self.low:
+            self.low = preco
+        self.close = preco
+        self.volume += tamanho
+        self.turnover += preco * tamanho
+        if compra:
+            self.volume_compra += tamanho
+        else:
+            self.volume_venda += tamanho
+
+    def como_vela(self, duracao_ms):
+        """Retorna a vela no mesmo formato do kline da Bybit (com o delta)."""
+        return {
+            "start": self.start,
+            "end": self.start + duracao_ms - 1,
+            "open": self.open,
+            "high": self.high,
+            "low": self.low,
+            "close": self.close,
+            "volume": self.volume,
+            "turnover": self.turnover,
+            "volume_compra": self.volume_compra,
+            "volume_venda": self.volume_venda,
+            "confirm": True,
+        }
+
+
+class TickBuffer:
+    """
+    Buffer circular compacto dos negócios de um par (arrays de tipos primitivos),
+    com perfil de volume por preço e delta compra/venda da janela.
+    """
+
+    def __init__(self, capacidade, janela_s, passo_pct):
+        self.capacidade = capacidade
+        self.janela_ms = janela_s * 1000
+        self.passo_pct = passo_pct
+        self.passo = None  # Tamanho do degrau de preço, definido no primeiro negócio
+        self.ts = array("q", [0] * capacidade)
+        self.faixa = array("q", [0] * capacidade)  # Degrau de preço de cada negócio
+        self.tamanho = array("d", [0.0] * capacidade)
+        self.sinal = array("b", [0] * capacidade)  # +1 compra, -1 venda
+        self.inicio = 0
+        self.quantidade = 0
+        self.perfil = {}  # degrau -> volume na janela
+        self.delta = 0.0  # Volume comprador - vendedor na janela
+
+    def adicionar(self, ts, preco, tamanho, compra):
+        if self.passo is None:
+            self.passo = max(preco * self.passo_pct / 100, 1e-12)
+        self._expirar(ts - self.janela_ms)
+        if self.quantidade == self.capacidade:
+            self._remover_mais_antigo()
+
+        i = (self.inicio + self.quantidade) % self.capacidade
+        faixa = int(preco / self.passo)
+        sinal = 1 if compra else -1
+        self.ts[i] = ts
+        self.faixa[i] = faixa
+        self.tamanho[i] = tamanho
+        self.sinal[i] = sinal
+        self.quantidade += 1
+        self.perfil[faixa] = self.perfil.get(faixa, 0.0) + tamanho
+        self.delta += sinal * tamanho
+
+    def _remover_mais_antigo(self):
+        i = self.inicio
+        faixa = self.faixa[i]
+        restante = self.perfil[faixa] - self.tamanho[i]
+        if restante <= 1e-12:
+            del self.perfil[faixa]
+        else:
+            self.perfil[faixa] = restante
+        self.delta -= self.sinal[i] * self.tamanho[i]
+        self.inicio = (i + 1) % self.capacidade
+        self.quantidade -= 1
+
+    def _expirar(self, limite):
+        while self.quantidade and self.ts[self.inicio] < limite:
+            self._remover_mais_antigo()
+
+    def perfil_volume(self):
+        """Retorna [(preço, volume)] ordenado por preço."""
+        return [(faixa * self.passo, volume) for faixa, volume in sorted(self.perfil.items())]
+
+    def poc(self):
+        """Point of control: preço com maior volume na janela."""
+        if not self.perfil:
+            return None
+        return max(self.perfil.items(), key=lambda item: item[1])[0] * self.passo
+
+
+class TickAggregator:
+    """
+    Agrega os negócios de vários pares em velas locais e perfis de volume.
+
+    As velas fecham no limite do relógio local (thread de `start`), sem esperar
+    a confirmação do kline da Bybit; cada vela fechada é entregue a
+    `ao_fechar_barra(symbol, vela)`, que pode rodar na thread de relógio e por isso
+    não deve tocar em estado de outra thread (o WebSocketManager apenas enfileira).
+    """
+
+    def __init__(
+        self,
+        timeframe,
+        ao_fechar_barra=None,
+        periodo_volume=20,
+        capacidade=TICK_BUFFER_CAPACITY,
+        janela_perfil_s=VOLUME_PROFILE_WINDOW_S,
+        passo_perfil_pct=VOLUME_PROFILE_BUCKET_PCT,
+        relogio=time.time,
+    ):
+        self.duracao_ms = timeframe_em_segundos(timeframe) * 1000
+        self.ao_fechar_barra = ao_fechar_barra
+        self.periodo_volume = periodo_volume
+        self.capacidade = capacidade
+        self.janela_perfil_s = janela_perfil_s
+        self.passo_perfil_pct = passo_perfil_pct
+        self.relogio = relogio
+        self.barras = {}  # símbolo -> BarraEmConstrucao
+        self.buffers = {}  # símbolo -> TickBuffer
+        # símbolo -> deque com as últimas velas fechadas: as `periodo_volume` da média,
+        # a avaliada e uma seguinte (o relógio local pode fechá-la antes da avaliação)
+        self.fechadas = {}
+        self.atrasados = 0  # Negócios recebidos depois do fechamento da sua vela
+        self._pendentes = []  # Velas fechadas aguardando entrega (fora do lock)
+        self.is_running = False
+        self._lock = Lock()
+
+    def on_trades(self, itens):
+        """Processa a lista `data` de uma mensagem `publicTrade.{symbol}`."""
+        with self._lock:
+            for item in itens:
+                self._adicionar(
+                    item["s"], int(item["T"]), float(item["p"]), float(item["v"]), item["S"] == "Buy"
+                )
+        self._entregar()
+
+    def adicionar_trade(self, symbol, ts, preco, tamanho, compra):
+        with self._lock:
+            self._adicionar(symbol, ts, preco, tamanho, compra)
+        self._entregar()
+
+    def _adicionar(self, symbol, ts, preco, tamanho, compra):
+        buffer = self.buffers.get(symbol)
+        if buffer is None:
+            buffer = self.buffers[symbol] = TickBuffer(
+                self.capacidade, self.janela_perfil_s, self.passo_perfil_pct
+            )
+        buffer.adicionar(ts, preco, tamanho, compra)
+
+        inicio = ts - ts % self.duracao_ms
+        barra = self.barras.get(symbol)
+        if barra is None:
+            barra = self.barras[symbol] = BarraEmConstrucao(inicio, preco)
+        elif inicio < barra.start:
+            self.atrasados += 1
+            return
+        elif inicio > barra.start:
+            # O relógio local ainda não fechou a vela; fecha pelo negócio
+            self._fechar(symbol, inicio)
+            barra = self.barras[symbol]
+        barra.adicionar(preco, tamanho, compra)
+
+    def _fechar(self, symbol, proximo_inicio):
+        """Fecha a vela atual do par (e as vazias até `proximo_inicio`)."""
+        barra = self.barras[symbol]
+        while barra.start < proximo_inicio:
+            vela = barra.como_vela(self.duracao_ms)
+            fechadas = self.fechadas.get(symbol)
+            if fechadas is None:
+                fechadas = self.fechadas[symbol] = deque(maxlen=self.periodo_volume + 2)
+            fechadas.append(vela)
+            self._pendentes.append((symbol, vela))
+            barra = BarraEmConstrucao(barra.start + self.duracao_ms, barra.close)
+        self.barras[symbol] = barra
+
+    def fechar_barras(self, agora=None):
+        """Fecha as velas de todos os pares cujo período já terminou no relógio local."""
+        agora_ms = int((agora if agora is not None else self.relogio()) * 1000)
+        inicio_atual = agora_ms - agora_ms % self.duracao_ms
+        with self._lock:
+            for symbol, barra in list(self.barras.items()):
+                if barra.start < inicio_atual:
+                    self._fechar(symbol, inicio_atual)
+        self._entregar()
+
+    def _entregar(self):
+        """Entrega as velas fechadas sem segurar o lock da ingestão de negócios."""
+        if not self._pendentes:
+            return
+        with self._lock:
+            pendentes, self._pendentes = self._pendentes, []
+        if not self.ao_fechar_barra:
+            return
+        for symbol, vela in pendentes:
+            try:
+                self.ao_fechar_barra(symbol, vela)
+            except Exception as e:
+                logger.error(f"Erro ao entregar vela local de {symbol}: {e}")
+
+    def start(self):
+        """Inicia a thread que fecha as velas em cada limite do relógio."""
+        self.is_running = True
+        Thread(target=self._relogio_de_barras, daemon=True).start()
+
+    def stop(self):
+        self.is_running = False
+
+    def _relogio_de_barras(self):
+        while self.is_running:
+            agora_ms = self.relogio() * 1000
+            time.sleep((self.duracao_ms - agora_ms % self.duracao_ms) / 1000)
+            self.fechar_barras()
+
+    # --- Consultas ---
+
+    def perfil_volume(self, symbol):
+        buffer = self.buffers.get(symbol)
+        return buffer.perfil_volume() if buffer else []
+
+    def poc(self, symbol):
+        buffer = self.buffers.get(symbol)
+        return buffer.poc() if buffer else None
+
+    def delta(self, symbol):
+        buffer = self.buffers.get(symbol)
+        return buffer.delta if buffer else 0.0
+
+    def confirmacao_volume(self, symbol, start):
+        """
+        Confirmação de volume da vela `start`, fechada localmente.
+
+        O volume é "alto" quando supera a média das `periodo_volume` velas anteriores;
+        a confirmação é separada por lado, usando o delta compra/venda da vela.
+
+        Args:
+            symbol (str): Par.
+            start (int): Início (ms) da vela avaliada.
+
+        Returns:
+            dict | None: {"compra": bool, "venda": bool, "volume_relativo": float,
+            "delta": float}, ou None se a vela ainda não fechou localmente (ou já saiu
+            do histórico) ou sem histórico suficiente.
+        """
+        # A thread de relógio fecha velas em paralelo com a avaliação
+        with self._lock:
+            fechadas = self.fechadas.get(symbol)
+            if not fechadas:
+                return None
+            # Velas fechadas são consecutivas (as vazias também entram)
+            i = (int(start) - fechadas[0]["start"]) // self.duracao_ms
+            if not self.periodo_volume <= i < len(fechadas) or fechadas[i]["start"] != start:
+                return None
+            vela = fechadas[i]
+            anteriores = sum(fechadas[j]["volume"] for j in range(i - self.periodo_volume, i))
+        media = anteriores / self.periodo_volume
+        volume_relativo = vela["volume"] / media if media > 0 else 0.0
+        delta = vela["volume_compra"] - vela["volume_venda"]
+        alto = volume_relativo > 1.0
+        return {
+            "compra": alto and delta > 0,
+            "venda": alto and delta < 0,
+            "volume_relativo": volume_relativo,
+            "delta": delta,
+        }
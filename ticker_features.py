@@ -0,0 +1,170 @@
+# Arquivo ticker_features.py
+# Este arquivo contém as features de sentimento dos contratos perpétuos, extraídas
+# do tópico `tickers` da Bybit na mesma conexão multiplexada (item 7 do Roadmap):
+# - Variação do open interest em uma janela deslizante.
+# - Z-score da taxa de funding em relação ao seu próprio histórico.
+# - Basis entre o preço de marcação e o índice.
+# Cada frame é processado em O(1); o histórico fica em arrays compactos por par,
+# amostrado em intervalos fixos (pelo horário da própria mensagem, então o replay
+# produz os mesmos valores).
+
+from array import array
+
+from constants import (
+    FUNDING_ZSCORE_WINDOW,
+    OI_DELTA_WINDOW,
+    TICKER_SAMPLE_S,
+)
+
+
+class AnelSomado:
+    """Janela circular de floats com soma e soma dos quadrados mantidas em O(1)."""
+
+    __slots__ = ("valores", "capacidade", "inicio", "quantidade", "soma", "soma_quadrados")
+
+    def __init__(self, capacidade):
+        self.valores = array("d", bytes(8 * capacidade))
+        self.capacidade = capacidade
+        self.inicio = 0
+        self.quantidade = 0
+        self.soma = 0.0
+        self.soma_quadrados = 0.0
+
+    def adicionar(self, x):
+        if self.quantidade == self.capacidade:
+            antigo = self.valores[self.inicio]
+            self.soma -= antigo
+            self.soma_quadrados -= antigo * antigo
+            self.valores[self.inicio] = x
+            self.inicio = (self.inicio + 1) % self.capacidade
+        else:
+            self.valores[(self.inicio + self.quantidade) % self.capacidade] = x
+            self.quantidade += 1
+        self.soma += x
+        self.soma_quadrados += x * x
+
+    @property
+    def mais_antigo(self):
+        return self.valores[self.inicio] if self.quantidade else None
+
+    def zscore(self, x):
+        """Z-score de `x` em relação aos valores da janela (None com menos de 2 amostras)."""
+        n = self.quantidade
+        if n < 2:
+            return None
+        media = self.soma / n
+        variancia = self.soma_quadrados / n - media * media
+        if variancia <= 1e-18:
+            return 0.0
+        return (x - media) / variancia**0.5
+
+
+class EstadoTicker:
+    """Último ticker de um par e o histórico amostrado de OI e funding."""
+
+    __slots__ = (
+        "mark",
+        "indice",
+        "open_interest",
+        "funding",
+        "amostra",
+        "historico_oi",
+        "historico_funding",
+    )
+
+    def __init__(self, janela_oi, janela_funding):
+        self.mark = self.indice = self.open_interest = self.funding = None
+        self.amostra = -1  # Número do último intervalo amostrado
+        # Uma amostra a mais que a janela: o delta compara com a amostra de `janela_oi` atrás
+        self.historico_oi = AnelSomado(janela_oi + 1)
+        self.historico_funding = AnelSomado(janela_funding)
+
+
+class TickerFeatures:
+    """
+    Mantém as features de sentimento por par a partir das mensagens `tickers.{symbol}`.
+
+    Args:
+        intervalo_amostra_s (int, optional): Intervalo entre amostras do histórico.
+            Defaults to TICKER_SAMPLE_S.
+        janela_oi (int, optional): Amostras da janela da variação de OI. Defaults to OI_DELTA_WINDOW.
+        janela_funding (int, optional): Amostras da janela do z-score do funding.
+            Defaults to FUNDING_ZSCORE_WINDOW.
+    """
+
+    # Campos do ticker da Bybit (v5, linear) -> atributo do estado
+    CAMPOS = {
+        "markPrice": "mark",
+        "indexPrice": "indice",
+        "openInterest": "open_interest",
+        "fundingRate": "funding",
+    }
+
+    def __init__(
+        self,
+        intervalo_amostra_s=TICKER_SAMPLE_S,
+        janela_oi=OI_DELTA_WINDOW,
+        janela_funding=FUNDING_ZSCORE_WINDOW,
+    ):
+        self.intervalo_amostra_ms = intervalo_amostra_s * 1000
+        self.janela_oi = janela_oi
+        self.janela_funding = janela_funding
+        self.estados = {}  # símbolo -> EstadoTicker
+
+    def on_ticker(self, item, ts_ms):
+        """
+        Processa o `data` de uma mensagem `tickers.{symbol}`. As mensagens "delta"
+        trazem apenas os campos alterados, que são mesclados ao último estado.
+
+        Args:
+            item (dict): Campo `data` da mensagem.
+            ts_ms (int): Campo `ts` da mensagem (ms).
+        """
+        symbol = item["symbol"]
+        estado = self.estados.get(symbol)
+        if estado is None:
+            estado = self.estados[symbol] = EstadoTicker(self.janela_oi, self.janela_funding)
+        for campo, atributo in self.CAMPOS.items():
+            valor = item.get(campo)
+            if valor not in (None, ""):
+                setattr(estado, atributo, float(valor))
+
+        amostra = int(ts_ms) // self.intervalo_amostra_ms
+        if amostra != estado.amostra:
+            estado.amostra = amostra
+            if estado.open_interest is not None:
+                estado.historico_oi.adicionar(estado.open_interest)
+            if estado.funding is not None:
+                estado.historico_funding.adicionar(estado.funding)
+
+    def features(self, symbol):
+        """
+        Returns:
+            dict | None: {"oi_delta_pct", "funding", "funding_z", "basis_pct"} (valores
+            podem ser None durante o aquecimento), ou None se o par não tem ticker.
+        """
+        estado = self.estados.get(symbol)
+        if estado is None:
+            return None
+        oi_antigo = estado.historico_oi.mais_antigo
+        oi_delta_pct = (
+            (estado.open_interest - oi_antigo) / oi_antigo * 100
+            if oi_antigo and estado.historico_oi.quantidade > self.janela_oi
+            else None
+        )
+        basis_pct = (
+            (estado.mark - estado.indice) / estado.indice * 100
+            if estado.mark is not None and estado.indice
+            else None
+        )
+        funding_z = (
+            estado.historico_funding.zscore(estado.funding)
+            if estado.funding is not None
+            else None
+        )
+        return {
+            "oi_delta_pct": oi_delta_pct,
+            "funding": estado.funding,
+            "funding_z": funding_z,
+            "basis_pct": basis_pct,
+        }
@@ -0,0 +1,458 @@
+# Arquivo trade_journal.py
+# Este arquivo contém o diário persistente de sinais e operações (item 12 do Roadmap).
+# Registra cada resultado de `identify_entries`, cada alerta emitido e o resultado
+# das operações em SQLite (modo WAL). As gravações são enfileiradas e feitas em lote
+# por uma thread em segundo plano, de modo que o loop de trading nunca bloqueia.
+
+import json
+import os
+import queue
+import sqlite3
+import time
+from contextlib import closing
+from threading import Thread
+
+from loguru import logger
+
+from constants import JOURNAL_BATCH_SIZE, JOURNAL_FLUSH_INTERVAL_S, JOURNAL_PATH
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS sinais (
+    id INTEGER PRIMARY KEY,
+    ts INTEGER NOT NULL,
+    symbol TEXT NOT NULL,
+    timeframe TEXT NOT NULL,
+    entry_type TEXT NOT NULL,
+    preco REAL,
+    sl REAL,
+    tps TEXT,
+    forca INTEGER,
+    dados TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_sinais_symbol_tf_ts ON sinais (symbol, timeframe, ts);
+
+CREATE TABLE IF NOT EXISTS alertas (
+    id INTEGER PRIMARY KEY,
+    ts INTEGER NOT NULL,
+    symbol TEXT NOT NULL,
+    timeframe TEXT NOT NULL,
+    entry_type TEXT NOT NULL,
+    dados TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_alertas_symbol_tf_ts ON alertas (symbol, timeframe, ts);
+
+CREATE TABLE IF NOT EXISTS resultados (
+    id INTEGER PRIMARY KEY,
+    ts INTEGER NOT NULL,
+    symbol TEXT NOT NULL,
+    timeframe TEXT NOT NULL,
+    entry_type TEXT NOT NULL,
+    preco_entrada REAL,
+    preco_saida REAL,
+    quantidade REAL,
+    pnl REAL NOT NULL,
+    motivo TEXT
+);
+-- Índice de cobertura: o cálculo de drawdown lê apenas o índice
+CREATE INDEX IF NOT EXISTS idx_resultados_symbol_tf_ts
+    ON resultados (symbol, timeframe, ts, pnl);
+CREATE INDEX IF NOT EXISTS idx_resultados_ts ON resultados (ts, pnl);
+
+-- Agregados diários mantidos na gravação, para relatórios em milissegundos
+CREATE TABLE IF NOT EXISTS resumo_diario (
+    symbol TEXT NOT NULL,
+    timeframe TEXT NOT NULL,
+    dia INTEGER NOT NULL,
+    operacoes INTEGER NOT NULL,
+    vitorias INTEGER NOT NULL,
+    pnl REAL NOT NULL,
+    PRIMARY KEY (symbol, timeframe, dia)
+);
+
+-- Curva de PnL acumulado mantida na gravação (drawdown em O(1)); "*" = todos
+CREATE TABLE IF NOT EXISTS curva_pnl (
+    symbol TEXT NOT NULL,
+    timeframe TEXT NOT NULL,
+    equity REAL NOT NULL,
+    pico REAL NOT NULL,
+    drawdown REAL NOT NULL,
+    PRIMARY KEY (symbol, timeframe)
+);
+"""
+
+INSERCOES = {
+    "sinais": "INSERT INTO sinais (ts, symbol, timeframe, entry_type, preco, sl, tps, forca, dados) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    "alertas": "INSERT INTO alertas (ts, symbol, timeframe, entry_type, dados) VALUES (?, ?, ?, ?, ?)",
+    "resultados": "INSERT INTO resultados (ts, symbol, timeframe, entry_type, preco_entrada, "
+    "preco_saida, quantidade, pnl, motivo) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+}
+
+UPSERT_RESUMO = """
+INSERT INTO resumo_diario (symbol, timeframe, dia, operacoes, vitorias, pnl)
+VALUES (?, ?, ?, 1, ?, ?)
+ON CONFLICT (symbol, timeframe, dia) DO UPDATE SET
+    operacoes = operacoes + 1,
+    vitorias = vitorias + excluded.vitorias,
+    pnl = pnl + excluded.pnl
+"""
+
+UPSERT_CURVA = """
+INSERT INTO curva_pnl (symbol, timeframe, equity, pico, drawdown) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (symbol, timeframe) DO UPDATE SET
+    equity = excluded.equity,
+    pico = excluded.pico,
+    drawdown = excluded.drawdown
+"""
+TODOS = "*"
+
+
+def _atualizar_curva(curvas, symbol, timeframe, pnl):
+    """
+    Soma um resultado às curvas do par/timeframe, do par, do timeframe e geral.
+
+    Args:
+        curvas (dict): (symbol, timeframe) -> [equity, pico, drawdown], alterado no lugar.
+
+    Returns:
+        set: Chaves alteradas.
+    """
+    chaves = {(symbol, timeframe), (symbol, TODOS), (TODOS, timeframe), (TODOS, TODOS)}
+    for chave in chaves:
+        curva = curvas.setdefault(chave, [0.0, 0.0, 0.0])
+        curva[0] += pnl
+        curva[1] = max(curva[1], curva[0])
+        curva[2] = max(curva[2], curva[1] - curva[0])
+    return chaves
+
+
+def _conectar(caminho):
+    conexao = sqlite3.connect(caminho, check_same_thread=False)
+    conexao.execute("PRAGMA journal_mode=WAL")
+    conexao.execute("PRAGMA synchronous=NORMAL")
+    return conexao
+
+
+class TradeJournal:
+    """
+    Diário de sinais, alertas e resultados de operações em SQLite.
+
+    Os métodos `registrar_*` apenas enfileiram o registro (sem bloquear); se a
+    fila estiver cheia o registro é descartado e contabilizado em `descartados`.
+    """
+
+    def __init__(
+        self,
+        caminho=JOURNAL_PATH,
+        tamanho_lote=JOURNAL_BATCH_SIZE,
+        intervalo_flush=JOURNAL_FLUSH_INTERVAL_S,
+        tamanho_fila=100_000,
+        relogio=time.time,
+    ):
+        self.caminho = caminho
+        self.tamanho_lote = tamanho_lote
+        self.intervalo_flush = intervalo_flush
+        self.relogio = relogio
+        self.fila = queue.Queue(maxsize=tamanho_fila)
+        self.descartados = 0
+        self.is_running = False
+        self._thread = None
+        self._curvas = {}  # (symbol, timeframe) -> [equity, pico, drawdown], da thread de gravação
+
+        if os.path.dirname(caminho):
+            os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        with closing(_conectar(caminho)) as conexao:
+            conexao.executescript(ESQUEMA)
+            self._reconstruir_curvas(conexao)
+
+    @staticmethod
+    def _reconstruir_curvas(conexao):
+        """Monta `curva_pnl` a partir dos resultados já gravados (diários anteriores a ela)."""
+        if conexao.execute("SELECT 1 FROM curva_pnl LIMIT 1").fetchone():
+            return
+        curvas = {}
+        for symbol, timeframe, pnl in conexao.execute(
+            "SELECT symbol, timeframe, pnl FROM resultados ORDER BY ts, id"
+        ):
+            _atualizar_curva(curvas, symbol, timeframe, pnl)
+        with conexao:
+            conexao.executemany(UPSERT_CURVA, [(*chave, *curva) for chave, curva in curvas.items()])
+
+    # --- Gravação (não bloqueante) ---
+
+    def _enfileirar(self, tabela, linha):
+        try:
+            self.fila.put_nowait((tabela, linha))
+        except queue.Full:
+            self.descartados += 1
+
+    def _ts(self, ts):
+        return int((ts if ts is not None else self.relogio()) * 1000)
+
+    def registrar_sinal(self, symbol, timeframe, resultado, preco=None, ts=None):
+        """
+        Registra um resultado de `identify_entries`.
+
+        Args:
+            symbol (str): Símbolo do par.
+            timeframe (str): Timeframe analisado.
+            resultado (dict): Resultado de `identify_entries`.
+            preco (float, optional): Preço no momento do sinal. Defaults to None.
+            ts (float, optional): Timestamp (segundos). Defaults to o relógio atual.
+        """
+        self._enfileirar(
+            "sinais",
+            (
+                self._ts(ts),
+                symbol,
+                timeframe,
+                resultado.get("entry_type", ""),
+                preco,
+                resultado.get("sl"),
+                json.dumps(resultado.get("tps") or []),
+                resultado.get("forca_do_sinal"),
+                json.dumps(
+                    {
+                        k: v
+                        for k, v in resultado.items()
+                        if k not in ("entry_type", "sl", "tps", "forca_do_sinal")
+                    },
+                    default=str,
+                ),
+            ),
+        )
+
+    def registrar_alerta(self, symbol, timeframe, resultado, ts=None):
+        """Registra um alerta efetivamente emitido."""
+        self._enfileirar(
+            "alertas",
+            (
+                self._ts(ts),
+                symbol,
+                timeframe,
+                resultado.get("entry_type", ""),
+                json.dumps(
+                    {
+                        "tps": resultado.get("tps"),
+                        "sl": resultado.get("sl"),
+                        "alavancagem": resultado.get("alavancagem"),
+                    },
+                    default=str,
+                ),
+            ),
+        )
+
+    def registrar_resultado(
+        self,
+        symbol,
+        timeframe,
+        entry_type,
+        preco_entrada,
+        preco_saida,
+        quantidade,
+        pnl,
+        motivo=None,
+        ts=None,
+    ):
+        """
+        Registra o resultado (total ou parcial) de uma operação.
+
+        Args:
+            symbol (str): Símbolo do par.
+            timeframe (str): Timeframe do sinal de origem.
+            entry_type (str): "BUY/LONG" ou "SELL/SHORT".
+            preco_entrada (float): Preço de entrada.
+            preco_saida (float): Preço de saída.
+            quantidade (float): Quantidade encerrada.
+            pnl (float): PnL realizado em USDT.
+            motivo (str, optional): Motivo da saída (ex: "TP1", "SL"). Defaults to None.
+            ts (float, optional): Timestamp (segundos). Defaults to o relógio atual.
+        """
+        self._enfileirar(
+            "resultados",
+            (
+                self._ts(ts),
+                symbol,
+                timeframe,
+                entry_type,
+                preco_entrada,
+                preco_saida,
+                quantidade,
+                pnl,
+                motivo,
+            ),
+        )
+
+    # --- Thread de gravação ---
+
+    def start(self):
+        self.is_running = True
+        self._thread = Thread(target=self._gravar, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Para a thread de gravação após gravar o que estiver na fila."""
+        self.is_running = False
+        if self._thread:
+            self._thread.join()
+
+    def _gravar(self):
+        conexao = _conectar(self.caminho)
+        try:
+            # Curvas de PnL em memória: esta thread é a única que grava
+            self._curvas = {
+                (symbol, timeframe): [equity, pico, drawdown]
+                for symbol, timeframe, equity, pico, drawdown in conexao.execute(
+                    "SELECT symbol, timeframe, equity, pico, drawdown FROM curva_pnl"
+                )
+            }
+            while self.is_running or not self.fila.empty():
+                lote = self._coletar_lote()
+                if lote:
+                    self._gravar_lote(conexao, lote)
+        finally:
+            conexao.close()
+
+    def _coletar_lote(self):
+        lote = []
+        limite = time.monotonic() + self.intervalo_flush
+        while len(lote) < self.tamanho_lote:
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                break
+            try:
+                lote.append(self.fila.get(timeout=restante))
+            except queue.Empty:
+                break
+        return lote
+
+    def _gravar_lote(self, conexao, lote):
+        por_tabela = {}
+        for tabela, linha in lote:
+            por_tabela.setdefault(tabela, []).append(linha)
+        resultados = por_tabela.get("resultados", [])
+        # Curvas atualizadas sobre uma cópia, descartada se a transação falhar
+        curvas = self._curvas
+        if resultados:
+            curvas = {chave: list(curva) for chave, curva in curvas.items()}
+        alteradas = set()
+        for l in sorted(resultados, key=lambda l: l[0]):
+            alteradas |= _atualizar_curva(curvas, l[1], l[2], l[7])
+        try:
+            with conexao:
+                for tabela, linhas in por_tabela.items():
+                    conexao.executemany(INSERCOES[tabela], linhas)
+                conexao.executemany(
+                    UPSERT_RESUMO,
+                    [(l[1], l[2], l[0] // 86_400_000, int(l[7] > 0), l[7]) for l in resultados],
+                )
+                conexao.executemany(
+                    UPSERT_CURVA, [(*chave, *curvas[chave]) for chave in alteradas]
+                )
+            self._curvas = curvas
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao gravar lote de {len(lote)} registros no diário: {e}")
+
+    # --- Relatórios ---
+
+    def _consultar(self, sql, parametros=()):
+        with closing(_conectar(self.caminho)) as conexao:
+            conexao.row_factory = sqlite3.Row
+            return [dict(r) for r in conexao.execute(sql, parametros)]
+
+    @staticmethod
+    def _filtros(symbol, timeframe, coluna_ts, desde, ate):
+        condicoes, parametros = [], []
+        for coluna, valor in (("symbol", symbol), ("timeframe", timeframe)):
+            if valor is not None:
+                condicoes.append(f"{coluna} = ?")
+                parametros.append(valor)
+        if desde is not None:
+            condicoes.append(f"{coluna_ts} >= ?")
+            parametros.append(desde)
+        if ate is not None:
+            condicoes.append(f"{coluna_ts} < ?")
+            parametros.append(ate)
+        where = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+        return where, parametros
+
+    def estatisticas(self, symbol=None, timeframe=None, agrupar=("symbol", "timeframe")):
+        """
+        Estatísticas de PnL e taxa de acerto a partir do resumo diário.
+
+        Args:
+            symbol (str, optional): Filtra por par. Defaults to None.
+            timeframe (str, optional): Filtra por timeframe. Defaults to None.
+            agrupar (tuple, optional): Colunas de agrupamento ("symbol", "timeframe").
+
+        Returns:
+            list: Linhas com operações, vitórias, taxa de acerto, PnL total e médio.
+        """
+        where, parametros = self._filtros(symbol, timeframe, "dia", None, None)
+        colunas = ", ".join(c for c in agrupar if c in ("symbol", "timeframe"))
+        selecao = f"{colunas}, " if colunas else ""
+        agrupamento = f"GROUP BY {colunas}" if colunas else ""
+        return self._consultar(
+            f"""
+            SELECT {selecao}
+                   SUM(operacoes) AS operacoes,
+                   SUM(vitorias) AS vitorias,
+                   1.0 * SUM(vitorias) / SUM(operacoes) AS taxa_acerto,
+                   SUM(pnl) AS pnl_total,
+                   SUM(pnl) / SUM(operacoes) AS pnl_medio
+            FROM resumo_diario {where} {agrupamento}
+            """,
+            parametros,
+        )
+
+    def drawdown_maximo(self, symbol=None, timeframe=None, desde=None, ate=None):
+        """
+        Calcula o drawdown máximo da curva de PnL acumulado (em USDT).
+
+        Sem intervalo de tempo, lê a curva mantida na gravação (`curva_pnl`, O(1));
+        com `desde`/`ate`, percorre os resultados do intervalo (O(n) nas linhas dele).
+
+        Args:
+            symbol (str, optional): Filtra por par. Defaults to None.
+            timeframe (str, optional): Filtra por timeframe. Defaults to None.
+            desde (int, optional): Timestamp inicial (ms). Defaults to None.
+            ate (int, optional): Timestamp final (ms). Defaults to None.
+
+        Returns:
+            float: Maior queda em relação ao pico anterior.
+        """
+        if desde is None and ate is None:
+            linhas = self._consultar(
+                "SELECT drawdown FROM curva_pnl WHERE symbol = ? AND timeframe = ?",
+                (symbol if symbol is not None else TODOS, timeframe if timeframe is not None else TODOS),
+            )
+            return linhas[0]["drawdown"] if linhas else 0.0
+        where, parametros = self._filtros(symbol, timeframe, "ts", desde, ate)
+        linhas = self._consultar(
+            f"""
+            WITH curva AS (
+                -- `id` (o rowid) desempata resultados no mesmo ts na ordem de
+                -- gravação, a mesma usada pela curva_pnl
+                SELECT ts, id,
+                       SUM(pnl) OVER (ORDER BY ts, id ROWS UNBOUNDED PRECEDING) AS equity
+                FROM resultados {where}
+            ), picos AS (
+                SELECT equity,
+                       MAX(equity) OVER (ORDER BY ts, id ROWS UNBOUNDED PRECEDING) AS pico
+                FROM curva
+            )
+            SELECT COALESCE(MAX(MAX(pico, 0) - equity), 0) AS drawdown FROM picos
+            """,
+            parametros,
+        )
+        return linhas[0]["drawdown"] if linhas else 0.0
+
+    def relatorio(self, symbol=None, timeframe=None):
+        """Relatório consolidado: totais, drawdown e estatísticas por par e timeframe."""
+        totais = self.estatisticas(symbol, timeframe, agrupar=())
+        return {
+            "totais": totais[0] if totais else {},
+            "drawdown_maximo": self.drawdown_maximo(symbol, timeframe),
+            "por_par": self.estatisticas(symbol, timeframe, agrupar=("symbol",)),
+            "por_timeframe": self.estatisticas(symbol, timeframe, agrupar=("timeframe",)),
+        }
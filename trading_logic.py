@@ -3,8 +3,19 @@
 
 
 from indicators import calculate_sma, calculate_volatility
+from constants import (
+    BASIS_THRESHOLD_PCT,
+    FUNDING_ZSCORE_THRESHOLD,
+    LOG_RATE_LIMIT_PER_MIN,
+    OI_DELTA_THRESHOLD_PCT,
+    VOLATILITY_THRESHOLDS,
+)
 import numpy as np
 import talib
+from loguru import logger
+from signal_state import descrever, montar_mascara, pontuar
+from support_resistance import ajustar_tps
+from volatility import classificar
 
 
 def identify_entries(
@@ -28,6 +39,11 @@ def identify_entries(
     rsi_threshold_short=70,
     long_term=False,
     active_signals=None,
+    volume_confirmation=None,
+    indicadores_tp_sl=None,
+    sentimento=None,
+    volatilidade=None,
+    estado_sinais=None,
 ):
     """
     Identifica oportunidades de entrada com base em indicadores técnicos, padrões de candles e Ichimoku Cloud.
@@ -53,6 +69,20 @@ def identify_entries(
         rsi_threshold_short (int, optional): Limiar do RSI para venda (short). Defaults to 70.
         long_term (bool, optional): Indica se a análise é de longo prazo. Defaults to False.
         active_signals (list, optional): Lista de sinais ativos. Defaults to None.
+        volume_confirmation (dict, optional): Confirmação de volume por lado ({"compra": bool,
+            "venda": bool}), ex: de `TickAggregator.confirmacao_volume`. Defaults to None
+            (volume atual acima da média dos últimos 'period_sma' períodos).
+        indicadores_tp_sl (dict, optional): ATR e SMA longa já calculados ({"atr": float,
+            "sma_longa": float}) e os níveis de S/R ("niveis_sr"), repassados a
+            `calculate_tp_sl`. Defaults to None.
+        sentimento (dict, optional): Features do tópico tickers ({"oi_delta_pct",
+            "funding_z", "basis_pct"}), ex: de `TickerFeatures.features`. Defaults to None.
+        volatilidade (float, optional): Volatilidade já calculada (% no período de
+            referência), ex: de `EstadoIndicadores.volatilidade`. Defaults to None
+            (`calculate_volatility` sobre `prices`).
+        estado_sinais (EstadoSinais, optional): Vetor de condições anterior do par,
+            para mensagens de cruzamento apenas quando a condição mudou. Defaults to
+            None (mensagens de nível).
 
     Returns:
         dict: Um dicionário com o tipo de entrada, os níveis de TP e SL e os sinais ativos.
@@ -86,89 +116,14 @@ def identify_entries(
                 stochastic_k[-1] < stochastic_d[-1] and stochastic_k[-1] > 20
             )
 
-            # Calcular a média do volume dos últimos 'period_sma' períodos
-            media_volume = np.mean(volumes[-period_sma:])
-
-            # Contagem de quantos sinais de compra ou venda estão ativos, considerando o volume para confirmar a força do sinal
-            buy_signals_count = 0
-            sell_signals_count = 0
-
-            # --- SMA ---
-            if signal_sma and volumes[-1] > media_volume:
-                buy_signals_count += 2
-            elif signal_sma:
-                buy_signals_count += 1
-
-            if not signal_sma and volumes[-1] > media_volume:
-                sell_signals_count += 2
-            elif not signal_sma:
-                sell_signals_count += 1
-
-            # --- EMA ---
-            if signal_ema and volumes[-1] > media_volume:
-                buy_signals_count += 2
-            elif signal_ema:
-                buy_signals_count += 1
-
-            if not signal_ema and volumes[-1] > media_volume:
-                sell_signals_count += 2
-            elif not signal_ema:
-                sell_signals_count += 1
-
-            # --- MACD ---
-            if signal_macd and volumes[-1] > media_volume:
-                buy_signals_count += 2
-            elif signal_macd:
-                buy_signals_count += 1
-
-            if not signal_macd and volumes[-1] > media_volume:
-                sell_signals_count += 2
-            elif not signal_macd:
-                sell_signals_count += 1
-
-            # --- Bollinger ---
-            if signal_bollinger_lower and volumes[-1] > media_volume:
-                buy_signals_count += 2
-            elif signal_bollinger_lower:
-                buy_signals_count += 1
-
-            if signal_bollinger_upper and volumes[-1] > media_volume:
-                sell_signals_count += 2
-            elif signal_bollinger_upper:
-                sell_signals_count += 1
-
-            # --- VWAP ---
-            if signal_vwap and volumes[-1] > media_volume:
-                buy_signals_count += 2
-            elif signal_vwap:
-                buy_signals_count += 1
-
-            if not signal_vwap and volumes[-1] > media_volume:
-                sell_signals_count += 2
-            elif not signal_vwap:
-                sell_signals_count += 1
-
-            # --- ADX ---
-            if signal_adx and volumes[-1] > media_volume:
-                buy_signals_count += 2
-            elif signal_adx:
-                buy_signals_count += 1
-
-            if not signal_adx and volumes[-1] > media_volume:
-                sell_signals_count += 2
-            elif not signal_adx:
-                sell_signals_count += 1
-
-            # --- Estocástico ---
-            if signal_stochastic_buy and volumes[-1] > media_volume:
-                buy_signals_count += 2
-            elif signal_stochastic_buy:
-                buy_signals_count += 1
-
-            if signal_stochastic_sell and volumes[-1] > media_volume:
-                sell_signals_count += 2
-            elif signal_stochastic_sell:
-                sell_signals_count += 1
+            # Confirmação de volume: usa a fornecida (ex: delta compra/venda dos negócios)
+            # ou, na falta dela, o volume atual acima da média dos últimos 'period_sma' períodos
+            if volume_confirmation is None:
+                media_volume = np.mean(volumes[-period_sma:])
+                volume_compra = volume_venda = volumes[-1] > media_volume
+            else:
+                volume_compra = volume_confirmation["compra"]
+                volume_venda = volume_confirmation["venda"]
 
             # --- Ichimoku Cloud ---
             signal_ichimoku_tenkan_kijun = (
@@ -179,82 +134,95 @@ def identify_entries(
                 and current_price > ichimoku["senkou_span_b"][-1]
             )
 
-            if (
-                signal_ichimoku_tenkan_kijun
-                and signal_ichimoku_price_above_cloud
-                and volumes[-1] > media_volume
-            ):
-                buy_signals_count += 2
-            elif signal_ichimoku_tenkan_kijun and signal_ichimoku_price_above_cloud:
-                buy_signals_count += 1
-
-            if (
-                not signal_ichimoku_tenkan_kijun
-                and not signal_ichimoku_price_above_cloud
-                and volumes[-1] > media_volume
-            ):
-                sell_signals_count += 2
-            elif (
-                not signal_ichimoku_tenkan_kijun
-                and not signal_ichimoku_price_above_cloud
-            ):
-                sell_signals_count += 1
-
-            # Inicializa entry_type como "No Signal"
-            entry_type = "No Signal"
-
-            # Calcula a volatilidade
-            volatility = calculate_volatility(prices)
+            # --- Sentimento (funding, open interest e basis) ---
+            funding_alto = funding_baixo = oi_alta = basis_premio = basis_desconto = False
+            sinais_sentimento = []
+            if sentimento:
+                funding_z = sentimento.get("funding_z")
+                oi_delta = sentimento.get("oi_delta_pct")
+                basis = sentimento.get("basis_pct")
+
+                # Funding extremo: posições lotadas de um lado (leitura contrária)
+                if funding_z is not None and funding_z >= FUNDING_ZSCORE_THRESHOLD:
+                    funding_alto = True
+                    sinais_sentimento.append(
+                        f"Funding: taxa elevada (z={funding_z:.1f}), excesso de compradores."
+                    )
+                elif funding_z is not None and funding_z <= -FUNDING_ZSCORE_THRESHOLD:
+                    funding_baixo = True
+                    sinais_sentimento.append(
+                        f"Funding: taxa baixa (z={funding_z:.1f}), excesso de vendedores."
+                    )
+
+                # Open interest crescente confirma a direção do preço
+                if oi_delta is not None and oi_delta >= OI_DELTA_THRESHOLD_PCT:
+                    oi_alta = True
+                    sinais_sentimento.append(
+                        f"Open interest: alta de {oi_delta:.1f}% confirmando o movimento."
+                    )
+
+                # Basis: prêmio/desconto do preço de marcação sobre o índice
+                if basis is not None and basis >= BASIS_THRESHOLD_PCT:
+                    basis_premio = True
+                    sinais_sentimento.append(f"Basis: prêmio de {basis:.2f}% sobre o índice.")
+                elif basis is not None and basis <= -BASIS_THRESHOLD_PCT:
+                    basis_desconto = True
+                    sinais_sentimento.append(f"Basis: desconto de {abs(basis):.2f}% sobre o índice.")
+
+            # --- Vetor de condições (ordem de signal_state.CONDICOES) ---
+            mascara = montar_mascara(
+                signal_sma,
+                signal_ema,
+                signal_macd,
+                signal_bollinger_lower,
+                signal_bollinger_upper,
+                signal_rsi_long,
+                signal_rsi_short,
+                signal_vwap,
+                signal_adx,
+                stochastic_k[-1] > stochastic_d[-1],
+                signal_stochastic_buy,
+                signal_stochastic_sell,
+                signal_ichimoku_tenkan_kijun,
+                signal_ichimoku_price_above_cloud,
+                volume_compra,
+                volume_venda,
+                funding_alto,
+                funding_baixo,
+                oi_alta,
+                basis_premio,
+                basis_desconto,
+            )
+            # Pontuação memorizada por vetor: barras sem mudança não recontam nada
+            buy_signals_count, sell_signals_count, decisao = pontuar(mascara, bool(long_term))
+            # Bordas desde a vela anterior: distinguem um cruzamento de um nível mantido
+            subida = descida = 0
+            if estado_sinais is not None:
+                subida, descida = estado_sinais.atualizar(
+                    mascara, int(candles[-1]["start"]), int(candles[-2]["start"])
+                )
 
             # --- active_signals ---
-            active_signals = []
-            if signal_sma:
-                active_signals.append(f"SMA: Preço cruzou a SMA de baixo para cima.")
-            if signal_ema:
-                active_signals.append(f"EMA: Preço cruzou a EMA de baixo para cima.")
-            if signal_macd:
-                active_signals.append("MACD: MACD cruzou o sinal de baixo para cima.")
-            if signal_bollinger_lower:
-                active_signals.append(
-                    "Bollinger: Preço rompeu a banda inferior de Bollinger."
-                )
-            if signal_bollinger_upper:
-                active_signals.append(
-                    "Bollinger: Preço rompeu a banda superior de Bollinger."
-                )
-            if signal_vwap:
-                active_signals.append("VWAP: Preço está acima do VWAP.")
-            if signal_adx:
-                active_signals.append("ADX: Sinal forte")
-            if signal_stochastic_buy:
-                active_signals.append("Estocástico: Cruzamento de compra")
-            if signal_stochastic_sell:
-                active_signals.append("Estocástico: Cruzamento de venda")
-            if (
-                signal_ichimoku_tenkan_kijun and signal_ichimoku_price_above_cloud
-            ):  # Adicionado: Sinal do Ichimoku Cloud
-                active_signals.append(
-                    "Ichimoku: Tenkan-sen cruzou acima da Kijun-sen e preço acima da nuvem."
-                )
+            active_signals = list(descrever(mascara, subida, descida))
+            active_signals.extend(sinais_sentimento)
 
             # Calcular a força do sinal
             forca_do_sinal = buy_signals_count + sell_signals_count
 
-            # --- Lógica de decisão para compra/venda ---
-            if buy_signals_count > 5 and (
-                signal_rsi_long or long_term
-            ):  # Usar RSI para long_term
-                entry_type = "BUY/LONG"
-                tp_sl_levels = calculate_tp_sl(
-                    prices, entry_type, volatility, candles, forca_do_sinal
+            # --- Lógica de decisão para compra/venda (RSI, ou long_term) ---
+            if decisao in ("BUY/LONG", "SELL/SHORT"):
+                entry_type = decisao
+                # Volatilidade relativa (% no período de referência)
+                volatility = (
+                    volatilidade if volatilidade is not None else calculate_volatility(prices)
                 )
-
-            elif sell_signals_count > 5 and (
-                signal_rsi_short or long_term
-            ):  # Usar RSI para long_term
-                entry_type = "SELL/SHORT"
                 tp_sl_levels = calculate_tp_sl(
-                    prices, entry_type, volatility, candles, forca_do_sinal
+                    prices,
+                    entry_type,
+                    volatility,
+                    candles,
+                    forca_do_sinal,
+                    **(indicadores_tp_sl or {}),
                 )
 
             else:
@@ -277,10 +245,15 @@ def identify_entries(
                 ],  # Corrigido: usar "tps" em vez de "tp1", "tp2", "tp3"
                 "sl": tp_sl_levels["sl"],
                 "active_signals": active_signals,
+                "forca_do_sinal": forca_do_sinal,
+                "pontos_compra": buy_signals_count,
+                "pontos_venda": sell_signals_count,
             }
 
         except Exception as inner_e:  # Capturar exceções internas
-            print(f"Erro interno ao identificar entradas: {inner_e}")
+            logger.error(
+                "Erro interno ao identificar entradas: {}", inner_e, limite=LOG_RATE_LIMIT_PER_MIN
+            )
             return {
                 "entry_type": "NEUTRO",
                 "tps": [],
@@ -289,7 +262,7 @@ def identify_entries(
             }
 
     except Exception as e:  # Capturar exceções gerais
-        print(f"Error identifying entries: {e}")
+        logger.error("Erro ao identificar entradas: {}", e, limite=LOG_RATE_LIMIT_PER_MIN)
         return {
             "entry_type": "ERRO",
             "tps": [],
@@ -297,7 +270,9 @@ def identify_entries(
             "active_signals": [f"Erro ao identificar entradas: {e}"],
         }
     except Exception as inner_e:  # Capturar exceções internas
-        print(f"Erro interno ao identificar entradas: {inner_e}")
+        logger.error(
+            "Erro interno ao identificar entradas: {}", inner_e, limite=LOG_RATE_LIMIT_PER_MIN
+        )
         return {
             "entry_type": "NEUTRO",
             "tps": [],
@@ -306,7 +281,7 @@ def identify_entries(
         }
 
     except Exception as e:  # Capturar exceções gerais
-        print(f"Error identifying entries: {e}")
+        logger.error("Erro ao identificar entradas: {}", e, limite=LOG_RATE_LIMIT_PER_MIN)
         return {
             "entry_type": "ERRO",
             "tps": [],
@@ -315,7 +290,20 @@ def identify_entries(
         }
 
 
-def calculate_tp_sl(prices, entry_type, volatility, candles, forca_do_sinal):
+# Multiplicadores do ATR (TP, SL) por regime de volatilidade
+MULTIPLICADORES_ATR = ((1.5, 0.5), (2.0, 1.0), (2.5, 1.5), (3.0, 2.0))
+
+
+def calculate_tp_sl(
+    prices,
+    entry_type,
+    volatility,
+    candles,
+    forca_do_sinal,
+    atr=None,
+    sma_longa=None,
+    niveis_sr=None,
+):
     """
     Calcula os níveis de TP e SL com base na volatilidade, ATR,
     força do sinal e presença de suportes/resistências.
@@ -323,38 +311,38 @@ def calculate_tp_sl(prices, entry_type, volatility, candles, forca_do_sinal):
     Args:
         prices (list): Lista de preços.
         entry_type (str): Tipo de entrada ("BUY/LONG" ou "SELL/SHORT").
-        volatility (float): Volatilidade do ativo.
+        volatility (float): Volatilidade do ativo (% no período de referência).
         candles (list): Lista de candles (OHLCV) no formato da Bybit.
         forca_do_sinal (int): Força do sinal.
+        atr (float, optional): ATR(14) já calculado. Defaults to None (calculado aqui).
+        sma_longa (float, optional): Último valor da SMA de 200 já calculado.
+            Defaults to None (calculado aqui).
+        niveis_sr (dict, optional): Suportes e resistências próximos, de
+            `MotorSR.niveis`. Defaults to None (a SMA de 200 faz esse papel).
 
     Returns:
         dict: Dicionário com os níveis de TP e SL.
     """
     current_price = prices[-1]
-    high = np.array([float(candle["high"]) for candle in candles])
-    low = np.array([float(candle["low"]) for candle in candles])
-    close = np.array([float(candle["close"]) for candle in candles])
 
     # Calcular o ATR (Average True Range)
-    atr = talib.ATR(high, low, close, timeperiod=14)[-1]
+    if atr is None:
+        high = np.array([float(candle["high"]) for candle in candles])
+        low = np.array([float(candle["low"]) for candle in candles])
+        close = np.array([float(candle["close"]) for candle in candles])
+        atr = talib.ATR(high, low, close, timeperiod=14)[-1]
 
     # Calcular a média móvel de 200 períodos para identificar suporte e resistência
-    period_sma_long = 200
-    sma_long = calculate_sma(prices, period_sma_long)
-
-    # Definir os multiplicadores do ATR para TP e SL com base na volatilidade
-    if volatility < 0.5:
-        tp_atr_multiplier = 1.5  # Volatilidade muito baixa
-        sl_atr_multiplier = 0.5
-    elif volatility < 1.0:
-        tp_atr_multiplier = 2.0  # Volatilidade baixa
-        sl_atr_multiplier = 1.0
-    elif volatility < 2.0:
-        tp_atr_multiplier = 2.5  # Volatilidade moderada
-        sl_atr_multiplier = 1.5
+    if sma_longa is not None:
+        sma_long = [sma_longa]
     else:
-        tp_atr_multiplier = 3.0  # Volatilidade alta
-        sl_atr_multiplier = 2.0
+        period_sma_long = 200
+        sma_long = calculate_sma(prices, period_sma_long)
+
+    # Definir os multiplicadores do ATR para TP e SL com base no regime de volatilidade
+    # (muito baixa, baixa, moderada e alta, separados por VOLATILITY_THRESHOLDS)
+    regime = min(int(classificar(volatility)), len(MULTIPLICADORES_ATR) - 1)
+    tp_atr_multiplier, sl_atr_multiplier = MULTIPLICADORES_ATR[regime]
 
     # Calcular a quantidade de TPs dinamicamente
     quantidade_tps = define_quantidade_tps(
@@ -377,7 +365,9 @@ def calculate_tp_sl(prices, entry_type, volatility, candles, forca_do_sinal):
         tps.append(tp)
 
     # Ajustar o TP se houver resistência/suporte próximo
-    if entry_type == "BUY/LONG" and sma_long:
+    if niveis_sr is not None and entry_type in ("BUY/LONG", "SELL/SHORT"):
+        tps = ajustar_tps(tps, current_price, entry_type, niveis_sr)
+    elif entry_type == "BUY/LONG" and sma_long:
         for i in range(len(tps)):
             if tps[i] > sma_long[-1]:
                 tps[i] = sma_long[-1]  # Define o TP na resistência
@@ -404,7 +394,7 @@ def define_quantidade_tps(forca_do_sinal, volatility, current_price, tps, sma_lo
 
     Args:
         forca_do_sinal (int): A força do sinal.
-        volatility (float): A volatilidade do ativo.
+        volatility (float): A volatilidade do ativo (% no período de referência).
         current_price (float): Preço atual do ativo.
         tps (list): Lista de níveis de TP.
         sma_long (float): Média móvel de longo prazo.
@@ -414,16 +404,17 @@ def define_quantidade_tps(forca_do_sinal, volatility, current_price, tps, sma_lo
     """
     quantidade_tps = 1  # Quantidade mínima de TPs
 
-    if forca_do_sinal >= 7 and volatility >= 1.0:
+    if forca_do_sinal >= 7 and volatility >= VOLATILITY_THRESHOLDS[1]:
         quantidade_tps += 2  # Sinal muito forte e volatilidade alta
 
-    if forca_do_sinal >= 5 and volatility >= 0.5:
+    if forca_do_sinal >= 5 and volatility >= VOLATILITY_THRESHOLDS[0]:
         quantidade_tps += 1  # Sinal forte e volatilidade moderada
 
     # Ajustar a quantidade de TPs com base na distância do TP e suportes/resistências
     if tps:
         distancia_tp1 = abs(tps[0] - current_price)
-        if distancia_tp1 > volatility * current_price * 0.05:  # TP1 distante
+        # TP1 distante: além do movimento típico (1σ) no período de referência
+        if distancia_tp1 > current_price * volatility / 100:
             quantidade_tps += 1
         if (
             sma_long and abs(tps[0] - sma_long) < distancia_tp1 * 0.5
@@ -0,0 +1,197 @@
+# Arquivo volatility.py
+# Este arquivo contém o motor de volatilidade em unidades relativas, comparáveis
+# entre pares de preços muito diferentes (BTC e XRP usam os mesmos limiares):
+# - Volatilidade realizada dos retornos logarítmicos (variância EWMA) em vários
+#   horizontes (VOLATILITY_HORIZONS, em velas).
+# - ATR% (ATR de Wilder dividido pelo fechamento).
+# - Estimador de Parkinson (amplitude máxima/mínima da vela), também em EWMA.
+# A versão incremental (`VolatilidadeStreaming`) é atualizada em O(1) por vela
+# confirmada; `volatilidade_lote` calcula as mesmas séries de forma vetorizada
+# (backtests e a primeira análise, antes do aquecimento).
+# As volatilidades realizada e de Parkinson são expressas em % no período de
+# referência (VOLATILITY_REFERENCE_S, 1 hora por padrão): σ por vela × √(velas no
+# período), o que também torna os limiares independentes do timeframe.
+
+import math
+
+import numpy as np
+
+from constants import (
+    TIMEFRAME,
+    VOLATILITY_ATR_PERIOD,
+    VOLATILITY_HORIZONS,
+    VOLATILITY_REFERENCE_S,
+    VOLATILITY_THRESHOLDS,
+)
+from kernels import ema as ema_kernel
+from tick_aggregator import timeframe_em_segundos
+
+PARKINSON = 1 / (4 * math.log(2))
+
+
+def escala_referencia(segundos_vela=None):
+    """Fator que converte σ por vela em % no período de referência."""
+    segundos_vela = segundos_vela or timeframe_em_segundos(TIMEFRAME)
+    return 100 * math.sqrt(VOLATILITY_REFERENCE_S / segundos_vela)
+
+
+def classificar(volatilidade, limiares=VOLATILITY_THRESHOLDS):
+    """
+    Regime de volatilidade: 0 (muito baixa) a len(limiares) (alta).
+
+    Aceita um valor ou um array (ex: a volatilidade de todos os pares).
+    """
+    return np.searchsorted(limiares, volatilidade, side="right")
+
+
+class VolatilidadeStreaming:
+    """
+    Volatilidade incremental de um par, alimentada por velas confirmadas.
+
+    As variâncias EWMA usam alfa = 2 / (horizonte + 1), com semente no primeiro
+    retorno (como `kernels.ema`); o ATR usa a suavização de Wilder, com semente no
+    primeiro true range.
+
+    Args:
+        horizontes (list, optional): Horizontes da volatilidade realizada (velas); o
+            primeiro é o principal. Defaults to VOLATILITY_HORIZONS.
+        periodo_atr (int, optional): Período do ATR. Defaults to VOLATILITY_ATR_PERIOD.
+    """
+
+    __slots__ = (
+        "horizontes",
+        "alfas",
+        "variancias",
+        "parkinson",
+        "atr",
+        "periodo_atr",
+        "anterior",
+        "n",
+    )
+
+    def __init__(self, horizontes=VOLATILITY_HORIZONS, periodo_atr=VOLATILITY_ATR_PERIOD):
+        self.horizontes = list(horizontes)
+        self.alfas = [2 / (h + 1) for h in self.horizontes]
+        self.variancias = [None] * len(self.horizontes)  # Variância dos retornos por vela
+        self.parkinson = None  # Variância de Parkinson por vela (EWMA do horizonte principal)
+        self.atr = None
+        self.periodo_atr = periodo_atr
+        self.anterior = None  # Fechamento anterior
+        self.n = 0  # Velas processadas
+
+    def atualizar(self, vela):
+        high, low, close = float(vela["high"]), float(vela["low"]), float(vela["close"])
+        anterior = self.anterior
+        if anterior is None:
+            tr = high - low
+        else:
+            tr = max(high - low, abs(high - anterior), abs(low - anterior))
+            if anterior > 0 and close > 0:
+                r2 = math.log(close / anterior) ** 2
+                for i, alfa in enumerate(self.alfas):
+                    variancia = self.variancias[i]
+                    self.variancias[i] = (
+                        r2 if variancia is None else variancia + alfa * (r2 - variancia)
+                    )
+        self.atr = tr if self.atr is None else self.atr + (tr - self.atr) / self.periodo_atr
+        if high > 0 and low > 0:
+            p = math.log(high / low) ** 2 * PARKINSON
+            self.parkinson = (
+                p if self.parkinson is None else self.parkinson + self.alfas[0] * (p - self.parkinson)
+            )
+        self.anterior = close
+        self.n += 1
+
+    @property
+    def pronto(self):
+        return self.n > self.horizontes[0]
+
+    def principal(self, segundos_vela=None):
+        """Volatilidade realizada do horizonte principal (% no período de referência), ou None."""
+        if not self.pronto or self.variancias[0] is None:
+            return None
+        return math.sqrt(self.variancias[0]) * escala_referencia(segundos_vela)
+
+    def valores(self, segundos_vela=None):
+        """Todas as estimativas: as mesmas chaves de `volatilidade_lote`."""
+        escala = escala_referencia(segundos_vela)
+        valores = {
+            f"realizada_{h}": math.sqrt(v) * escala if v is not None else None
+            for h, v in zip(self.horizontes, self.variancias)
+        }
+        valores["parkinson"] = (
+            math.sqrt(self.parkinson) * escala if self.parkinson is not None else None
+        )
+        valores["atr_pct"] = self.atr / self.anterior * 100 if self.anterior else None
+        return valores
+
+    def estado(self):
+        return [self.variancias, self.parkinson, self.atr, self.anterior, self.n]
+
+    def restaurar(self, estado):
+        variancias, self.parkinson, self.atr, self.anterior, self.n = estado
+        if len(variancias) == len(self.horizontes):
+            self.variancias = list(variancias)
+        else:  # Horizontes alterados desde o checkpoint: reaquece
+            self.variancias = [None] * len(self.horizontes)
+            self.n = 0
+
+
+def volatilidade_lote(
+    high,
+    low,
+    close,
+    segundos_vela=None,
+    horizontes=VOLATILITY_HORIZONS,
+    periodo_atr=VOLATILITY_ATR_PERIOD,
+):
+    """
+    Equivalente vetorizado de `VolatilidadeStreaming` sobre séries completas.
+
+    Returns:
+        dict: Arrays do tamanho das séries, com as chaves de `VolatilidadeStreaming.valores`
+        (NaN onde ainda não há retornos).
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    escala = escala_referencia(segundos_vela)
+    n = close.size
+    valores = {}
+    r2 = np.diff(np.log(close)) ** 2
+    for h in horizontes:
+        serie = np.full(n, np.nan)
+        if r2.size:
+            serie[1:] = np.sqrt(ema_kernel(r2, h)) * escala
+        valores[f"realizada_{h}"] = serie
+    p = np.log(high / low) ** 2 * PARKINSON
+    valores["parkinson"] = np.sqrt(ema_kernel(p, horizontes[0])) * escala
+    tr = high - low
+    if n > 1:
+        anterior = close[:-1]
+        tr[1:] = np.maximum(
+            tr[1:], np.maximum(np.abs(high[1:] - anterior), np.abs(low[1:] - anterior))
+        )
+    # Wilder (alfa = 1 / período) é a EMA de período 2 * período - 1
+    valores["atr_pct"] = ema_kernel(tr, 2 * periodo_atr - 1) / close * 100
+    return valores
+
+
+def volatilidade_realizada(prices, segundos_vela=None, horizonte=None):
+    """
+    Última volatilidade realizada (% no período de referência) de uma série de preços.
+
+    Args:
+        prices (list | np.ndarray): Fechamentos.
+        segundos_vela (int, optional): Duração da vela. Defaults to o TIMEFRAME.
+        horizonte (int, optional): Horizonte da EWMA. Defaults to o principal.
+
+    Returns:
+        float: Volatilidade (0.0 com menos de dois preços).
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    if prices.size < 2:
+        return 0.0
+    r2 = np.diff(np.log(prices)) ** 2
+    variancia = ema_kernel(r2, horizonte or VOLATILITY_HORIZONS[0])[-1]
+    return float(np.sqrt(variancia) * escala_referencia(segundos_vela))
@@ -1,56 +1,135 @@
-import logging
 import time
 from threading import Thread
-from collections import defaultdict
+from collections import defaultdict, deque
 import websocket
 import json
-from indicators import (
-    calculate_sma,
-    calculate_ema,
-    calculate_rsi,
-    calculate_macd,
-    calculate_bollinger_bands,
-    calculate_volatility,
-    calculate_vwap,
-    calculate_adx,
-    calculate_stochastic,
-    verificar_condicoes_entrada,
-)
+import numpy as np
+from loguru import logger
+from indicator_graph import PEDIDOS_SCANNER, AvaliadorIndicadores, PlanoIndicadores
+from trading_logic import identify_entries
+from streaming_indicators import EstadoIndicadores
+from signal_state import EstadoSinais, pontos_do_lado
+from ml_scoring import montar_features
 from telegram_alerts import enviar_mensagem_formatada
+from candle_store import ArmazemVelas, relatorio_memoria
+from tick_aggregator import timeframe_em_segundos
+from constants import (
+    CANDLE_SOURCE,
+    CANDLE_STORE_FLOAT32,
+    CANDLE_STORE_MODE,
+    EXECUTION_NOTIONAL_USDT,
+    INTRABAR_ENABLED,
+    INTRABAR_THROTTLE_S,
+    LOG_RATE_LIMIT_PER_MIN,
+    SR_ORDERBOOK_DEPTH,
+)
+
 
-# Configuração de logs
-logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.INFO)
+def _ultimo(valores):
+    """Retorna o último valor de uma série (ou o próprio valor escalar) como float."""
+    try:
+        return float(valores[-1])
+    except (TypeError, IndexError):
+        return float(valores) if valores is not None else None
 
 
 class WebSocketManager:
-    def __init__(self, api_url, symbols, timeframe):
+    def __init__(
+        self,
+        api_url,
+        symbols,
+        timeframe,
+        executor=None,
+        risk_manager=None,
+        journal=None,
+        metrics=None,
+        tick_aggregator=None,
+        captura=None,
+        ticker_features=None,
+        ml=None,
+        prefiltro=None,
+        agendador=None,
+        paper=None,
+        suporte_resistencia=None,
+    ):
         self.api_url = api_url
         self.symbols = symbols
         self.timeframe = timeframe
+        self.segundos_vela = timeframe_em_segundos(timeframe)
         self.ws = None
         self.is_running = False
         self.threads = []
-        self.data = defaultdict(list)
         self.NUM_MIN_VELAS = 20  # Número mínimo de velas para análise
+        self.MAX_VELAS = 250  # Velas mantidas por par (o TP/SL usa a SMA de 200)
+        # Velas por par: colunas compactas (candle_store.py) ou listas de dicts da Bybit
+        self.velas_compactas = CANDLE_STORE_MODE == "array"
+        self.data = (
+            ArmazemVelas(self.MAX_VELAS, CANDLE_STORE_FLOAT32)
+            if self.velas_compactas
+            else defaultdict(list)
+        )
+        self.estados = defaultdict(EstadoIndicadores)  # Indicadores incrementais por par
+        self.sinais = defaultdict(EstadoSinais)  # Vetor de condições anterior por par
+        # Grafo de indicadores: cada nó é calculado uma única vez por vela
+        self.indicadores = AvaliadorIndicadores(PlanoIndicadores(PEDIDOS_SCANNER))
+        self.executor = executor  # OrderExecutor opcional (order_execution.py)
+        self.risk_manager = risk_manager  # RiskManager opcional (risk_manager.py)
+        self.journal = journal  # TradeJournal opcional (trade_journal.py)
+        self.metrics = metrics  # MetricsRegistry opcional (metrics.py)
+        self.ao_primeira_vela = None  # Callback chamado ao receber a primeira vela
+        # TickAggregator opcional (tick_aggregator.py): confirmação de volume pelos
+        # negócios e, com CANDLE_SOURCE="trades", as próprias velas
+        self.tick_aggregator = tick_aggregator
+        self.captura = captura  # MarketCapture opcional (market_capture.py)
+        self.ticker_features = ticker_features  # TickerFeatures opcional (ticker_features.py)
+        self.ml = ml  # EstagioML opcional (ml_scoring.py)
+        self.prefiltro = prefiltro  # PreFiltro opcional (prefilter.py)
+        # AgendadorBarras opcional (bar_scheduler.py): avaliação em lote por vela confirmada
+        self.agendador = agendador
+        self.paper = paper  # PaperTrading opcional (paper_trading.py)
+        # MotorSR opcional (support_resistance.py): níveis de S/R para os TPs
+        self.suporte_resistencia = suporte_resistencia
+        # Avaliação intrabar: sinais provisórios nas atualizações da vela em andamento,
+        # no máximo uma avaliação por par a cada INTRABAR_THROTTLE_S
+        self.intrabar = INTRABAR_ENABLED
+        self.intervalo_intrabar_ms = INTRABAR_THROTTLE_S * 1000
+        self.ultima_intrabar = {}  # símbolo -> horário (ms) da última avaliação intrabar
+        # símbolo -> {start da vela: sinal provisório pendente}, até a vela ser avaliada fechada
+        self.provisorios = defaultdict(dict)
+        self.contagem_intrabar = {
+            "avaliacoes": 0,
+            "provisorios": 0,
+            "confirmados": 0,
+            "cancelados": 0,
+        }
+        # Destino dos alertas (substituído por um coletor local no replay)
+        self.enviar_alerta = enviar_mensagem_formatada
+        self.velas_locais = tick_aggregator is not None and CANDLE_SOURCE == "trades"
+        # Velas fechadas pela thread de relógio do TickAggregator, processadas na
+        # thread do WebSocket (nenhum estado do manager é compartilhado entre threads)
+        self.fila_velas_locais = deque()
+        # Funções de outras threads (ex: backfill de pares novos) executadas na do WebSocket
+        self.tarefas = deque()
+        if self.velas_locais:
+            tick_aggregator.ao_fechar_barra = self.receber_vela_local
 
     def connect(self):
         def _on_message(ws, message):
             self.on_message(ws, message)
 
+        # A reconexão é o próprio laço abaixo: run_forever retorna quando a conexão cai
         def _on_error(ws, error):
-            logger.error(f"WebSocket Error: {error}")
-            self.reconnect()
+            logger.error("WebSocket Error: {}", error)
 
         def _on_close(ws, close_status_code, close_msg):
             logger.warning("WebSocket Closed")
-            self.reconnect()
 
         def _on_open(ws):
             logger.info("WebSocket Connection Opened")
             self.subscribe()
 
-        while True:
+        # `is_running` é ligado por quem inicia a conexão (start) e desligado por `stop`
+        while self.is_running:
             try:
                 self.ws = websocket.WebSocketApp(
                     self.api_url,
@@ -61,77 +140,468 @@ class WebSocketManager:
                 self.ws.on_open = _on_open
                 self.ws.run_forever()
             except Exception as e:
-                logger.error(f"Erro ao conectar ao WebSocket: {e}")
+                logger.error("Erro ao conectar ao WebSocket: {}", e)
                 time.sleep(5)
 
-    def subscribe(self):
-        for symbol in self.symbols:
-            params = {
-                "op": "subscribe",
-                "args": [f"candle.{self.timeframe}.{symbol}"],
-            }
+    def subscribe(self, symbols=None):
+        symbols = self.symbols if symbols is None else symbols
+        # A Bybit aceita até 10 tópicos por requisição de inscrição
+        topicos = [topico for symbol in symbols for topico in self.topicos(symbol)]
+        for i in range(0, len(topicos), 10):
+            params = {"op": "subscribe", "args": topicos[i : i + 10]}
             self.ws.send(json.dumps(params))
-            logger.info(f"Inscrito no par: {symbol}")
+        logger.info("Inscrito em {} pares.", len(symbols))
+
+    def topicos(self, symbol):
+        """Tópicos públicos assinados para o par."""
+        topicos = []
+        if not self.velas_locais:
+            topicos.append(f"kline.{self.timeframe}.{symbol}")
+        if self.tick_aggregator:
+            topicos.append(f"publicTrade.{symbol}")
+        if self.ticker_features:
+            topicos.append(f"tickers.{symbol}")
+        if self.suporte_resistencia and self.suporte_resistencia.com_livro:
+            topicos.append(f"orderbook.{SR_ORDERBOOK_DEPTH}.{symbol}")
+        return topicos
+
+    def adicionar_simbolos(self, symbols):
+        """Adiciona pares ao monitoramento, inscrevendo-os na conexão já aberta."""
+        self.symbols = self.symbols + list(symbols)
+        if self.ws and self.ws.sock and self.ws.sock.connected:
+            self.subscribe(list(symbols))
 
     def on_message(self, ws, message):
+        inicio = time.perf_counter()
+        if self.captura:
+            self.captura.registrar(message)
         try:
+            self.executar_tarefas()
+            self.drenar_velas_locais()
             data = json.loads(message)
-            if "topic" in data and "candle" in data["topic"]:
-                symbol = data["topic"].split(".")[-1]
+            topic = data.get("topic", "")
+            if self.ml and "ts" in data:
+                self.processar_lotes_ml(data["ts"])
+            if topic.startswith("kline"):
+                self._notificar_primeira_vela()
+                symbol = topic.split(".")[-1]
                 for candle in data["data"]:
-                    self.data[symbol].append(candle)
-                    if len(self.data[symbol]) > self.NUM_MIN_VELAS:
-                        self.data[symbol].pop(0)
-                self.process_data(symbol)
+                    self.adicionar_vela(symbol, candle)
+                if self.paper:
+                    self.paper.on_preco(symbol, float(data["data"][-1]["close"]))
+                em_andamento = not data["data"][-1].get("confirm")
+                if self.agendador:
+                    self.agendar(symbol, data["data"])
+                elif not (self.intrabar and em_andamento):
+                    self.process_data(symbol)
+                if self.intrabar and em_andamento:
+                    self.avaliar_intrabar(symbol, data.get("ts"))
+            elif topic.startswith("publicTrade") and self.tick_aggregator:
+                self.tick_aggregator.on_trades(data["data"])
+                self.drenar_velas_locais()
+                if self.paper:
+                    for trade in data["data"]:
+                        self.paper.on_preco(trade["s"], float(trade["p"]))
+            elif topic.startswith("tickers") and self.ticker_features:
+                self.ticker_features.on_ticker(data["data"], data["ts"])
+                item = data["data"]
+                if self.paper and item.get("bid1Price") and item.get("ask1Price"):
+                    self.paper.on_preco(
+                        item["symbol"], float(item["bid1Price"]), float(item["ask1Price"])
+                    )
+            elif topic.startswith("orderbook") and self.suporte_resistencia:
+                self.suporte_resistencia.on_livro(data)
+            if self.agendador and "ts" in data:
+                self.avaliar_barras(data["ts"])
         except Exception as e:
-            logger.error(f"Erro ao processar mensagem: {e}")
+            logger.error("Erro ao processar mensagem: {}", e, limite=LOG_RATE_LIMIT_PER_MIN)
+        if self.metrics:
+            self.metrics.registrar_latencia(
+                "on_message", (time.perf_counter() - inicio) * 1000
+            )
+
+    def _notificar_primeira_vela(self):
+        if self.ao_primeira_vela:
+            self.ao_primeira_vela()
+            self.ao_primeira_vela = None
+
+    def adicionar_vela(self, symbol, candle):
+        """
+        Adiciona uma vela ao histórico do par. Atualizações da vela em andamento
+        (mesmo "start") substituem a última vela em vez de criar uma nova; velas
+        confirmadas atualizam os indicadores incrementais.
+        """
+        velas = self.data[symbol]
+        if self.velas_compactas:
+            velas.adicionar(candle)
+        elif velas and velas[-1]["start"] == candle["start"]:
+            velas[-1] = candle
+        else:
+            velas.append(candle)
+            if len(velas) > self.MAX_VELAS:
+                velas.pop(0)
+        if candle.get("confirm"):
+            self.estados[symbol].atualizar(candle)
+            if self.suporte_resistencia:
+                self.suporte_resistencia.on_vela(symbol, candle)
+
+    def memoria(self):
+        """Memória por par (velas e indicadores) e RSS do processo; veja `relatorio_memoria`."""
+        return relatorio_memoria(self)
+
+    def receber_vela_local(self, symbol, candle):
+        """
+        Recebe uma vela fechada pelo TickAggregator (CANDLE_SOURCE="trades").
+
+        Pode ser chamada pela thread de relógio do agregador: a vela apenas entra na
+        fila, drenada pela thread do WebSocket em `drenar_velas_locais`.
+        """
+        self.fila_velas_locais.append((symbol, candle))
 
-    def process_data(self, symbol):
+    def agendar_tarefa(self, funcao):
+        """Executa `funcao()` na thread do WebSocket, antes da próxima mensagem."""
+        self.tarefas.append(funcao)
+
+    def executar_tarefas(self):
+        while self.tarefas:
+            funcao = self.tarefas.popleft()
+            try:
+                funcao()
+            except Exception as e:
+                logger.error("Erro em tarefa agendada no WebSocketManager: {}", e)
+
+    def drenar_velas_locais(self):
+        """Processa as velas locais fechadas desde a última mensagem."""
+        fila = self.fila_velas_locais
+        while fila:
+            symbol, candle = fila.popleft()
+            self._notificar_primeira_vela()
+            self.adicionar_vela(symbol, candle)
+            if self.agendador:
+                self.agendar(symbol, [candle])
+                self.avaliar_barras(int(candle["start"]))
+            else:
+                self.process_data(symbol)
+
+    def agendar(self, symbol, candles):
+        """Registra as velas confirmadas no agendador; confirmações atrasadas são avaliadas já."""
+        for candle in candles:
+            if candle.get("confirm") and self.agendador.confirmar(symbol, candle["start"]):
+                # O lote desta vela já foi avaliado: corrige apenas este par
+                self.process_data(symbol, int(candle["start"]))
+
+    def avaliar_barras(self, agora_ms):
+        """Avalia os lotes de velas completos (ou com o prazo vencido), uma vez por par."""
+        total = len(self.symbols) or len(self.data)
+        for start in self.agendador.prontos(agora_ms, total):
+            for symbol in self.agendador.liberar(start, total):
+                self.process_data(symbol, start)
+
+    def avaliar_intrabar(self, symbol, agora_ms=None):
+        """
+        Avalia o par na vela em andamento (sinal provisório), respeitando o intervalo
+        mínimo entre avaliações intrabar do par.
+        """
+        agora_ms = agora_ms if agora_ms is not None else time.time() * 1000
+        ultima = self.ultima_intrabar.get(symbol)
+        if ultima is not None and agora_ms - ultima < self.intervalo_intrabar_ms:
+            return
+        self.ultima_intrabar[symbol] = agora_ms
+        self.contagem_intrabar["avaliacoes"] += 1
+        self.process_data(symbol, provisorio=True)
+
+    def process_data(self, symbol, start=None, provisorio=False):
+        """
+        Avalia o par na última vela ou, com `start`, na vela confirmada `start`
+        (ignorando a vela seguinte, se ela já começou). Com `provisorio`, a última
+        vela está em andamento e o sinal sai marcado como provisório.
+        """
         try:
             velas_historico = self.data[symbol]
+            if start is not None and velas_historico and int(velas_historico[-1]["start"]) > start:
+                velas_historico = velas_historico[:-1]
             if len(velas_historico) < self.NUM_MIN_VELAS:
                 return
+            vela = velas_historico[-1]
 
-            prices = [float(c["close"]) for c in velas_historico]
-            volumes = [float(c["volume"]) for c in velas_historico]
+            # Nível 1: pares longe de um sinal não passam pela avaliação completa
+            auditoria = False
+            if self.prefiltro:
+                if vela.get("confirm"):
+                    self.prefiltro.fechar_vela(vela["start"])
+                aprovado, auditoria = self.prefiltro.avaliar(symbol, self.estados[symbol], vela)
+                if not aprovado and not auditoria:
+                    if vela.get("confirm"):
+                        self.resolver_provisorio(symbol, "NEUTRO", int(vela["start"]))
+                    if self.ml and vela.get("confirm"):
+                        self.ml.dispensar(symbol, vela["start"])
+                        self.processar_lotes_ml(int(vela["start"]))
+                    if self.metrics:
+                        self.metrics.atualizar_simbolo(
+                            symbol, preco=float(vela["close"]), sinal="NEUTRO", atualizado=time.time()
+                        )
+                    return
 
-            sma = calculate_sma(prices)
-            ema = calculate_ema(prices)
-            rsi = calculate_rsi(prices)
-            macd_line, macd_signal = calculate_macd(prices)
-            upper_band, lower_band = calculate_bollinger_bands(prices)
-            vwap = calculate_vwap(prices, volumes)
-            adx = calculate_adx(velas_historico)
-            stochastic_k, stochastic_d = calculate_stochastic(prices)
+            series, ind = self.indicadores.avaliar(symbol, self.timeframe, velas_historico)
+            prices = series["close"]
+            period_sma = self.NUM_MIN_VELAS
+            macd_line, macd_signal = ind["macd"]
+            upper_band, lower_band = ind["bollinger"]
+            stochastic_k, stochastic_d = ind["estocastico"]
+            rsi, adx = ind["rsi"], ind["adx"]
 
-            result = verificar_condicoes_entrada(
+            result = identify_entries(
                 prices,
-                volumes,
-                sma,
-                ema,
-                rsi,
-                macd_line,
-                macd_signal,
-                upper_band,
-                lower_band,
-                vwap,
+                period_sma,
+                series["volume"],
+                ind["sma"],
+                ind["ema"],
+                _ultimo(rsi),
+                np.atleast_1d(macd_line),
+                np.atleast_1d(macd_signal),
+                np.atleast_1d(upper_band),
                 adx,
                 stochastic_k,
                 stochastic_d,
-                symbol,
+                np.atleast_1d(lower_band),
+                ind["vwap"],
+                velas_historico,
+                ind["ichimoku"],
+                volume_confirmation=(
+                    self.tick_aggregator.confirmacao_volume(symbol, int(vela["start"]))
+                    if self.tick_aggregator
+                    else None
+                ),
+                sentimento=(
+                    self.ticker_features.features(symbol) if self.ticker_features else None
+                ),
+                indicadores_tp_sl={
+                    "atr": _ultimo(ind["atr"]),
+                    "sma_longa": _ultimo(ind["sma_longa"]),
+                    "niveis_sr": (
+                        self.suporte_resistencia.niveis(symbol, prices[-1])
+                        if self.suporte_resistencia
+                        else None
+                    ),
+                },
+                # Volatilidade incremental (velas confirmadas); None no aquecimento
+                volatilidade=self.estados[symbol].volatilidade(self.segundos_vela),
+                estado_sinais=self.sinais[symbol],
             )
 
-            if result and result["entry_type"] != "No Signal":
-                logger.info(f"Sinal encontrado para {symbol}: {result}")
-                enviar_mensagem_formatada(
+            if auditoria:
+                self.prefiltro.registrar_auditoria(symbol, result)
+            if provisorio and result:
+                result["provisorio"] = True
+
+            if result and self.metrics:
+                self.metrics.atualizar_simbolo(
                     symbol,
-                    result["entry_type"],
-                    result.get("tps", []),
-                    result.get("sl", None),
-                    result.get("alavancagem", None),
+                    preco=prices[-1],
+                    rsi=_ultimo(rsi),
+                    adx=_ultimo(adx),
+                    sinal=result["entry_type"],
+                    forca=result.get("forca_do_sinal"),
+                    atualizado=time.time(),
                 )
+
+            if not result:
+                return
+            if self.ml and vela.get("confirm"):
+                # Decisão adiada: o lote da vela é pontuado de uma vez pelo modelo
+                self.ml.adicionar(
+                    symbol,
+                    vela["start"],
+                    result,
+                    prices[-1],
+                    montar_features(
+                        self.estados[symbol].valores(),
+                        vela,
+                        result,
+                        self.ticker_features.features(symbol) if self.ticker_features else None,
+                    ),
+                )
+                # Processa já o lote se esta era a última vela esperada
+                self.processar_lotes_ml(int(vela["start"]))
+                return
+            self.finalizar_sinal(symbol, result, prices[-1], int(vela["start"]))
         except Exception as e:
-            logger.error(f"Erro ao processar dados para {symbol}: {e}")
+            logger.error(
+                "Erro ao processar dados para {}: {}", symbol, e, symbol=symbol, limite=LOG_RATE_LIMIT_PER_MIN
+            )
+
+    def processar_lotes_ml(self, agora_ms):
+        """Pontua os lotes de velas completos (ou com o prazo de coleta vencido)."""
+        for start in self.ml.prontos(agora_ms, len(self.symbols) or len(self.data)):
+            for symbol, result, preco in self.ml.processar(start):
+                try:
+                    self.finalizar_sinal(symbol, result, preco, start)
+                except Exception as e:
+                    logger.error(
+                        "Erro ao finalizar o sinal de {}: {}",
+                        symbol,
+                        e,
+                        symbol=symbol,
+                        limite=LOG_RATE_LIMIT_PER_MIN,
+                    )
+
+    def finalizar_sinal(self, symbol, result, preco, start=None):
+        """
+        Registra o sinal e, se for de compra/venda, aplica o risco e emite o alerta.
+
+        Args:
+            start (int, optional): Início da vela avaliada, para confirmar um sinal
+                provisório dela. Defaults to None.
+        """
+        if result.get("provisorio"):
+            self.emitir_provisorio(symbol, result, preco, start)
+            return
+
+        if self.journal:
+            self.journal.registrar_sinal(symbol, self.timeframe, result, preco)
+
+        entrada = result["entry_type"] in ("BUY/LONG", "SELL/SHORT")
+        # Um sinal bloqueado pelo risco não confirma o provisório: ele é cancelado
+        aprovado = entrada and (not self.risk_manager or self.aplicar_risco(symbol, result, preco))
+        confirmado = self.resolver_provisorio(
+            symbol, result["entry_type"] if aprovado else "NEUTRO", start
+        )
+
+        if aprovado:
+            logger.info(
+                "Sinal {} para {} (força {})",
+                result["entry_type"],
+                symbol,
+                pontos_do_lado(result),
+                symbol=symbol,
+                limite=LOG_RATE_LIMIT_PER_MIN,
+            )
+            # O resultado completo só é formatado se houver um sink em DEBUG
+            logger.opt(lazy=True).debug("Sinal de {}: {}", lambda: symbol, lambda: result)
+            alerta = self.montar_alerta(symbol, result, preco)
+            alerta["confirmado"] = confirmado
+            self.enviar_alerta(alerta)
+            if self.journal:
+                self.journal.registrar_alerta(symbol, self.timeframe, result)
+            if self.paper:
+                self.paper.abrir(symbol, self.timeframe, result, preco)
+            if self.executor:
+                self.executor.submeter(symbol, result, preco)
+
+    def montar_alerta(self, symbol, result, preco):
+        """Dados do alerta enviados a `enviar_alerta`."""
+        return {
+            "simbolo": symbol,
+            "entrada": preco,
+            "tps": result.get("tps", []),
+            "sl": result.get("sl", None),
+            "motivos": result.get("active_signals", []),
+            "tipo_entrada": result["entry_type"],
+            "alavancagem": result.get("alavancagem", "N/A"),
+            "timeframe": self.timeframe,
+            # Pontos do lado do sinal: a soma compra + venda não distingue sinais fortes
+            "forca": pontos_do_lado(result),
+        }
+
+    def emitir_provisorio(self, symbol, result, preco, start):
+        """
+        Emite o alerta de um sinal da vela em andamento. Apenas o alerta: o diário,
+        o paper trading e as ordens esperam a confirmação no fechamento da vela.
+        """
+        if result["entry_type"] not in ("BUY/LONG", "SELL/SHORT"):
+            return  # Um provisório já emitido espera o fechamento para ser confirmado ou não
+        pendente = self.provisorios[symbol].get(start)
+        if pendente and pendente["entry_type"] == result["entry_type"]:
+            return  # Já anunciado nesta vela
+        if self.risk_manager and not self.aplicar_risco(symbol, result, preco, registrar=False):
+            return
+        self.provisorios[symbol][start] = {
+            "entry_type": result["entry_type"],
+            "entrada": preco,
+            "forca": pontos_do_lado(result),
+        }
+        self.contagem_intrabar["provisorios"] += 1
+        logger.info(
+            "Sinal provisório {} para {} (força {})",
+            result["entry_type"],
+            symbol,
+            pontos_do_lado(result),
+            symbol=symbol,
+            limite=LOG_RATE_LIMIT_PER_MIN,
+        )
+        alerta = self.montar_alerta(symbol, result, preco)
+        alerta["provisorio"] = True
+        self.enviar_alerta(alerta)
+
+    def resolver_provisorio(self, symbol, entry_type, start=None):
+        """
+        Resolve o sinal provisório da vela `start` com o resultado da vela fechada:
+        mesmo sentido confirma; caso contrário, um aviso de cancelamento é enviado.
+        Provisórios de velas anteriores, que fecharam sem avaliação, são cancelados.
+
+        Returns:
+            bool: True se havia um provisório da vela e ele foi confirmado.
+        """
+        pendentes = self.provisorios.get(symbol)
+        if not pendentes:
+            return False
+        confirmado = False
+        for inicio in sorted(pendentes):
+            if start is not None and inicio > start:
+                break  # Vela ainda em andamento
+            pendente = pendentes.pop(inicio)
+            if inicio == start and pendente["entry_type"] == entry_type:
+                self.contagem_intrabar["confirmados"] += 1
+                confirmado = True
+                continue
+            self.contagem_intrabar["cancelados"] += 1
+            self.enviar_alerta(
+                {
+                    "simbolo": symbol,
+                    "entrada": pendente["entrada"],
+                    "tps": [],
+                    "sl": None,
+                    "motivos": [],
+                    "tipo_entrada": pendente["entry_type"],
+                    "timeframe": self.timeframe,
+                    "forca": pendente["forca"],
+                    "cancelado": True,
+                }
+            )
+        return confirmado
+
+    def aplicar_risco(self, symbol, result, preco, registrar=True):
+        """
+        Verifica o sinal no gerenciador de risco e define a alavancagem sugerida.
+        Sinais provisórios (`registrar=False`) não contam para o controle de frequência
+        nem reservam exposição.
+
+        Returns:
+            bool: True se o sinal pode ser emitido.
+        """
+        if result["entry_type"] not in ("BUY/LONG", "SELL/SHORT"):
+            return True
+        aprovado, motivo = self.risk_manager.verificar(
+            symbol, result["entry_type"], EXECUTION_NOTIONAL_USDT
+        )
+        if not aprovado:
+            logger.info(
+                "Sinal de {} bloqueado pelo gerenciador de risco: {}",
+                symbol,
+                motivo,
+                symbol=symbol,
+                limite=LOG_RATE_LIMIT_PER_MIN,
+            )
+            return False
+        if registrar:
+            self.risk_manager.registrar_sinal(symbol)
+            self.risk_manager.reservar(symbol, result["entry_type"], EXECUTION_NOTIONAL_USDT)
+        if result.get("sl"):
+            distancia_sl = abs(preco - result["sl"]) / preco
+            result["alavancagem"] = self.risk_manager.alavancagem(
+                pontos_do_lado(result), distancia_sl
+            )
+        return True
 
     def start(self):
         self.is_running = True